@@ -2,10 +2,17 @@ from telegram.ext import CommandHandler, ApplicationBuilder, MessageHandler, fil
 from bot.handlers.handlers import HandlerMessage
 from dotenv import load_dotenv
 from apscheduler.schedulers.background import BackgroundScheduler
-import os 
+from apscheduler.executors.pool import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import os
+import random
 import logging
 from bot.utils.logger import Logging
 from bot.scraper.data_scraper import run_scrapers
+from bot.scraper.registry import select_sources, parse_shard
+from bot.utils.database import connection_pool
+from bot.utils.retention import RetentionManager
+from bot.scraper.browser_pool import browser_pool
 
 # Load Data
 load_dotenv()
@@ -16,27 +23,103 @@ log = Logging.setup_logging()
 
 class Dispatcher:
     def __init__(self):
-        self.scheduler = BackgroundScheduler()
+        # Scraper berjalan di thread pool scheduler, terpisah dari event loop bot
+        self.scheduler = BackgroundScheduler(
+            executors={"default": ThreadPoolExecutor(int(os.getenv("SCRAPER_MAX_WORKERS", 2)))}
+        )
         self.handler = HandlerMessage()
 
+    def _schedule_scrapers(self):
+        """Daftarkan job scraping per sumber (interval dalam menit, 0 = nonaktif)"""
+        default_interval = int(os.getenv("SCRAPE_INTERVAL_MINUTES", 360))
+        jitter = int(os.getenv("SCRAPE_JITTER_SECONDS", 300))
+        scrape_on_startup = os.getenv("SCRAPE_ON_STARTUP", "true").lower() == "true"
+
+        # Semua sumber terdaftar, atau hanya bagian shard ini jika SCRAPER_SHARD diisi
+        for source in select_sources(shard=parse_shard(os.getenv("SCRAPER_SHARD"))):
+            interval = int(os.getenv(f"SCRAPE_INTERVAL_{source.upper()}", default_interval))
+            if interval <= 0:
+                logging.info(f"⏸️ Scraping {source} dinonaktifkan")
+                continue
+
+            # Refresh pertama langsung di background, diberi jeda acak agar tidak serentak
+            first_run = datetime.now() + timedelta(seconds=random.uniform(0, min(jitter, 30)))
+            if not scrape_on_startup:
+                first_run = datetime.now() + timedelta(minutes=interval)
+
+            self.scheduler.add_job(
+                run_scrapers,
+                trigger="interval",
+                minutes=interval,
+                jitter=jitter,
+                args=[[source]],
+                id=f"scrape_{source.lower()}",
+                name=f"Scrape {source}",
+                next_run_time=first_run,
+                max_instances=1,  # Cegah run yang overlap untuk sumber yang sama
+                coalesce=True,
+                misfire_grace_time=interval * 60,
+                replace_existing=True,
+            )
+            logging.info(f"🗓️ Scraping {source} dijadwalkan setiap {interval} menit (jitter {jitter} detik)")
+
+    def _schedule_retention(self):
+        """Retention dan VACUUM/ANALYZE harian di jam sepi (RETENTION_HOUR di zona RETENTION_TIMEZONE)"""
+        hour = int(os.getenv("RETENTION_HOUR", 3))
+        # Server (Fly) berjalan di UTC, jam sepi mengikuti pengguna di WIB
+        timezone = os.getenv("RETENTION_TIMEZONE", "Asia/Jakarta")
+        if hour < 0:
+            logging.info("⏸️ Retention dinonaktifkan")
+            return
+
+        self.scheduler.add_job(
+            RetentionManager().run,
+            trigger="cron",
+            hour=hour,
+            minute=random.randint(0, 29),
+            timezone=timezone,
+            id="retention",
+            name="Retention & maintenance",
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=3600,
+            replace_existing=True,
+        )
+        logging.info(f"🗓️ Retention dijadwalkan setiap hari pukul {hour:02d}:xx ({timezone})")
+
+    async def _on_shutdown(self, app):
+        """Tutup resource async saat bot berhenti"""
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        browser_pool.shutdown()
+        await self.handler.llm.llm_client.aclose()
+        self.handler.llm.db.close()
+        connection_pool.close_all()
+
     def run(self):
         """Running all commandHandler and scraping data"""
-        run_scrapers()
+        # Resolve path chromedriver sekali di background saat proses mulai
+        self.scheduler.add_job(browser_pool.resolve_driver_path, id="resolve_chromedriver")
+
+        # Scraping berjalan di background, bot langsung melayani data yang sudah ada
+        self._schedule_scrapers()
+        self._schedule_retention()
+        self.scheduler.start()
+
         # Build Application Builder
-        app = ApplicationBuilder().token(KEY).build()
-        
-        # Adding Command Handler 
+        app = ApplicationBuilder().token(KEY).post_shutdown(self._on_shutdown).build()
+
+        # Adding Command Handler
         app.add_handler(CommandHandler('start', self.handler.start))
         app.add_handler(CommandHandler('help', self.handler.help))
         app.add_handler(CommandHandler('info', self.handler.info))
 
         # adding Message Handler
         app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handler.handle_message))
-        
+
         # Error Handling dalam pesan
         app.add_error_handler(self.handler.error_handler)
 
         # Running Telebot
         logging.info("🤖 Bot berjalan...")
         app.run_polling()
-
@@ -2,6 +2,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.error import NetworkError, TimedOut, BadRequest
 from dotenv import load_dotenv
+import os
 import logging
 import asyncio
 import hashlib
@@ -123,7 +124,7 @@ class MessageManager:
                 
             elif "message is too long" in error_msg:
                 # Retry dengan pesan yang lebih pendek
-                logging.warning(f"Message too long, retrying with shorter version")
+                logging.warning("Message too long, retrying with shorter version")
                 shorter_text = self._truncate_message(text[:self.max_message_length // 2])
                 return await self.safe_edit_message(context, chat_id, message_id, shorter_text, parse_mode)
                 
@@ -190,10 +191,68 @@ class MessageManager:
             logging.info(f"Cleaned up {len(keys_to_remove)} old cache entries")
 
 
+class StreamingEditor:
+    """
+    Edit pesan placeholder secara bertahap selama LLM streaming.
+    Interval edit adaptif: tumbuh sesuai panjang pesan dan mundur (backoff) jika edit gagal,
+    sehingga tetap di bawah rate limit edit Telegram.
+    """
+
+    def __init__(self,
+                 message_manager: MessageManager,
+                 context: ContextTypes.DEFAULT_TYPE,
+                 chat_id: int,
+                 message_id: int,
+                 base_interval: float = 1.0,
+                 max_interval: float = 3.0,
+                 cursor: str = " ▌"):
+        self.message_manager = message_manager
+        self.context = context
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.base_interval = max(base_interval, message_manager.min_edit_interval)
+        self.max_interval = max_interval
+        self.cursor = cursor
+        self._interval = self.base_interval
+        self._last_edit_time: Optional[float] = None
+        self._failures = 0
+
+    def _next_interval(self, text_length: int) -> float:
+        """Pesan panjang = payload edit lebih besar, jadi perlambat cadence"""
+        interval = self.base_interval + (text_length / 1000) * 0.5
+        # Backoff eksponensial setelah edit gagal (mis. RetryAfter dari Telegram)
+        if self._failures:
+            return min(interval * 2 ** min(self._failures, 3), self.max_interval * 2)
+        return min(interval, self.max_interval)
+
+    async def __call__(self, partial_text: str):
+        """Dipanggil untuk setiap chunk baru, edit hanya jika interval sudah lewat"""
+        if not partial_text.strip():
+            return
+
+        now = asyncio.get_running_loop().time()
+        # Edit pertama langsung dikirim agar token pertama cepat terlihat
+        if self._last_edit_time is not None and now - self._last_edit_time < self._interval:
+            return
+
+        self._last_edit_time = now
+        success = await self.message_manager.safe_edit_message(
+            self.context,
+            self.chat_id,
+            self.message_id,
+            partial_text + self.cursor
+        )
+
+        self._failures = 0 if success else self._failures + 1
+        self._interval = self._next_interval(len(partial_text))
+
+
 class HandlerMessage:
     def __init__(self):
         self.llm = EnhancedLLMIntegration()
         self.message_manager = MessageManager()
+        # Mode streaming: teks parsial LLM langsung ditampilkan di pesan placeholder
+        self.stream_partial = os.getenv("STREAM_PARTIAL_RESPONSE", "true").lower() == "true"
         self._cleanup_task = None
         self._cleanup_started = False
     
@@ -385,8 +444,17 @@ Ada yang ingin kamu cari sekarang? 🚀
             if streaming_msg_id:
                 context.chat_data["streaming_message_id"] = streaming_msg_id
             
+            on_partial = None
+            if streaming_msg_id and self.stream_partial:
+                on_partial = StreamingEditor(
+                    self.message_manager,
+                    context,
+                    update.effective_chat.id,
+                    streaming_msg_id
+                )
+            
             # Process dengan EnhancedLLMIntegration
-            response = await self.llm.process_user_request(user_input, update, context)
+            response = await self.llm.process_user_request(user_input, update, context, on_partial=on_partial)
             
             # Validasi response
             if not response or not response.strip():
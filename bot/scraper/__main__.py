@@ -0,0 +1,52 @@
+"""
+Jalankan scraper tanpa bot, mis. untuk cron atau worker terpisah:
+
+    python -m bot.scraper                      # semua sumber
+    python -m bot.scraper -s Kalibrr -s Glints # subset
+    python -m bot.scraper --shard 0/2          # shard ke-0 dari 2 proses
+    python -m bot.scraper --list
+"""
+import os
+import sys
+import argparse
+from bot.utils.logger import Logging
+from bot.scraper.data_scraper import scrape_sources
+from bot.scraper.registry import SCRAPER_REGISTRY, parse_shard
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bot.scraper", description="Jalankan scraper terdaftar")
+    parser.add_argument("-s", "--source", action="append", dest="sources",
+                        help="Nama sumber (boleh diulang), default semua sumber")
+    parser.add_argument("--shard", default=os.getenv("SCRAPER_SHARD"),
+                        help='Jalankan sebagian sumber: "index/total", mis. 0/2 (default SCRAPER_SHARD)')
+    parser.add_argument("--sequential", action="store_true", help="Jalankan sumber satu per satu")
+    parser.add_argument("--workers", type=int, help="Jumlah worker paralel (default SCRAPER_MAX_WORKERS)")
+    parser.add_argument("--list", action="store_true", help="Tampilkan sumber yang terdaftar lalu keluar")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for scraper_cls in SCRAPER_REGISTRY.values():
+            print(f"{scraper_cls.source_name:<10} {scraper_cls.save_method:<14} "
+                  f"{scraper_cls.url_env} (rate limit {scraper_cls.rate_limit:g} detik)")
+        return 0
+
+    Logging.setup_logging()
+    try:
+        results = scrape_sources(
+            args.sources,
+            parallel=False if args.sequential else None,
+            max_workers=args.workers,
+            shard=parse_shard(args.shard),
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    for result in results:
+        print(f"{result.source:<10} {result.status:<9} {result.items:>4} data "
+              f"({result.new} baru, {result.updated} berubah, {result.removed} hilang) "
+              f"{result.duration:.1f} detik")
+    # Exit code bukan nol jika ada sumber yang gagal / timeout
+    return 1 if any(result.status in ("error", "timeout") for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import os
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _PooledDriver:
+    driver: webdriver.Chrome
+    pages: int = 0
+    idle_since: float = 0.0
+
+class BrowserPool:
+    """
+    Pool Chrome headless yang tetap hangat antar scraper dalam satu run scraping.
+    Driver di-reset setiap dikembalikan dan di-recycle setelah N halaman atau jika memori membengkak.
+    Driver yang idle lebih dari BROWSER_IDLE_TIMEOUT detik ditutup. Default-nya (5 menit) jauh lebih
+    pendek dari SCRAPE_INTERVAL_MINUTES, jadi Chrome hanya dipakai ulang di dalam satu run dan tidak
+    menahan memori di antara jadwal scraping.
+    """
+
+    def __init__(self,
+                 max_size: int = None,
+                 max_pages: int = None,
+                 max_memory_mb: float = None,
+                 idle_timeout: float = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size or int(os.getenv("BROWSER_POOL_SIZE", os.getenv("SCRAPER_MAX_WORKERS", 2)))
+        self.max_pages = max_pages or int(os.getenv("BROWSER_MAX_PAGES", 50))
+        self.max_memory_mb = max_memory_mb or float(os.getenv("BROWSER_MAX_MEMORY_MB", 400))
+        # Reuse hanya per run: 300 detik < SCRAPE_INTERVAL_MINUTES, jadi Chrome ditutup di antara jadwal.
+        # Set >= interval scraping agar Chrome dipakai ulang antar jadwal, 0 = tetap hidup sampai shutdown
+        self.idle_timeout = idle_timeout if idle_timeout is not None else float(os.getenv("BROWSER_IDLE_TIMEOUT", 300))
+
+        self._lock = threading.Lock()
+        self._driver_path_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._idle: List[_PooledDriver] = []
+        self._in_use: Dict[int, _PooledDriver] = {}
+        self._driver_path: Optional[str] = None
+        self._reaper: Optional[threading.Timer] = None
+        # Sumber waktu untuk idle_since / close_idle (bisa diganti di test)
+        self._clock = clock
+
+    def resolve_driver_path(self) -> str:
+        """Cari path chromedriver sekali saja per proses"""
+        with self._driver_path_lock:
+            if self._driver_path is None:
+                env_path = os.getenv("CHROMEDRIVER_PATH")
+                if env_path and os.path.exists(env_path):
+                    self._driver_path = env_path
+                else:
+                    self._driver_path = ChromeDriverManager().install()
+                logger.info(f"🧭 Chromedriver: {self._driver_path}")
+            return self._driver_path
+
+    def _create_driver(self) -> webdriver.Chrome:
+        """Setup Selenium Chrome WebDriver"""
+        options = Options()
+        options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument('--user-agent=Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36')
+
+        chrome_bin = os.getenv("CHROME_BIN")
+        if chrome_bin and os.path.exists(chrome_bin):
+            options.binary_location = chrome_bin
+
+        try:
+            driver = webdriver.Chrome(
+                service=Service(self.resolve_driver_path()),
+                options=options
+            )
+            logger.info("🌐 Chrome headless baru dibuat untuk pool")
+            return driver
+        except Exception as e:
+            logger.error(f"Gagal inisialisasi WebDriver: {str(e)}")
+            raise
+
+    @staticmethod
+    def _quit(pooled: _PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"Gagal menutup Chrome: {str(e)}")
+
+    @staticmethod
+    def _is_alive(pooled: _PooledDriver) -> bool:
+        try:
+            pooled.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _memory_mb(pooled: _PooledDriver) -> Optional[float]:
+        """Total RSS chromedriver + semua proses Chrome turunannya (Linux /proc)"""
+        try:
+            root_pid = pooled.driver.service.process.pid
+        except AttributeError:
+            return None
+
+        if not os.path.isdir("/proc"):
+            return None
+
+        children: Dict[int, List[int]] = {}
+        rss_pages: Dict[int, int] = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    stat = f.read()
+                # Field setelah nama proses: state, ppid, ..., rss di posisi ke-24
+                fields = stat[stat.rfind(")") + 2:].split()
+                pid = int(entry)
+                children.setdefault(int(fields[1]), []).append(pid)
+                rss_pages[pid] = int(fields[21])
+            except (OSError, IndexError, ValueError):
+                continue
+
+        total_pages = 0
+        stack = [root_pid]
+        while stack:
+            pid = stack.pop()
+            total_pages += rss_pages.get(pid, 0)
+            stack.extend(children.get(pid, []))
+        return total_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+    def _reset(self, pooled: _PooledDriver):
+        """Tutup tab tambahan, hapus cookie dan kosongkan halaman"""
+        driver = pooled.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def _should_recycle(self, pooled: _PooledDriver) -> bool:
+        if pooled.pages >= self.max_pages:
+            logger.info(f"♻️ Recycle Chrome setelah {pooled.pages} halaman")
+            return True
+        memory = self._memory_mb(pooled)
+        if memory is not None and memory > self.max_memory_mb:
+            logger.info(f"♻️ Recycle Chrome karena memori {memory:.0f} MB > {self.max_memory_mb:.0f} MB")
+            return True
+        return False
+
+    def _checkout(self) -> _PooledDriver:
+        while True:
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                return _PooledDriver(driver=self._create_driver())
+            if self._is_alive(pooled):
+                return pooled
+            logger.warning("Chrome di pool sudah mati, dibuang")
+            self._quit(pooled)
+
+    def _checkin(self, pooled: _PooledDriver):
+        try:
+            self._reset(pooled)
+        except Exception as e:
+            logger.warning(f"Gagal reset Chrome, dibuang: {str(e)}")
+            self._quit(pooled)
+            return
+
+        if self._should_recycle(pooled):
+            self._quit(pooled)
+            return
+
+        pooled.idle_since = self._clock()
+        with self._lock:
+            self._idle.append(pooled)
+            self._schedule_reap()
+
+    def _schedule_reap(self):
+        """Jadwalkan ulang penutupan driver idle, dihitung dari checkin terakhir (dipanggil dengan _lock)"""
+        if self.idle_timeout <= 0:
+            return
+        if self._reaper is not None:
+            self._reaper.cancel()
+        self._reaper = threading.Timer(self.idle_timeout, self.close_idle, kwargs={"idle_for": self.idle_timeout})
+        self._reaper.daemon = True
+        self._reaper.start()
+
+    def close_idle(self, idle_for: float = 0) -> int:
+        """Tutup driver yang idle minimal `idle_for` detik (0 = semua driver idle)"""
+        # Toleransi kecil untuk timer yang berjalan sedikit lebih awal dari monotonic clock
+        cutoff = self._clock() - max(idle_for - 1, 0)
+        with self._lock:
+            expired = [pooled for pooled in self._idle if pooled.idle_since <= cutoff]
+            self._idle = [pooled for pooled in self._idle if pooled.idle_since > cutoff]
+        for pooled in expired:
+            self._quit(pooled)
+        if expired and idle_for:
+            logger.info(f"💤 {len(expired)} Chrome idle lebih dari {idle_for:.0f} detik ditutup")
+        return len(expired)
+
+    @contextmanager
+    def session(self):
+        """Pinjam satu driver dari pool, otomatis dikembalikan setelah selesai"""
+        self._slots.acquire()
+        pooled = None
+        try:
+            pooled = self._checkout()
+            with self._lock:
+                self._in_use[id(pooled.driver)] = pooled
+            yield pooled.driver
+        finally:
+            # Driver yang crash akan gagal di-reset dan otomatis dibuang
+            if pooled is not None:
+                with self._lock:
+                    self._in_use.pop(id(pooled.driver), None)
+                pooled.pages += 1
+                self._checkin(pooled)
+            self._slots.release()
+
+    def record_pages(self, driver, count: int = 1):
+        """Catat halaman tambahan yang dibuka dalam satu session (untuk batas recycle)"""
+        with self._lock:
+            pooled = self._in_use.get(id(driver))
+            if pooled is not None:
+                pooled.pages += count
+
+    def shutdown(self):
+        """Tutup semua Chrome yang idle"""
+        with self._lock:
+            if self._reaper is not None:
+                self._reaper.cancel()
+                self._reaper = None
+        closed = self.close_idle()
+        if closed:
+            logger.info(f"🛑 {closed} Chrome di pool ditutup")
+
+# Pool bersama untuk semua scraper
+browser_pool = BrowserPool()
+atexit.register(browser_pool.shutdown)
@@ -1,406 +1,934 @@
 import os
 import time
 import logging
-from selenium import webdriver
+import math
+import json
+import hashlib
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, field
+from enum import Enum
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse, urlencode, parse_qsl, urlunparse
+import httpx
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from bot.utils.database import DatabaseIntern, DatabaseJob, DatabaseCourse
+from bot.utils.database import DatabaseIntern, DatabaseJob, DatabaseCourse, ScrapeStateStore, connection_pool
+from bot.utils.query_cache import bump_generation
+from bot.utils.semantic_search import semantic_index
+from bot.scraper.browser_pool import browser_pool
+from bot.scraper.extraction import contains, engine_for
+from bot.scraper.registry import register_scraper, get_scraper_class, select_sources
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-class BaseScraper:
-    def __init__(self, db, url):
-        self.db = db
-        self.url = url
-        self.delay = float(os.getenv("SCRAPER_DELAY", 2))
-        self.driver = None
-        self.source_name = "Base"  # Override di child class
-
-    def _init_webdriver(self):
-        """Setup Selenium Chrome WebDriver"""
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument('--user-agent=Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36')
-        
-        try:
-            return webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=options
-            )
-        except Exception as e:
-            logger.error(f"Gagal inisialisasi WebDriver: {str(e)}")
-            raise
+# Header untuk fetch HTTP biasa (tanpa browser)
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "id-ID,id;q=0.9,en;q=0.8",
+}
 
-    def _extract_data(self, soup):
-        """Method abstract untuk ekstrak data (harus diimplement child class)"""
-        raise NotImplementedError
+def _fingerprint(value: Any) -> str:
+    """Hash stabil untuk konten halaman, kartu HTML, atau isi listing"""
+    if not isinstance(value, (str, bytes)):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return hashlib.sha1(value).hexdigest()
 
-    def scrape(self):
-        """Main scraping method"""
-        try:
-            logger.info(f"🔄 Memulai scraping {self.source_name}...")
-            
-            # Inisialisasi driver di sini
-            self.driver = self._init_webdriver()
-            self.driver.get(self.url)
-            
-            # Tunggu sampai konten muncul dengan timeout lebih lama
-            wait_element = self._get_wait_element()
-            logger.info(f"⏳ Menunggu elemen: {wait_element}")
-            
-            WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, f".{wait_element}"))
-            )
-            
-            # Scroll sedikit untuk memastikan semua konten ter-load
-            self.driver.execute_script("window.scrollTo(0, 500);")
-            time.sleep(2)
-            
-            soup = BeautifulSoup(self.driver.page_source, "html.parser")
-            results = self._extract_data(soup)
-            
-            logger.info(f"✅ Berhasil scrape {len(results)} data dari {self.source_name}")
-            return results
+@dataclass
+class ScrapeDelta:
+    """Perubahan listing dibanding scraping sebelumnya"""
+    new: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+@dataclass
+class IncrementalRun:
+    """State satu run scraping incremental untuk satu sumber"""
+    # item_key -> {item_hash, card_hash} dari run sebelumnya
+    previous: Dict[str, Dict]
+    # url -> {etag, last_modified, content_hash, item_keys} dari run sebelumnya
+    pages: Dict[str, Dict]
+    # Listing yang sudah ada di database tapi belum punya fingerprint (baseline)
+    known: Set[str]
+    # Crawl penuh: jangan berhenti di halaman tanpa perubahan (untuk mendeteksi listing yang hilang)
+    full: bool = False
+    card_index: Dict[str, str] = field(default_factory=dict)
+    seen: Set[str] = field(default_factory=set)
+    # Listing baru/berubah yang sudah dikirim ke sink (di-upsert beserta last_seen)
+    emitted: Set[str] = field(default_factory=set)
+    fingerprints: Dict[str, Dict] = field(default_factory=dict)
+    page_states: Dict[str, Dict] = field(default_factory=dict)
+    page_keys: List[str] = field(default_factory=list)
+    page_skipped: int = 0
+    last_page_keys: List[str] = field(default_factory=list)
+    complete: bool = False
+    # Waktu mulai run (UTC, format CURRENT_TIMESTAMP SQLite) untuk menandai listing yang tidak terlihat
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+    removed: List[str] = field(default_factory=list)
+    delta: ScrapeDelta = field(default_factory=ScrapeDelta)
+
+    def __post_init__(self):
+        self.card_index = {
+            state['card_hash']: key for key, state in self.previous.items() if state.get('card_hash')
+        }
+
+    def mark_seen(self, key: str):
+        """Listing terlihat lagi tanpa perubahan"""
+        if key not in self.seen:
+            self.seen.add(key)
+            self.delta.unchanged += 1
+        self.page_keys.append(key)
+
+    def take_page(self) -> Tuple[List[str], int]:
+        """Ambil lalu reset catatan halaman yang sedang diproses"""
+        page_keys, skipped = self.page_keys, self.page_skipped
+        self.page_keys, self.page_skipped = [], 0
+        return page_keys, skipped
+
+class NextPage(Enum):
+    """Hasil memuat halaman berikutnya di browser"""
+    LOADED = "loaded"
+    END = "end"         # listing habis: seluruh listing sudah terlihat
+    FAILED = "failed"   # timeout / gagal memuat: listing belum tentu habis
 
+class IngestionError(RuntimeError):
+    """Gagal menulis batch hasil scraping ke database"""
+
+class BatchWriter:
+    """
+    Sink streaming untuk hasil scraping: item ditampung sampai batch_size
+    lalu ditulis dalam satu transaksi, sehingga memori tidak tumbuh dengan jumlah halaman.
+    """
+
+    def __init__(self, save: Callable[[List[Dict]], Any], batch_size: int = None):
+        self.save = save
+        self.batch_size = batch_size or int(os.getenv("SCRAPER_BATCH_SIZE", 100))
+        self.buffer: List[Dict] = []
+        self.count = 0
+        self.batches = 0
+
+    def add(self, items: List[Dict]):
+        self.buffer.extend(items)
+        while len(self.buffer) >= self.batch_size:
+            self._write(self.buffer[:self.batch_size])
+            del self.buffer[:self.batch_size]
+
+    def flush(self):
+        if self.buffer:
+            self._write(self.buffer)
+            self.buffer = []
+
+    def _write(self, batch: List[Dict]):
+        try:
+            self.save(batch)
         except Exception as e:
-            logger.error(f"❌ Gagal scraping {self.source_name}: {str(e)}", exc_info=True)
-            return []
-        finally:
-            if self.driver:
-                self.driver.quit()
-            time.sleep(self.delay)
+            raise IngestionError(f"Gagal menyimpan {len(batch)} data: {str(e)}") from e
+        self.count += len(batch)
+        self.batches += 1
 
-    def _get_wait_element(self):
-        """Class CSS untuk wait element (override di child class)"""
-        raise NotImplementedError
+class BaseScraper:
+    # Nama sumber (kunci registry) dan env var berisi URL listing, override di child class
+    source_name: str = "Base"
+    url_env: Optional[str] = None
+    # Class CSS yang ditunggu browser sebelum halaman dianggap siap
+    wait_element: str = ""
+    # Class database tujuan dan nama method untuk menyimpan hasil scraping
+    database: Optional[type] = None
+    save_method: str = ""
+    # Jeda minimal (detik) antar request halaman ke sumber ini, bisa di-override SCRAPER_RATE_LIMIT_<SUMBER>
+    rate_limit: float = 0.0
+    # Selector kartu listing, dicoba berurutan (override di child class)
+    card_selectors: List[str] = []
+    # Pemetaan field -> selector CSS fallback di dalam kartu (override di child class)
+    field_selectors: Dict[str, List[str]] = {}
+    # Pemetaan field -> kandidat path key di payload JSON (mis. __NEXT_DATA__), override di child class
+    json_field_map: Dict[str, List[str]] = {}
+    # Field yang wajib ada agar sebuah kartu / objek JSON dianggap satu listing
+    required_fields: List[str] = []
+    # Nilai default untuk field yang tidak ditemukan
+    field_defaults: Dict[str, str] = {}
+    # Field pembentuk identitas listing (sama dengan UNIQUE constraint di database)
+    key_fields: Tuple[str, ...] = ('perusahaan', 'posisi')
+    # Query param untuk paginasi via URL (None = infinite scroll / tombol load more)
+    page_param: Optional[str] = None
+    # XPath tombol "load more" untuk situs infinite scroll
+    load_more_xpath: Optional[str] = None
+    # Jumlah halaman yang boleh di-fetch bersamaan untuk sumber ini
+    max_page_concurrency: int = 1
+    # Transport httpx kustom (mis. httpx.MockTransport di test), None = jaringan biasa
+    http_transport: Optional[httpx.AsyncBaseTransport] = None
 
-class KalibrrScraper(BaseScraper):
-    def __init__(self, db):
-        super().__init__(db, os.getenv("KALIBRR_URL"))
-        self.source_name = "Kalibrr"
+    def __init__(self, db=None, url=None):
+        self.db = db if db is not None else self.database()
+        self.url = url or os.getenv(self.url_env)
+        self.delay = float(os.getenv("SCRAPER_DELAY", 2))
+        self.scroll_wait = float(os.getenv("SCRAPER_SCROLL_WAIT", 2))
+        # Batas tunggu kartu baru setelah pindah halaman / load more di browser
+        self.next_page_wait = float(os.getenv("SCRAPER_NEXT_PAGE_WAIT", 15))
+        self.timeout = float(os.getenv("SCRAPER_SOURCE_TIMEOUT", 180))
+        self.http_timeout = float(os.getenv("SCRAPER_HTTP_TIMEOUT", 15))
+        # auto: coba HTTP dulu lalu fallback ke browser | http | browser
+        self.fetch_mode = os.getenv("SCRAPER_FETCH_MODE", "auto").lower()
+        self.page_budget = int(os.getenv("SCRAPER_PAGE_BUDGET", 5))
+        self.page_concurrency = max(1, min(self.max_page_concurrency, int(os.getenv("SCRAPER_PAGE_CONCURRENCY", 3))))
+        self.rate_limit = float(os.getenv(f"SCRAPER_RATE_LIMIT_{self.source_name.upper()}", self.rate_limit))
+        # Lewati halaman/kartu yang tidak berubah sejak scraping sebelumnya
+        self.incremental = os.getenv("SCRAPER_INCREMENTAL", "true").lower() == "true"
+        self.full_crawl_hours = float(os.getenv("SCRAPER_FULL_CRAWL_HOURS", 24))
+        self.state_store = ScrapeStateStore(self.db.db_path)
+        self.last_delta = ScrapeDelta()
+        self._run: Optional[IncrementalRun] = None
+        self._sink: Optional[Callable[[List[Dict]], Any]] = None
+        self.extraction = engine_for(type(self))
+        self.driver = None
 
-    def _get_wait_element(self):
-        return "css-1otdiuc"
+    def save(self, data: List[Dict]):
+        """Simpan hasil scraping ke tabel tujuan sumber ini"""
+        return getattr(self.db, self.save_method)(data)
 
-    def _extract_data(self, soup):
-        internships = []
-        
-        # Cek beberapa kemungkinan selector
-        selectors = [
-            "div.css-1otdiuc",
-            "div[class*='JobCard']",
-            "div[class*='job-card']",
-        ]
-        
-        items = []
-        for selector in selectors:
-            items = soup.select(selector)
-            if items:
-                logger.info(f"✅ Menggunakan selector: {selector} - {len(items)} items")
-                break
-        
-        if not items:
-            logger.warning("❌ Tidak ada job items ditemukan dengan selector yang ada")
-            # Debug: tampilkan beberapa class yang ada
-            all_divs = soup.find_all("div", class_=True)[:10]
-            logger.info("🔍 Beberapa class div yang ditemukan:")
-            for div in all_divs:
-                logger.info(f"   - {div.get('class')}")
+    def _extract_data(self, soup) -> List[Dict]:
+        """Ekstrak listing dari kartu HTML sesuai card_selectors dan field_selectors"""
+        selector, cards = self.extraction.find_cards(soup)
+        if not cards:
+            logger.warning(f"❌ Tidak ada item {self.source_name} ditemukan dengan selector yang ada")
             return []
-        
-        for item in items:
+        logger.info(f"✅ Menggunakan selector: {selector} - {len(cards)} items")
+
+        results = []
+        for card in cards:
             try:
-                # Coba beberapa cara ekstraksi
-                perusahaan = self._safe_extract(item, 'a', 'k-text-subdued k-font-bold') or \
-                           self._safe_extract(item, 'span', 'k-text-subdued') or \
-                           self._extract_by_contains(item, 'company')
-                
-                posisi = self._safe_extract(item, 'h2', 'css-1gzvnis') or \
-                        self._safe_extract(item, 'h3') or \
-                        self._extract_by_contains(item, 'title')
-                
-                lokasi = self._safe_extract(item, 'span', 'k-text-gray-500 k-block k-pointer-events-none') or \
-                        self._extract_by_contains(item, 'location')
-                
-                gaji = self._safe_extract(item, 'p', 'k-text-gray-500') or "Tidak disebutkan"
-                
-                deadline = self._safe_extract(item, 'span', "k-text-xs k-font-bold k-text-gray-600") or "Tidak ada"
-                
-                data = {
-                    'sumber': self.source_name,
-                    'perusahaan': perusahaan,
-                    'posisi': posisi,
-                    'lokasi': lokasi,
-                    'gaji': gaji,
-                    'deadline': deadline
-                }
-                
-                # Hanya simpan jika ada perusahaan dan posisi (field penting)
-                if data['perusahaan'] and data['posisi']:
-                    internships.append(data)
-                    logger.debug(f"📋 Data: {data['perusahaan']} - {data['posisi']}")
+                card_hash = self._card_fingerprint(card)
+                if self._skip_unchanged_card(card_hash):
+                    continue
+
+                data = self.extraction.extract(card)
+                # Hanya simpan jika field penting ada
+                if not all(data.get(field_name) for field_name in self.required_fields):
+                    continue
+
+                for field_name, default in self.field_defaults.items():
+                    data[field_name] = data.get(field_name) or default
+                results.append({'sumber': self.source_name, **data, '_card_hash': card_hash})
+                logger.debug(f"📋 Data {self.source_name}: {[data.get(field_name) for field_name in self.key_fields]}")
 
             except Exception as e:
-                logger.warning(f"Gagal parsing item: {str(e)}")
+                logger.warning(f"Gagal parsing item {self.source_name}: {str(e)}")
                 continue
-        
-        return internships
 
-    def _safe_extract(self, parent, tag, class_=None):
-        """Helper untuk ekstrak text dengan aman"""
+        return results
+
+    def _page_url(self, page: int) -> str:
+        """URL untuk halaman ke-n (halaman 1 = URL asli)"""
+        if page == 1 or not self.page_param:
+            return self.url
+        parts = urlparse(self.url)
+        query = dict(parse_qsl(parts.query))
+        query[self.page_param] = str(page)
+        return urlunparse(parts._replace(query=urlencode(query)))
+
+    def _item_key(self, item: Dict) -> str:
+        return json.dumps([item.get(field) for field in self.key_fields], ensure_ascii=False)
+
+    def _known_keys(self) -> Set[str]:
+        """Listing yang sudah ada di database, untuk menghentikan crawl lebih awal"""
         try:
-            if class_:
-                elem = parent.find(tag, class_=class_)
+            return {json.dumps(list(key), ensure_ascii=False) for key in self.db.get_known_keys(self.source_name)}
+        except Exception as e:
+            logger.warning(f"Gagal memuat listing lama {self.source_name}: {str(e)}")
+            return set()
+
+    def _start_run(self):
+        """Muat fingerprint run sebelumnya sebagai dasar deteksi perubahan"""
+        previous, pages, full = {}, {}, True
+        if self.incremental and self.state_store is not None:
+            try:
+                previous = self.state_store.load_items(self.source_name)
+                pages = self.state_store.load_pages(self.source_name)
+                hours = self.state_store.hours_since_full_crawl(self.source_name)
+                full = hours is None or hours >= self.full_crawl_hours
+            except Exception as e:
+                logger.warning(f"Gagal memuat state scraping {self.source_name}: {str(e)}")
+        if full and previous:
+            logger.info(f"🔁 Crawl penuh {self.source_name} untuk mendeteksi listing yang hilang")
+        self._run = IncrementalRun(previous=previous, pages=pages, known=self._known_keys(), full=full and bool(previous))
+
+    def _card_fingerprint(self, card) -> str:
+        # Hanya teks kartu: perubahan class/atribut kosmetik tidak memicu ekstraksi ulang
+        return _fingerprint(card.get_text("\x1f", strip=True))
+
+    def _skip_unchanged_card(self, card_hash: str) -> bool:
+        """True jika kartu HTML identik dengan run sebelumnya (ekstraksi field dilewati)"""
+        run = self._run
+        if run is None or card_hash not in run.card_index:
+            return False
+        run.mark_seen(run.card_index[card_hash])
+        run.page_skipped += 1
+        return True
+
+    def _collect_page(self, items: List[Dict]) -> Tuple[List[Dict], bool]:
+        """
+        Klasifikasikan item satu halaman (baru / berubah / tetap).
+        Return (item_baru_atau_berubah, lanjut) - crawl berhenti jika halaman kosong
+        atau tidak ada satu pun listing yang baru/berubah di halaman tersebut.
+        """
+        run = self._run
+        changed = []
+        for item in items:
+            card_hash = item.pop('_card_hash', None)
+            key = self._item_key(item)
+            if key in run.seen:
+                continue
+
+            item_hash = _fingerprint(item)
+            previous = run.previous.get(key)
+            run.fingerprints[key] = {'item_key': key, 'item_hash': item_hash, 'card_hash': card_hash}
+
+            # Listing lama tanpa fingerprint cukup dicatat sebagai baseline
+            if (previous and previous['item_hash'] == item_hash) or (not previous and key in run.known):
+                run.mark_seen(key)
+                continue
+
+            run.seen.add(key)
+            run.emitted.add(key)
+            run.page_keys.append(key)
+            if previous:
+                run.delta.updated += 1
             else:
-                elem = parent.find(tag)
-            return elem.text.strip() if elem else None
-        except:
-            return None
-    
-    def _extract_by_contains(self, parent, keyword):
-        """Ekstrak berdasarkan keyword dalam class atau text"""
-        try:
-            for elem in parent.find_all():
-                if elem.get('class'):
-                    class_str = ' '.join(elem.get('class'))
-                    if keyword.lower() in class_str.lower():
-                        return elem.text.strip()
-            return None
-        except:
-            return None
-    
-class GlintsScraper(BaseScraper):
-    def __init__(self, db):
-        super().__init__(db, os.getenv("GLINTS_URL"))
-        self.source_name = "Glints"
+                run.delta.new += 1
+            changed.append(item)
 
-    def _get_wait_element(self):
-        return "JobCardsc__JobCardWrapper-sc-hmqj50-1"
+        page_keys, skipped = run.take_page()
+        run.last_page_keys = page_keys
 
-    def _extract_data(self, soup):
-        jobs = []
-        
-        # Coba beberapa selector untuk Glints
-        selectors = [
-            "div.JobCardsc__JobCardWrapper-sc-hmqj50-1",
-            "div[class*='JobCard']",
-            "div[class*='CompactOpportunityCard']",
-            "article[class*='JobCard']"
-        ]
-        
-        items = []
-        for selector in selectors:
-            items = soup.select(selector)
-            if items:
-                logger.info(f"✅ Menggunakan selector: {selector} - {len(items)} items")
-                break
-        
-        if not items:
-            logger.warning("❌ Tidak ada job items ditemukan dengan selector yang ada")
+        if not items and not skipped:
+            # Halaman kosong = akhir listing, semua listing aktif sudah terlihat
+            run.complete = True
+            return [], False
+        if not changed and not run.full:
+            logger.info(f"⏹️  Halaman {self.source_name} tidak berisi listing baru/berubah, crawl dihentikan")
+            return [], False
+        return changed, True
+
+    def _page_unchanged(self, url: str):
+        """Halaman 304 / hash sama: semua listing yang dulu ada di halaman itu dianggap tetap"""
+        for key in self._run.pages.get(url, {}).get('item_keys', []):
+            self._run.mark_seen(key)
+        self._run.take_page()
+
+    def _finish_run(self) -> ScrapeDelta:
+        """Hitung listing yang hilang (hanya jika crawl sampai akhir listing)"""
+        run = self._run
+        if run is None:
+            return self.last_delta
+        if run.complete:
+            run.removed = sorted(set(run.previous) - run.seen)
+            run.delta.removed = len(run.removed)
+        self.last_delta = run.delta
+        return run.delta
+
+    def _emit(self, items: List[Dict]):
+        """Kirim item satu halaman ke sink segera setelah di-parse"""
+        if items:
+            self._sink(items)
+
+    def commit_state(self):
+        """Simpan fingerprint run ini; dipanggil setelah data berhasil disimpan ke database"""
+        run, self._run = self._run, None
+        if run is None:
+            return
+        # Listing yang tidak berubah tidak ikut di-upsert, cukup perbarui last_seen
+        self.db.mark_seen([tuple(json.loads(key)) for key in run.seen - run.emitted])
+        if run.complete:
+            # Hanya crawl lengkap yang bisa memastikan listing sudah tidak ada di sumber
+            missed = self.db.mark_missed(self.source_name, run.started_at)
+            if missed:
+                logger.info(f"👻 {missed} listing {self.source_name} tidak terlihat di crawl lengkap ini")
+        if not self.incremental or self.state_store is None:
+            return
+        self.state_store.save_run(
+            self.source_name,
+            pages=list(run.page_states.values()),
+            items=list(run.fingerprints.values()),
+            seen_keys=[key for key in run.seen if key not in run.fingerprints],
+            removed_keys=run.removed,
+            complete=run.complete,
+        )
+
+    def _parse_listing_page(self, html: str) -> List[Dict]:
+        """Parse satu halaman listing: kartu HTML dulu, lalu JSON tertanam"""
+        # Validasi berbasis selector: listing harus sudah ada di HTML awal
+        results = self._extract_data(self.extraction.parse_cards(html))
+        # Kartu yang dilewati karena tidak berubah tetap berarti selector cocok
+        if results or self._run.page_skipped:
+            return results
+
+        return self._extract_embedded_json(self.extraction.parse_scripts(html)) if self.json_field_map else []
+
+    async def _fetch_page(self, client: httpx.AsyncClient, page: int) -> Tuple[Optional[str], Dict]:
+        """
+        Ambil HTML halaman dengan HTTP biasa (tanpa render JavaScript).
+        Return (html, page_state); html None jika halaman tidak berubah (304 atau hash konten sama).
+        page_state baru dicatat ke run oleh pemanggil setelah halaman benar-benar diproses.
+        """
+        url = self._page_url(page)
+        previous = self._run.pages.get(url, {})
+        headers = {}
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+
+        response = await client.get(url, headers=headers)
+        if response.status_code == 304:
+            return None, previous
+        response.raise_for_status()
+
+        content_hash = _fingerprint(response.content)
+        state = {
+            'url': url,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'content_hash': content_hash,
+            'item_keys': previous.get('item_keys', []),
+        }
+        if previous.get('content_hash') == content_hash:
+            return None, state
+        return response.text, state
+
+    async def _crawl_http(self):
+        """Crawl beberapa halaman via HTTP, beberapa halaman di-fetch bersamaan jika sumber mengizinkan"""
+        self._start_run()
+        # Tanpa paginasi URL, HTTP hanya bisa membaca halaman pertama
+        budget = self.page_budget if self.page_param else 1
+
+        async with httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            follow_redirects=True,
+            timeout=self.http_timeout,
+            transport=self.http_transport
+        ) as client:
+            page = 1
+            while page <= budget:
+                batch = list(range(page, min(page + self.page_concurrency, budget + 1)))
+                pages = await asyncio.gather(
+                    *(self._fetch_page(client, number) for number in batch),
+                    return_exceptions=True
+                )
+
+                # State halaman hanya dicatat untuk halaman yang diproses di run ini;
+                # halaman yang sudah di-fetch tapi tidak diproses (batch berhenti lebih awal)
+                # tetap memakai state lama agar di-parse ulang pada run berikutnya
+                keep_going = True
+                for number, fetched in zip(batch, pages):
+                    if isinstance(fetched, Exception):
+                        # Halaman pertama gagal = fast path gagal, halaman berikutnya cukup berhenti
+                        if number == 1:
+                            raise fetched
+                        logger.warning(f"Gagal fetch halaman {number} {self.source_name}: {str(fetched)}")
+                        keep_going = False
+                        break
+
+                    html, state = fetched
+                    url = self._page_url(number)
+                    if html is None:
+                        if not self._run.pages.get(url, {}).get('item_keys'):
+                            # Halaman kosong yang sama seperti sebelumnya = akhir listing
+                            self._run.complete = True
+                            keep_going = False
+                            break
+                        self._page_unchanged(url)
+                        self._run.page_states[url] = state
+                        if self._run.full:
+                            continue
+                        logger.info(f"⏹️  Halaman {number} {self.source_name} tidak berubah, crawl dihentikan")
+                        keep_going = False
+                        break
+
+                    new_items, keep_going = self._collect_page(self._parse_listing_page(html))
+                    self._run.page_states[url] = {**state, 'item_keys': self._run.last_page_keys}
+                    self._emit(new_items)
+                    if not keep_going:
+                        break
+
+                if not keep_going:
+                    break
+                page += len(batch)
+                if page <= budget and self.rate_limit:
+                    await asyncio.sleep(self.rate_limit)
+
+        logger.info(f"📄 {self.source_name}: {min(page, budget)} halaman di-crawl via HTTP")
+
+    def _find_json_listings(self, payload: Any) -> List[Dict]:
+        """Telusuri payload JSON dan ambil objek yang memiliki semua field wajib"""
+        found = []
+        stack = [payload]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+            elif isinstance(node, dict):
+                item = {field: self._resolve_json_path(node, paths) for field, paths in self.json_field_map.items()}
+                if all(item.get(field) for field in self.required_fields):
+                    found.append(item)
+                    continue  # Jangan telusuri isi listing yang sudah cocok
+                stack.extend(reversed(list(node.values())))
+        return found
+
+    @staticmethod
+    def _resolve_json_path(node: Dict, paths: List[str]) -> Optional[str]:
+        """Ambil nilai string pertama yang ada dari beberapa kandidat path (dipisah titik)"""
+        for path in paths:
+            value = node
+            for key in path.split("."):
+                value = value.get(key) if isinstance(value, dict) else None
+                if value is None:
+                    break
+            if isinstance(value, (str, int, float)) and str(value).strip():
+                return str(value).strip()
+        return None
+
+    def _extract_embedded_json(self, soup) -> List[Dict]:
+        """Ekstrak listing dari JSON yang tertanam di HTML (__NEXT_DATA__ / JSON-LD)"""
+        if not self.json_field_map:
             return []
-        
-        for item in items:
-            try:
-                perusahaan = self._safe_extract(item, 'a', 'CompactOpportunityCardsc__CompanyLink-sc-dkg8my-14') or \
-                           self._extract_by_contains(item, 'company')
-                
-                posisi = self._safe_extract(item, 'h2', 'CompactOpportunityCardsc__JobTitle-sc-dkg8my-11') or \
-                        self._safe_extract(item, 'h3') or \
-                        self._extract_by_contains(item, 'title')
-                
-                lokasi = self._safe_extract(item, 'div', 'CardJobLocation__LocationWrapper-sc-v7ofa9-0') or \
-                        self._extract_by_contains(item, 'location')
-                
-                gaji = self._safe_extract(item, 'span', 'CompactOpportunityCardsc__NotDisclosedMessage-sc-dkg8my-27') or \
-                      "Tidak disebutkan"
-                
-                job_type = self._safe_extract(item, 'div', 'TagStyle__TagContentWrapper-sc-r1wv7a-1') or \
-                          "Full-time"
-                
-                data = {
-                    'sumber': self.source_name,
-                    'perusahaan': perusahaan,
-                    'posisi': posisi,
-                    'lokasi': lokasi,
-                    'gaji': gaji,
-                    'job_type': job_type,
-                }
-                
-                # Hanya simpan jika ada perusahaan dan posisi
-                if data['perusahaan'] and data['posisi']:
-                    jobs.append(data)
-                    logger.debug(f"📋 Data: {data['perusahaan']} - {data['posisi']}")
 
-            except Exception as e:
-                logger.warning(f"Gagal parsing item: {str(e)}")
+        scripts = soup.select('script#__NEXT_DATA__, script[type="application/ld+json"]')
+        results = []
+        for script in scripts:
+            try:
+                payload = json.loads(script.string or "")
+            except json.JSONDecodeError:
                 continue
-        
-        return jobs
+            for item in self._find_json_listings(payload):
+                data = {'sumber': self.source_name}
+                for field_name in self.json_field_map:
+                    data[field_name] = item.get(field_name) or self.field_defaults.get(field_name)
+                results.append(data)
+
+        if results:
+            logger.info(f"✅ {len(results)} data ditemukan di JSON tertanam {self.source_name}")
+        return results
 
-    def _safe_extract(self, parent, tag, class_=None):
-        """Helper untuk ekstrak text dengan aman"""
+    def _scrape_http(self):
+        """Fast path: fetch HTML biasa lalu parse tanpa Chrome"""
+        asyncio.run(self._crawl_http())
+
+    def _load_next_page(self, page: int) -> NextPage:
+        """
+        Muat halaman berikutnya di browser (URL paginasi, tombol load more, atau infinite scroll).
+        END hanya jika halaman termuat tapi tidak ada kartu baru; timeout saat memuat = FAILED.
+        """
+        card_selector = f".{self.wait_element}"
         try:
-            if class_:
-                elem = parent.find(tag, class_=class_)
+            if self.page_param:
+                self.driver.get(self._page_url(page))
+                try:
+                    WebDriverWait(self.driver, self.next_page_wait).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, card_selector))
+                    )
+                except TimeoutException:
+                    # Halaman selesai dimuat tapi tanpa kartu = sudah melewati halaman terakhir
+                    if self.driver.execute_script("return document.readyState") != "complete":
+                        raise
+                    logger.info(f"⏹️  Tidak ada halaman berikutnya untuk {self.source_name}")
+                    return NextPage.END
+                return NextPage.LOADED
+
+            count = len(self.driver.find_elements(By.CSS_SELECTOR, card_selector))
+            height = self.driver.execute_script("return document.body.scrollHeight")
+            buttons = self.driver.find_elements(By.XPATH, self.load_more_xpath) if self.load_more_xpath else []
+            if buttons:
+                self.driver.execute_script("arguments[0].click();", buttons[0])
             else:
-                elem = parent.find(tag)
-            return elem.text.strip() if elem else None
-        except:
-            return None
-    
-    def _extract_by_contains(self, parent, keyword):
-        """Ekstrak berdasarkan keyword dalam class atau text"""
-        try:
-            for elem in parent.find_all():
-                if elem.get('class'):
-                    class_str = ' '.join(elem.get('class'))
-                    if keyword.lower() in class_str.lower():
-                        return elem.text.strip()
-            return None
-        except:
-            return None
+                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
 
-class CourseScraper(BaseScraper):
-    def __init__(self, db):
-        super().__init__(db, os.getenv("DICODING_URL"))
-        self.source_name = "Dicoding"
-    
-    def _get_wait_element(self):
-        return "course-card"  # Class yang lebih umum untuk waiting
-    
-    def _extract_data(self, soup):
-        courses = []
-        
-        # Coba beberapa selector untuk handling perubahan UI
-        course_selectors = [
-            'a.course-card',  # Selector utama
-            'div[class*="course-card"]',  # Fallback 1
-            'article[class*="course"]'  # Fallback 2
-        ]
-        
-        course_items = []
-        for selector in course_selectors:
-            course_items = soup.select(selector)
-            if course_items:
-                logger.info(f"✅ Menggunakan selector: {selector} - {len(course_items)} items ditemukan")
-                break
-        
-        if not course_items:
-            logger.warning("❌ Tidak ada course items ditemukan dengan selector yang ada")
-            return []
-        
-        for item in course_items:
+            # Tunggu sampai ada kartu baru yang dimuat
             try:
-                # Ekstrak data dengan fallback yang lebih robust
-                title = self._safe_extract(item, 'h5', 'course-card__name') or \
-                        self._extract_by_contains(item, 'title') or \
-                        self._safe_extract(item, 'h3') or \
-                        self._safe_extract(item, 'h2')
+                WebDriverWait(self.driver, self.next_page_wait).until(
+                    lambda driver: len(driver.find_elements(By.CSS_SELECTOR, card_selector)) > count
+                )
+            except TimeoutException:
+                # Halaman tidak bertambah panjang = tidak ada lagi yang dimuat
+                if self.driver.execute_script("return document.body.scrollHeight") != height:
+                    raise
+                logger.info(f"⏹️  Tidak ada halaman berikutnya untuk {self.source_name}")
+                return NextPage.END
+            return NextPage.LOADED
+        except TimeoutException:
+            logger.warning(
+                f"⚠️  Timeout memuat halaman {page} {self.source_name}, crawl dihentikan tanpa menandai listing lengkap"
+            )
+            return NextPage.FAILED
+
+    def _scrape_browser(self):
+        """Render halaman dengan Chrome headless dari pool"""
+        try:
+            # Pinjam Chrome yang sudah hangat dari pool
+            with browser_pool.session() as driver:
+                self.driver = driver
+                # Batasi waktu load halaman sesuai timeout per sumber
+                self.driver.set_page_load_timeout(self.timeout)
+                self.driver.get(self.url)
                 
-                duration = self._safe_extract(item, 'span', 'mr-2') or \
-                            self._extract_by_contains(item, 'duration')
+                # Tunggu sampai konten muncul dengan timeout lebih lama
+                logger.info(f"⏳ Menunggu elemen: {self.wait_element}")
                 
-                module_total = self._safe_extract(item, 'span', 'mr-3') or \
-                                self._extract_by_contains(item, 'module')
+                WebDriverWait(self.driver, 30).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, f".{self.wait_element}"))
+                )
                 
-                level = self._safe_extract(item, 'span', 'course-card__level') or \
-                        self._extract_by_contains(item, 'level')
+                # Scroll sedikit untuk memastikan semua konten ter-load
+                self.driver.execute_script("window.scrollTo(0, 500);")
+                time.sleep(self.scroll_wait)
                 
-                # Pastikan data minimal yang diperlukan ada
-                if not title:
-                    continue
+                self._start_run()
+                page = 1
+                while True:
+                    soup = self.extraction.parse_cards(self.driver.page_source)
+                    new_items, keep_going = self._collect_page(self._extract_data(soup))
+                    self._emit(new_items)
                     
-                courses.append({
-                    'sumber': self.source_name,
-                    'title': title.strip(),
-                    'duration': duration.strip() if duration else 'Tidak disebutkan',
-                    'module_total': module_total.strip() if module_total else 'Tidak disebutkan',
-                    'level': level.strip() if level else 'Pemula',
-                })
+                    if not keep_going or page >= self.page_budget:
+                        break
+                    if self.rate_limit:
+                        time.sleep(self.rate_limit)
+                    next_page = self._load_next_page(page + 1)
+                    if next_page is NextPage.END:
+                        # Tidak ada halaman berikutnya = seluruh listing sudah terlihat
+                        self._run.complete = True
+                    if next_page is not NextPage.LOADED:
+                        break
+                    page += 1
+                    time.sleep(self.scroll_wait)
                 
-                logger.debug(f"📚 Course ditemukan: {title}")
-
-            except Exception as e:
-                logger.warning(f"Gagal parsing course item: {str(e)}")
-                continue
-        
-        logger.info(f"✅ Berhasil scrape {len(courses)} courses")
-        return courses
+                browser_pool.record_pages(self.driver, page - 1)
+                logger.info(f"📄 {self.source_name}: {page} halaman di-crawl via browser")
+        finally:
+            # Driver dikembalikan ke pool, bukan di-quit
+            self.driver = None
 
-    def _safe_extract(self, parent, tag, class_=None):
-        """Helper untuk ekstrak text dengan aman"""
+    def scrape(self, sink: Optional[Callable[[List[Dict]], Any]] = None) -> List[Dict]:
+        """
+        Main scraping method.
+        Tanpa sink, item baru/berubah dikumpulkan lalu dikembalikan sebagai list.
+        Dengan sink (mis. BatchWriter.add), item dikirim per halaman dan tidak ditampung.
+        """
+        results = []
+        self._sink = sink or results.extend
         try:
-            if class_:
-                elem = parent.find(tag, class_=class_)
+            logger.info(f"🔄 Memulai scraping {self.source_name}...")
+            self.last_delta = ScrapeDelta()
+            
+            if self.fetch_mode in ("auto", "http"):
+                started = time.monotonic()
+                try:
+                    self._scrape_http()
+                except IngestionError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"⚠️  Fetch HTTP {self.source_name} gagal: {str(e)}")
+                
+                # Halaman yang tidak berubah juga berarti fast path berhasil
+                http_ok = bool(self._run and self._run.seen)
+                if http_ok:
+                    logger.info(f"⚡ {self.source_name} via HTTP dalam {time.monotonic() - started:.2f} detik")
+                elif self.fetch_mode == "auto":
+                    logger.info(f"🌐 HTTP tidak menghasilkan data, fallback ke browser untuk {self.source_name}")
             else:
-                elem = parent.find(tag)
-            return elem.text.strip() if elem else None
-        except:
-            return None
-    
-    def _extract_by_contains(self, parent, keyword):
-        """Ekstrak berdasarkan keyword dalam class atau text"""
-        try:
-            for elem in parent.find_all():
-                if elem.get('class'):
-                    class_str = ' '.join(elem.get('class'))
-                    if keyword.lower() in class_str.lower():
-                        return elem.text.strip()
-            return None
-        except:
-            return None
-        
-def run_scrapers():
-    """Jalankan semua scraper"""
-    logger.info("🚀 Memulai proses scraping...")
-    
+                http_ok = False
+            
+            if not http_ok and self.fetch_mode in ("auto", "browser"):
+                self._scrape_browser()
+            
+            delta = self._finish_run()
+            logger.info(
+                f"✅ {self.source_name}: {delta.new} baru, {delta.updated} berubah, "
+                f"{delta.unchanged} tetap, {delta.removed} hilang"
+            )
+            return results
+
+        except IngestionError:
+            # Kegagalan database dilaporkan ke pemanggil, state tidak di-commit
+            self._run = None
+            raise
+        except Exception as e:
+            logger.error(f"❌ Gagal scraping {self.source_name}: {str(e)}", exc_info=True)
+            self._run = None
+            return []
+        finally:
+            self._sink = None
+
+@register_scraper
+class KalibrrScraper(BaseScraper):
+    source_name = "Kalibrr"
+    url_env = "KALIBRR_URL"
+    wait_element = "css-1otdiuc"
+    database = DatabaseIntern
+    save_method = "save_magang"
+    rate_limit = 1.0
+    card_selectors = [
+        "div.css-1otdiuc",
+        "div[class*='JobCard']",
+        "div[class*='job-card']",
+    ]
+    field_selectors = {
+        'perusahaan': ["a.k-text-subdued.k-font-bold", "span.k-text-subdued", contains('company')],
+        'posisi': ["h2.css-1gzvnis", "h3", contains('title')],
+        'lokasi': ["span.k-text-gray-500.k-block.k-pointer-events-none", contains('location')],
+        'gaji': ["p.k-text-gray-500"],
+        'deadline': ["span.k-text-xs.k-font-bold.k-text-gray-600"],
+    }
+    json_field_map = {
+        'perusahaan': ['company_name', 'company.name', 'hiringOrganization.name'],
+        'posisi': ['name', 'title'],
+        'lokasi': ['google_location.address_components.city', 'jobLocation.address.addressLocality', 'location'],
+        'gaji': ['salary', 'baseSalary.value.value'],
+        'deadline': ['application_end_date', 'validThrough'],
+    }
+    required_fields = ['perusahaan', 'posisi']
+    field_defaults = {'gaji': "Tidak disebutkan", 'deadline': "Tidak ada"}
+    load_more_xpath = "//button[contains(., 'Load more') or contains(., 'Muat lebih')]"
+
+@register_scraper
+class GlintsScraper(BaseScraper):
+    source_name = "Glints"
+    url_env = "GLINTS_URL"
+    wait_element = "JobCardsc__JobCardWrapper-sc-hmqj50-1"
+    database = DatabaseJob
+    save_method = "save_jobs"
+    rate_limit = 1.0
+    card_selectors = [
+        "div.JobCardsc__JobCardWrapper-sc-hmqj50-1",
+        "div[class*='JobCard']",
+        "div[class*='CompactOpportunityCard']",
+        "article[class*='JobCard']",
+    ]
+    field_selectors = {
+        'perusahaan': ["a.CompactOpportunityCardsc__CompanyLink-sc-dkg8my-14", contains('company')],
+        'posisi': ["h2.CompactOpportunityCardsc__JobTitle-sc-dkg8my-11", "h3", contains('title')],
+        'lokasi': ["div.CardJobLocation__LocationWrapper-sc-v7ofa9-0", contains('location')],
+        'gaji': ["span.CompactOpportunityCardsc__NotDisclosedMessage-sc-dkg8my-27"],
+        'job_type': ["div.TagStyle__TagContentWrapper-sc-r1wv7a-1"],
+    }
+    json_field_map = {
+        'perusahaan': ['company.name', 'hiringOrganization.name'],
+        'posisi': ['title'],
+        'lokasi': ['city.name', 'location.formattedName', 'jobLocation.address.addressLocality'],
+        'gaji': ['salaryEstimate.minAmount', 'baseSalary.value.value'],
+        'job_type': ['type', 'employmentType'],
+    }
+    required_fields = ['perusahaan', 'posisi']
+    field_defaults = {'gaji': "Tidak disebutkan", 'job_type': "Full-time"}
+    page_param = "page"
+    max_page_concurrency = 3
+
+@register_scraper
+class CourseScraper(BaseScraper):
+    source_name = "Dicoding"
+    url_env = "DICODING_URL"
+    wait_element = "course-card"  # Class yang lebih umum untuk waiting
+    database = DatabaseCourse
+    save_method = "save_courses"
+    rate_limit = 1.0
+    # Beberapa selector untuk handling perubahan UI
+    card_selectors = [
+        'a.course-card',  # Selector utama
+        'div[class*="course-card"]',  # Fallback 1
+        'article[class*="course"]',  # Fallback 2
+    ]
+    field_selectors = {
+        'title': ["h5.course-card__name", contains('title'), "h3", "h2"],
+        'duration': ["span.mr-2", contains('duration')],
+        'module_total': ["span.mr-3", contains('module')],
+        'level': ["span.course-card__level", contains('level')],
+    }
+    json_field_map = {
+        'title': ['name', 'title'],
+        'duration': ['hours', 'timeRequired'],
+        'module_total': ['total_modules', 'module_count'],
+        'level': ['level', 'educationalLevel'],
+    }
+    required_fields = ['title']
+    field_defaults = {'duration': 'Tidak disebutkan', 'module_total': 'Tidak disebutkan', 'level': 'Pemula'}
+    key_fields = ('title', 'duration')
+
+# Lock per sumber agar satu sumber tidak di-scrape dua kali bersamaan
+_source_locks = {}
+_source_locks_guard = threading.Lock()
+
+def _get_source_lock(source_name: str) -> threading.Lock:
+    with _source_locks_guard:
+        return _source_locks.setdefault(source_name.lower(), threading.Lock())
+
+@dataclass
+class ScrapeResult:
+    """Ringkasan hasil scraping satu sumber"""
+    source: str
+    items: int = 0
+    duration: float = 0.0
+    status: str = "ok"  # ok | unchanged | empty | skipped | timeout | error
+    new: int = 0
+    updated: int = 0
+    removed: int = 0
+
+def _build_scrapers(sources: Optional[List[str]] = None,
+                    shard: Optional[Tuple[int, int]] = None) -> List[BaseScraper]:
+    """Buat scraper dari registry; sumber yang memakai class database sama berbagi satu instance"""
+    databases = {}
+    scrapers = []
+    for name in select_sources(sources, shard):
+        scraper_cls = get_scraper_class(name)
+        if scraper_cls.database not in databases:
+            databases[scraper_cls.database] = scraper_cls.database()
+        scrapers.append(scraper_cls(databases[scraper_cls.database]))
+    return scrapers
+
+def _run_scraper(scraper: BaseScraper) -> ScrapeResult:
+    """Scrape satu sumber lalu simpan ke database"""
+    result = ScrapeResult(source=scraper.source_name)
+    lock = _get_source_lock(scraper.source_name)
+    if not lock.acquire(blocking=False):
+        logger.warning(f"⏭️  {scraper.source_name} masih berjalan, scraping dilewati")
+        result.status = "skipped"
+        return result
+
+    started = time.monotonic()
     try:
-        db_intern = DatabaseIntern()
-        db_job = DatabaseJob()
-        db_courses = DatabaseCourse()
-        
-        scrapers = [
-            KalibrrScraper(db_intern),
-            GlintsScraper(db_job),
-            CourseScraper(db_courses)
-        ]
+        logger.info(f"🔄 Menjalankan {scraper.source_name} scraper...")
+        # Item ditulis per batch selama crawl berjalan (upsert + last_seen)
+        writer = BatchWriter(scraper.save)
+        scraper.scrape(sink=writer.add)
+        writer.flush()
         
-        total_saved = 0
+        if writer.count:
+            logger.info(f"💾 {writer.count} data {scraper.source_name} disimpan dalam {writer.batches} batch")
+            result.items = writer.count
+        elif scraper.last_delta.unchanged:
+            logger.info(f"💤 Tidak ada perubahan di {scraper.source_name}")
+            result.status = "unchanged"
+        else:
+            logger.warning(f"⚠️  Tidak ada data dari {scraper.source_name}")
+            result.status = "empty"
         
-        for scraper in scrapers:
+        # Fingerprint baru disimpan hanya setelah data tersimpan
+        scraper.commit_state()
+        result.new = scraper.last_delta.new
+        result.updated = scraper.last_delta.updated
+        result.removed = scraper.last_delta.removed
+        # Hasil pencarian yang di-cache tidak berlaku lagi setelah data berubah
+        if writer.count or result.removed:
+            # Embedding listing baru dibuat sebelum generation naik, agar index yang dimuat ulang sudah lengkap
             try:
-                logger.info(f"🔄 Menjalankan {scraper.source_name} scraper...")
-                data = scraper.scrape()
-                
-                if data:
-                    if isinstance(scraper, KalibrrScraper):
-                        scraper.db.save_magang(data)
-                        total_saved += len(data)
-                    elif isinstance(scraper, GlintsScraper):
-                        scraper.db.save_jobs(data)
-                        total_saved += len(data)
-                    elif isinstance(scraper, CourseScraper):
-                        scraper.db.save_courses(data)
-                        total_saved += len(data)
-                else:
-                    logger.warning(f"⚠️  Tidak ada data dari {scraper.source_name}")
-                    
+                semantic_index.ingest()
             except Exception as e:
-                logger.error(f"❌ Gagal menjalankan {scraper.source_name}: {str(e)}", exc_info=True)
+                logger.error(f"❌ Gagal membuat embedding {scraper.source_name}: {str(e)}")
+            bump_generation(scraper.source_name)
+            
+    except Exception as e:
+        logger.error(f"❌ Gagal menjalankan {scraper.source_name}: {str(e)}", exc_info=True)
+        result.status = "error"
+    finally:
+        result.duration = time.monotonic() - started
+        lock.release()
+    return result
+
+def _run_scraper_in_worker(scraper: BaseScraper) -> ScrapeResult:
+    """_run_scraper di thread executor; koneksi SQLite thread ini ditutup karena thread-nya tidak dipakai ulang"""
+    try:
+        return _run_scraper(scraper)
+    finally:
+        connection_pool.close_thread()
+
+def _run_parallel(scrapers: List[BaseScraper], max_workers: int, timeout: float) -> List[ScrapeResult]:
+    """Jalankan scraper bersamaan dengan jumlah worker terbatas"""
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scraper")
+    futures = {executor.submit(_run_scraper_in_worker, scraper): scraper for scraper in scrapers}
+
+    # Setiap "gelombang" worker mendapat jatah timeout per sumber
+    total_timeout = timeout * math.ceil(len(scrapers) / max_workers)
+    try:
+        for future in as_completed(futures, timeout=total_timeout):
+            scraper = futures[future]
+            results[scraper.source_name] = future.result()
+    except FuturesTimeoutError:
+        for future, scraper in futures.items():
+            if scraper.source_name not in results:
+                logger.error(f"⏱️ {scraper.source_name} melewati batas waktu {timeout:.0f} detik")
+                results[scraper.source_name] = ScrapeResult(
+                    source=scraper.source_name, duration=timeout, status="timeout"
+                )
+    finally:
+        # Jangan tunggu scraper yang macet, thread-nya dibiarkan selesai sendiri
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return [results[scraper.source_name] for scraper in scrapers]
+
+def scrape_sources(sources: Optional[List[str]] = None,
+                   parallel: Optional[bool] = None,
+                   max_workers: Optional[int] = None,
+                   timeout: Optional[float] = None,
+                   shard: Optional[Tuple[int, int]] = None) -> List[ScrapeResult]:
+    """
+    Jalankan scraper dan kembalikan ringkasan per sumber.
+    parallel: default dari SCRAPER_PARALLEL, max_workers dari SCRAPER_MAX_WORKERS
+    (default 2, cukup untuk VM 1 GB karena tiap sumber menjalankan satu Chrome headless).
+    shard: (index, total) untuk membagi sumber antar proses, None = semua sumber.
+    """
+    if parallel is None:
+        parallel = os.getenv("SCRAPER_PARALLEL", "true").lower() == "true"
+    max_workers = max_workers or int(os.getenv("SCRAPER_MAX_WORKERS", 2))
+    timeout = timeout or float(os.getenv("SCRAPER_SOURCE_TIMEOUT", 180))
+
+    scrapers = _build_scrapers(sources, shard)
+    if not scrapers:
+        return []
+
+    if parallel and len(scrapers) > 1 and max_workers > 1:
+        return _run_parallel(scrapers, max_workers, timeout)
+
+    results = []
+    for idx, scraper in enumerate(scrapers):
+        results.append(_run_scraper(scraper))
+        # Jeda antar sumber hanya diperlukan pada mode sequential
+        if idx < len(scrapers) - 1:
+            time.sleep(scraper.delay)
+    return results
+
+def run_scrapers(sources: Optional[List[str]] = None,
+                 parallel: Optional[bool] = None,
+                 shard: Optional[Tuple[int, int]] = None):
+    """
+    Jalankan scraper.
+    sources: daftar nama sumber (mis. ["Kalibrr"]), None berarti semua sumber terdaftar.
+    """
+    logger.info("🚀 Memulai proses scraping...")
+    
+    try:
+        started = time.monotonic()
+        results = scrape_sources(sources, parallel=parallel, shard=shard)
+        
+        for result in results:
+            logger.info(
+                f"📊 {result.source}: {result.items} data ({result.new} baru, {result.updated} berubah, "
+                f"{result.removed} hilang), {result.duration:.1f} detik ({result.status})"
+            )
         
-        logger.info(f"✅ Selesai! Total {total_saved} data berhasil disimpan")
+        total_saved = sum(result.items for result in results)
+        logger.info(
+            f"✅ Selesai! Total {total_saved} data berhasil disimpan dalam {time.monotonic() - started:.1f} detik"
+        )
         return total_saved
         
     except Exception as e:
@@ -0,0 +1,114 @@
+import re
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+# lxml jauh lebih cepat dari html.parser, tapi opsional
+try:
+    import lxml.html
+    from lxml import etree
+    HTML_PARSER = "lxml"
+except ImportError:
+    lxml = None
+    HTML_PARSER = "html.parser"
+
+# Potongan nama class dari selector: ".nama" atau [class*='nama']
+_CLASS_HINT_PATTERN = re.compile(r"""\.([\w-]+)|\[class\*=['"]?([^'"\]]+)['"]?""")
+
+def contains(keyword: str) -> str:
+    """Selector elemen turunan yang class-nya mengandung keyword (case-insensitive)"""
+    return f'[class*="{keyword}" i]'
+
+class ExtractionEngine:
+    """
+    Ekstraksi field dari kartu listing dengan aturan yang dikompilasi sekali per sumber.
+    HTML hanya di-parse untuk subtree kartu (SoupStrainer), dan setiap field dicari
+    dengan selector soupsieve yang sudah dikompilasi sesuai urutan fallback.
+    """
+
+    def __init__(self, card_selectors: Sequence[str], field_selectors: Dict[str, Sequence[str]]):
+        self.card_selectors: List[Tuple[str, soupsieve.SoupSieve]] = [
+            (selector, soupsieve.compile(selector)) for selector in card_selectors
+        ]
+        self.field_selectors: Dict[str, List[soupsieve.SoupSieve]] = {
+            field: [soupsieve.compile(selector) for selector in selectors]
+            for field, selectors in field_selectors.items()
+        }
+
+        hints = set()
+        for selector in card_selectors:
+            for dotted, substring in _CLASS_HINT_PATTERN.findall(selector):
+                hints.add(dotted or substring)
+        self._class_hints = tuple(hints)
+        self._lower_hints = tuple(hint.lower() for hint in hints)
+        self._card_strainer = SoupStrainer(class_=self._is_card_class) if hints else None
+        self._script_strainer = SoupStrainer("script")
+        self._card_xpath = self._compile_card_xpath() if lxml is not None and hints else None
+
+    def _compile_card_xpath(self):
+        """XPath kandidat kartu (elemen yang class-nya memuat salah satu hint)"""
+        condition = " or ".join(f"contains(@class, '{hint}')" for hint in self._class_hints)
+        return etree.XPath(f"//*[{condition}]")
+
+    def _is_card_class(self, value: Optional[str]) -> bool:
+        if not value:
+            return False
+        value = value.lower()
+        return any(hint in value for hint in self._lower_hints)
+
+    def parse_cards(self, html: str) -> BeautifulSoup:
+        """Parse hanya elemen kandidat kartu beserta isinya"""
+        if self._card_xpath is not None and html:
+            # Cari kartu dengan lxml (C), lalu bangun tree BeautifulSoup hanya untuk subtree kartu
+            try:
+                cards = self._card_xpath(lxml.html.fromstring(html))
+                matched = set(cards)
+                # Kandidat yang bersarang di kandidat lain sudah ikut di subtree induknya
+                outermost = [card for card in cards if not any(parent in matched for parent in card.iterancestors())]
+                fragment = "".join(lxml.html.tostring(card, encoding="unicode") for card in outermost)
+                return BeautifulSoup(fragment, HTML_PARSER)
+            except (etree.ParserError, ValueError) as e:
+                logger.debug(f"Parse lxml gagal, fallback ke SoupStrainer: {str(e)}")
+        return BeautifulSoup(html, HTML_PARSER, parse_only=self._card_strainer)
+
+    def parse_scripts(self, html: str) -> BeautifulSoup:
+        """Parse hanya tag <script> (untuk JSON tertanam)"""
+        return BeautifulSoup(html, HTML_PARSER, parse_only=self._script_strainer)
+
+    def find_cards(self, soup) -> Tuple[Optional[str], list]:
+        """Kartu dari selector pertama yang cocok (urutan = prioritas)"""
+        for selector, compiled in self.card_selectors:
+            cards = compiled.select(soup)
+            if cards:
+                return selector, cards
+        return None, []
+
+    @staticmethod
+    def first_text(card, selectors: Sequence[soupsieve.SoupSieve]) -> Optional[str]:
+        """Teks elemen pertama yang tidak kosong dari daftar selector fallback"""
+        for compiled in selectors:
+            elem = compiled.select_one(card)
+            if elem is not None:
+                text = elem.get_text().strip()
+                if text:
+                    return text
+        return None
+
+    def extract(self, card) -> Dict[str, Optional[str]]:
+        return {field: self.first_text(card, selectors) for field, selectors in self.field_selectors.items()}
+
+_engines: Dict[type, ExtractionEngine] = {}
+_engines_lock = threading.Lock()
+
+def engine_for(scraper_cls) -> ExtractionEngine:
+    """Engine per class scraper, dikompilasi sekali per proses"""
+    with _engines_lock:
+        engine = _engines.get(scraper_cls)
+        if engine is None:
+            engine = ExtractionEngine(scraper_cls.card_selectors, scraper_cls.field_selectors)
+            _engines[scraper_cls] = engine
+        return engine
@@ -0,0 +1,56 @@
+import logging
+from typing import Dict, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# source_name (lowercase) -> class scraper, diisi oleh decorator @register_scraper
+SCRAPER_REGISTRY: Dict[str, Type] = {}
+
+def register_scraper(cls):
+    """Daftarkan class scraper berdasarkan source_name-nya"""
+    key = cls.source_name.lower()
+    if key in SCRAPER_REGISTRY and SCRAPER_REGISTRY[key] is not cls:
+        raise ValueError(f"Sumber scraping {cls.source_name} sudah terdaftar")
+    SCRAPER_REGISTRY[key] = cls
+    return cls
+
+def registered_sources() -> List[str]:
+    """Nama semua sumber yang terdaftar, sesuai urutan registrasi"""
+    return [cls.source_name for cls in SCRAPER_REGISTRY.values()]
+
+def get_scraper_class(source: str) -> Type:
+    try:
+        return SCRAPER_REGISTRY[source.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Sumber scraping tidak dikenal: {source} (tersedia: {', '.join(registered_sources())})"
+        ) from None
+
+def parse_shard(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse shard dengan format "index/total" (mis. "0/2"), index dimulai dari 0"""
+    if not value:
+        return None
+    try:
+        index, total = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Format shard tidak valid: {value} (contoh: 0/2)") from None
+    if total < 1 or not 0 <= index < total:
+        raise ValueError(f"Shard {value} di luar jangkauan")
+    return index, total
+
+def select_sources(sources: Optional[List[str]] = None,
+                   shard: Optional[Tuple[int, int]] = None) -> List[str]:
+    """
+    Subset sumber yang akan dijalankan: filter nama (None = semua) lalu filter shard.
+    Shard membagi sumber round-robin berdasarkan urutan nama, sama di setiap proses.
+    """
+    names = [get_scraper_class(source).source_name for source in sources] if sources else registered_sources()
+    names = list(dict.fromkeys(names))
+    if shard is None:
+        return names
+
+    index, total = shard
+    ordered = sorted(registered_sources(), key=str.lower)
+    selected = [name for name in names if ordered.index(name) % total == index]
+    logger.info(f"🧩 Shard {index}/{total}: {', '.join(selected) or '-'}")
+    return selected
@@ -0,0 +1,182 @@
+import os
+import re
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Callable, Any
+from dotenv import load_dotenv
+from bot.utils.database import DatabaseIntern, DatabaseJob, DatabaseCourse, DatabaseSearch
+from bot.utils.semantic_search import semantic_index
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Kolom teks per tipe item beserta bobotnya untuk skor relevansi gabungan
+RELEVANCE_COLUMNS = {
+    "magang": {"posisi": 1.0, "perusahaan": 0.5, "lokasi": 0.3},
+    "pekerjaan": {"posisi": 1.0, "perusahaan": 0.5, "lokasi": 0.3, "job_type": 0.2},
+    "kursus": {"title": 1.0, "sumber": 0.3},
+}
+
+def _tokenize(text: str) -> set:
+    return set(re.findall(r"\w+", (text or "").lower()))
+
+def relevance_score(item: Dict, item_type: str, keyword: str = "", location: str = "") -> float:
+    """
+    Skor relevansi yang bisa dibandingkan antar sumber (bm25 tiap index FTS tidak sebanding):
+    proporsi token query yang muncul di tiap kolom, dikali bobot kolom.
+    """
+    keyword_tokens = _tokenize(keyword)
+    location_tokens = _tokenize(location)
+    score = 0.0
+
+    for column, weight in RELEVANCE_COLUMNS.get(item_type, {}).items():
+        column_tokens = _tokenize(item.get(column))
+        if keyword_tokens:
+            score += weight * len(keyword_tokens & column_tokens) / len(keyword_tokens)
+        if location_tokens and column == "lokasi" and location_tokens & column_tokens:
+            score += 1.0
+
+    return round(score, 4)
+
+def blended_score(item: Dict, item_type: str, keyword: str, semantic: float, weight: float) -> float:
+    """Skor keyword (dinormalisasi ke 0..1) dicampur cosine similarity semantic search dengan bobot `weight`"""
+    keyword_score = relevance_score(item, item_type, keyword) / sum(RELEVANCE_COLUMNS[item_type].values())
+    return round((1 - weight) * keyword_score + weight * max(semantic, 0.0), 4)
+
+class AsyncDatabase:
+    """
+    Facade async untuk DatabaseIntern, DatabaseJob dan DatabaseCourse.
+    Query dijalankan di thread pool khusus (tiap thread punya koneksi sendiri dari pool),
+    sehingga query lambat atau lock dari scraper tidak memblok event loop bot.
+    """
+
+    def __init__(self,
+                 db_intern: DatabaseIntern = None,
+                 db_job: DatabaseJob = None,
+                 db_course: DatabaseCourse = None,
+                 max_workers: int = None,
+                 query_timeout: float = None):
+        self.db_intern = db_intern or DatabaseIntern()
+        self.db_job = db_job or DatabaseJob()
+        self.db_course = db_course or DatabaseCourse()
+        self.db_search = DatabaseSearch(self.db_intern, self.db_job, self.db_course)
+
+        self.max_workers = max_workers or int(os.getenv("DB_MAX_WORKERS", 4))
+        self.query_timeout = query_timeout or float(os.getenv("DB_QUERY_TIMEOUT", 5))
+        self.fanout_timeout = float(os.getenv("DB_FANOUT_TIMEOUT", 3))
+        # Kandidat semantic search per hasil yang diminta (di-blend dengan hasil keyword)
+        self.semantic_candidates = int(os.getenv("SEMANTIC_CANDIDATES", 4))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db")
+        # Batasi query yang in-flight agar antrean executor tidak menumpuk
+        self._semaphore = asyncio.Semaphore(self.max_workers * 2)
+        if semantic_index.enabled:
+            # Model dan index dimuat di background agar query pertama tidak menunggu
+            self._executor.submit(semantic_index.warm_up)
+
+    def fts_enabled(self, item_type: str) -> bool:
+        """True jika kategori dicari lewat FTS: semua token keyword wajib ada, urutannya tidak berpengaruh"""
+        return self.db_search.fts_enabled.get(item_type, False)
+
+    async def _run_bounded(self, func: Callable, *args, **kwargs) -> Any:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def run(self, func: Callable, *args, timeout: float = None, **kwargs) -> Any:
+        """Jalankan fungsi database sinkron di executor dengan batas waktu per query"""
+        try:
+            return await asyncio.wait_for(
+                self._run_bounded(func, *args, **kwargs),
+                timeout or self.query_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Query {getattr(func, '__name__', func)} melewati {timeout or self.query_timeout} detik")
+            raise
+
+    async def search_magang(self, keyword: str = "", location: str = "", limit: int = 5,
+                            timeout: float = None, semantic_query: str = "", **filters) -> List[Dict]:
+        """filters: min_salary, deadline_before (lihat DatabaseIntern.search_magang)"""
+        items = await self.run(self.db_intern.search_magang, keyword, location, limit, timeout=timeout, **filters)
+        return await self._with_semantic("magang", items, semantic_query, keyword, location, limit, timeout, **filters)
+
+    async def search_jobs(self, keyword: str = "", location: str = "", limit: int = 5,
+                          timeout: float = None, semantic_query: str = "", **filters) -> List[Dict]:
+        """filters: min_salary (lihat DatabaseJob.search_jobs)"""
+        items = await self.run(self.db_job.search_jobs, keyword, location, limit, timeout=timeout, **filters)
+        return await self._with_semantic("pekerjaan", items, semantic_query, keyword, location, limit, timeout, **filters)
+
+    async def search_course(self, keyword: str = "", limit: int = 5,
+                            timeout: float = None, semantic_query: str = "") -> List[Dict]:
+        items = await self.run(self.db_course.search_course, keyword, limit, timeout=timeout)
+        return await self._with_semantic("kursus", items, semantic_query, keyword, "", limit, timeout)
+
+    def _semantic_blend(self, item_type: str, items: List[Dict], query: str, keyword: str,
+                        location: str, limit: int, **filters) -> List[Dict]:
+        """
+        Tambahkan kandidat semantic search (dengan filter lokasi/gaji/deadline yang sama) ke hasil keyword,
+        lalu urutkan dengan skor gabungan. Dijalankan di executor karena embedding + matriks memakai CPU.
+        """
+        similarities = semantic_index.search(query, item_type, top_k=limit * self.semantic_candidates,
+                                             include_ids=[item["id"] for item in items])
+        known = {item["id"] for item in items}
+        extra = self.db_search.get_items(item_type, [item_id for item_id in similarities if item_id not in known],
+                                         location, **filters)
+
+        results = []
+        for item in items + [{key: value for key, value in item.items() if key != "type"} for item in extra]:
+            semantic = similarities.get(item["id"], 0.0)
+            results.append({**item, "semantic_score": round(semantic, 4),
+                            "score": blended_score(item, item_type, keyword, semantic, semantic_index.weight)})
+        results.sort(key=lambda item: item["score"], reverse=True)
+        return results[:limit]
+
+    async def _with_semantic(self, item_type: str, items: List[Dict], query: str, keyword: str,
+                             location: str, limit: int, timeout: float = None, **filters) -> List[Dict]:
+        """Blend dengan semantic search jika SEMANTIC_SEARCH aktif; jika gagal / timeout hasil keyword dipakai"""
+        if not semantic_index.enabled or not query:
+            return items
+        try:
+            return await self.run(self._semantic_blend, item_type, items, query, keyword, location, limit,
+                                  timeout=timeout, **filters)
+        except asyncio.TimeoutError:
+            return items
+        except Exception as e:
+            logger.error(f"❌ Semantic search {item_type} gagal: {str(e)}")
+            return items
+
+    async def search_all(self, keyword: str = "", location: str = "", limit: int = 3,
+                         timeout: float = None, semantic_query: str = "") -> List[Dict]:
+        """
+        Cari magang, pekerjaan dan kursus dalam satu query UNION lalu gabungkan dengan skor relevansi.
+        Jika melewati timeout, hasil kosong dikembalikan agar bot tetap bisa merespons.
+        """
+        timeout = timeout or self.fanout_timeout
+        try:
+            items = await self.run(self.db_search.search_all, keyword, location, limit, timeout=timeout)
+        except asyncio.TimeoutError:
+            return []
+
+        if semantic_index.enabled and semantic_query:
+            # Skor gabungan keyword + semantic per kategori (skala 0..1, sebanding antar kategori)
+            results = []
+            for item_type in DatabaseSearch.SOURCES:
+                typed = [item for item in items if item["type"] == item_type]
+                blended = await self._with_semantic(item_type, typed, semantic_query, keyword, location, limit, timeout)
+                results.extend({**item, "type": item_type} for item in blended)
+            results.sort(key=lambda item: item.get("score", 0.0), reverse=True)
+            return results
+
+        results = [
+            {**item, "score": relevance_score(item, item["type"], keyword, location)}
+            for item in items
+        ]
+        # sort stabil: skor sama tetap mengikuti urutan asli per kategori
+        results.sort(key=lambda item: item["score"], reverse=True)
+        return results
+
+    def close(self):
+        """Hentikan executor (query yang sedang berjalan dibiarkan selesai)"""
+        self._executor.shutdown(wait=False)
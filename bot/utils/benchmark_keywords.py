@@ -0,0 +1,99 @@
+"""
+Bandingkan EnhancedKeywordExtractor.extract (matcher terkompilasi) dengan implementasi lama
+(extract_reference) pada korpus query pengguna:
+
+    python -m bot.utils.benchmark_keywords
+    python -m bot.utils.benchmark_keywords --repeat 200 --file queries.txt   # satu query per baris
+
+Exit code 1 jika hasil kedua implementasi berbeda.
+"""
+import sys
+import time
+import argparse
+from typing import Callable, List
+from bot.utils.keywords_extraction import EnhancedKeywordExtractor
+
+# Contoh pesan pengguna bot (campuran Indonesia / Inggris, typo dan tanda baca dibiarkan)
+QUERIES = [
+    "magang IT jakarta",
+    "cari magang data science di bandung",
+    "Lowongan kerja backend developer golang Jakarta Selatan",
+    "ada info internship UI/UX designer remote?",
+    "loker fresh graduate akuntansi surabaya",
+    "kursus python untuk pemula",
+    "pelatihan digital marketing online bersertifikat",
+    "mau belajar machine learning, ada kursus ga?",
+    "lowongan part time content creator jogja",
+    "job full time software engineer di Kuningan",
+    "magang HR / talent acquisition di Semarang",
+    "cari kerja web developer laravel medan",
+    "internship marketing di kota kembang",
+    "lowongan kerja perawat rumah sakit makassar",
+    "bootcamp fullstack javascript react node",
+    "pekerjaan remote customer service wfh",
+    "magang akuntansi & audit KAP jakarta pusat",
+    "senior frontend dev vue.js hybrid jakarta",
+    "lowongan supply chain / procurement batam",
+    "kursus desain grafis photoshop illustrator",
+    "program management trainee bank 2025",
+    "aku mau cari magang di bali yang digital marketing",
+    "Saya lulusan baru teknik sipil, ada lowongan di balikpapan?",
+    "loker admin gudang palembang",
+    "cyber security engineer job",
+    "belajar data analyst dari nol",
+    "magang mobile developer flutter android",
+    "lowongan guru bahasa inggris di tangerang",
+    "kerja paruh waktu barista di kemang",
+    "cari kursus sertifikasi AWS cloud engineer",
+    "halo",
+    "terima kasih banyak ya",
+    "lowongan c++ / c# developer game",
+    "magang co-op engineering manufaktur",
+    "pekerjaan 3-5 years experience product manager",
+    "intern program teknik industri di cikarang",
+    "web dev internship yogyakarta",
+    "social media specialist freelance",
+    "business development manager surabaya full time",
+    "QA tester magang remote",
+]
+
+def _timeit(func: Callable, queries: List[str], repeat: int) -> float:
+    """Rata-rata mikrodetik per pesan"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - started) / (repeat * len(queries)) * 1_000_000
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bot.utils.benchmark_keywords")
+    parser.add_argument("--repeat", type=int, default=50, help="Jumlah pengulangan korpus (default 50)")
+    parser.add_argument("--file", help="File korpus, satu query per baris (default korpus bawaan)")
+    args = parser.parse_args(argv)
+
+    queries = QUERIES
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    started = time.perf_counter()
+    extractor = EnhancedKeywordExtractor()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    mismatches = 0
+    for query in queries:
+        compiled, reference = extractor.extract(query), extractor.extract_reference(query)
+        if compiled != reference:
+            mismatches += 1
+            print(f"BEDA: {query!r}\n  matcher: {compiled}\n  regex:   {reference}")
+
+    reference_us = _timeit(extractor.extract_reference, queries, args.repeat)
+    compiled_us = _timeit(extractor.extract, queries, args.repeat)
+    print(f"{len(queries)} query x {args.repeat} putaran (build matcher {build_ms:.1f} ms)")
+    print(f"regex lama : {reference_us:8.1f} µs/pesan")
+    print(f"matcher    : {compiled_us:8.1f} µs/pesan ({reference_us / compiled_us:.1f}x lebih cepat)")
+    print(f"hasil beda : {mismatches}")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
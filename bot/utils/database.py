@@ -1,68 +1,549 @@
+import re
+import json
+import time
 import sqlite3
-from datetime import datetime
+import logging
+import threading
+from datetime import datetime, date
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, List, Dict, Set, Tuple
+from bot.utils.normalize import parse_deadline, parse_salary, canonical_city, split_location
 import os
 from dotenv import load_dotenv
 
 # Load konfigurasi dari .env
 load_dotenv()
 
-def init_databases():
-    """Initialize database directories and paths"""
-    data_dir = Path(os.environ.get('DATABASE_PATH', './database/'))
-    data_dir.mkdir(exist_ok=True)
-    
-    # Set default database paths jika environment variables tidak ada
-    if not os.getenv('DB_INTERN'):
-        os.environ['DB_INTERN'] = str(data_dir / 'intern.db')
-    if not os.getenv('DB_JOB'):
-        os.environ['DB_JOB'] = str(data_dir / 'job.db')
-    if not os.getenv('DB_COURSE'):
-        os.environ['DB_COURSE'] = str(data_dir / 'course.db')
+logger = logging.getLogger(__name__)
+
+def init_databases() -> Path:
+    """
+    Path file database gabungan (magang, jobs, courses dan state scraper dalam satu file).
+    Default DATABASE_PATH/telebot.db, bisa diganti lewat DB_FILE.
+    """
+    data_dir = Path(os.getenv('DATABASE_PATH', './database/'))
+    db_file = Path(os.getenv('DB_FILE') or data_dir / 'telebot.db')
+    db_file.parent.mkdir(parents=True, exist_ok=True)
+    return db_file
+
+def legacy_database_files(table: str) -> List[Path]:
+    """File database lama (satu file per kategori) yang datanya diimpor ke database gabungan"""
+    data_dir = Path(os.getenv('DATABASE_PATH', './database/'))
+    candidates = {
+        "magang": [os.getenv('DB_INTERN'), data_dir / 'intern.db'],
+        "jobs": [os.getenv('DB_JOB'), data_dir / 'job.db', data_dir / 'jobs.db'],
+        "courses": [os.getenv('DB_COURSE'), data_dir / 'course.db'],
+    }[table]
+    files = [Path(path).resolve() for path in candidates if path]
+    return [path for path in dict.fromkeys(files) if path.is_file()]
+
+class ConnectionPool:
+    """
+    Pool koneksi SQLite yang long-lived.
+    Setiap thread memiliki koneksinya sendiri per file database (thread-local),
+    mode WAL membuat scraper yang menulis tidak memblok pembacaan oleh bot.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self.cache_size_kb = int(os.getenv("SQLITE_CACHE_SIZE_KB", 8192))
+        self.mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", 64 * 1024 * 1024))
+        self.busy_timeout_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """Buka koneksi baru dan terapkan PRAGMA sekali saja"""
+        # check_same_thread=False hanya agar close_all() bisa dipanggil saat shutdown,
+        # pemakaian tetap dibatasi satu thread lewat thread-local
+        conn = sqlite3.connect(
+            db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kb}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        logger.debug(f"Koneksi SQLite baru: {db_path} ({threading.current_thread().name})")
+        return conn
+
+    def get(self, db_path) -> sqlite3.Connection:
+        """Ambil koneksi milik thread saat ini, buat jika belum ada"""
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        key = str(db_path)
+        conn = connections.get(key)
+        if conn is None:
+            conn = self._connect(key)
+            connections[key] = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_thread(self):
+        """Tutup semua koneksi milik thread saat ini"""
+        connections = getattr(self._local, "connections", None) or {}
+        with self._lock:
+            for conn in connections.values():
+                if conn in self._connections:
+                    self._connections.remove(conn)
+                conn.close()
+        self._local.connections = {}
+
+    def close_all(self):
+        """Tutup semua koneksi di pool (dipanggil saat shutdown)"""
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    logger.warning(f"Gagal menutup koneksi SQLite: {str(e)}")
+            self._connections.clear()
+        self._local = threading.local()
+
+# Pool bersama untuk DatabaseIntern, DatabaseJob dan DatabaseCourse
+connection_pool = ConnectionPool()
+
+def _migrate(conn, component: str, migrations: List[Callable]) -> int:
+    """
+    Jalankan migrasi schema yang belum diterapkan untuk satu komponen (mis. tabel magang).
+    Versi komponen = jumlah migrasi yang sudah dijalankan, disimpan di tabel schema_version.
+    Setiap migrasi berjalan dalam satu transaksi; migrasi lama tidak boleh diubah, cukup tambah di akhir list.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            component TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    row = conn.execute("SELECT version FROM schema_version WHERE component = ?", (component,)).fetchone()
+    current = row[0] if row else 0
+
+    for version, migration in enumerate(migrations, start=1):
+        if version <= current:
+            continue
+        conn.commit()
+        try:
+            conn.execute("BEGIN")
+            migration(conn)
+            conn.execute("""
+                INSERT OR REPLACE INTO schema_version (component, version, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            """, (component, version))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Migrasi {component} versi {version} gagal")
+            raise
+        logger.info(f"🧱 Migrasi {component} v{version}: {(migration.__doc__ or migration.__name__).strip()}")
+    return max(current, len(migrations))
+
+# Query yang lebih lambat dari ini dicatat beserta query plan-nya
+SLOW_QUERY_MS = float(os.getenv("SQLITE_SLOW_QUERY_MS", 200))
+# Cek EXPLAIN QUERY PLAN sekali untuk setiap bentuk query (untuk development / CI)
+PLAN_CHECK = os.getenv("SQLITE_PLAN_CHECK", "false").lower() == "true"
+_checked_plans: Set[str] = set()
+
+def explain_query_plan(conn, sql: str, params=()) -> List[str]:
+    """Detail langkah EXPLAIN QUERY PLAN untuk sebuah query"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+def plan_warnings(plan: List[str]) -> List[str]:
+    """
+    Langkah plan yang tidak memakai index: full table scan atau sort hasil di temp B-tree.
+    Sort bm25 pada query FTS dan sort hasil filter rentang (SEARCH lewat index) wajar
+    karena hanya baris yang cocok yang diurutkan, jadi tidak dianggap masalah.
+    """
+    filtered = any("VIRTUAL TABLE" in step or step.startswith("SEARCH") for step in plan)
+    warnings = []
+    for step in plan:
+        # "SCAN (subquery-N)" hanya membaca hasil subquery (mis. UNION), bukan tabel
+        if step.startswith("SCAN") and "USING" not in step and "VIRTUAL TABLE" not in step \
+                and not step.startswith("SCAN (subquery"):
+            warnings.append(step)
+        elif "TEMP B-TREE" in step and not filtered:
+            warnings.append(step)
+    return warnings
+
+def _run_query(conn, sql: str, params=()) -> List[Dict]:
+    """Jalankan query pencarian; query lambat / tanpa index dicatat dengan query plan-nya"""
+    started = time.perf_counter()
+    rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    slow = elapsed_ms >= SLOW_QUERY_MS
+    if slow or (PLAN_CHECK and sql not in _checked_plans):
+        _checked_plans.add(sql)
+        plan = explain_query_plan(conn, sql, params)
+        warnings = plan_warnings(plan)
+        query = " ".join(sql.split())
+        if slow:
+            logger.warning(f"🐢 Query {elapsed_ms:.0f} ms: {query} | plan: {'; '.join(plan)}")
+        elif warnings:
+            logger.warning(f"🔍 Query tanpa index: {query} | {'; '.join(warnings)}")
+    return rows
+
+# "+" dan "#" bagian dari token agar "c++" / "c#" tidak menyusut menjadi "c"
+FTS_TOKENIZER = "unicode61 remove_diacritics 2 tokenchars '+#'"
+
+def _init_fts(conn, table: str, columns: List[str]) -> bool:
+    """
+    Buat FTS5 virtual table (external content) beserta trigger sinkronisasi.
+    Return False jika SQLite tidak mendukung FTS5.
+    """
+    fts_table = f"{table}_fts"
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+
+    exists = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (fts_table,)
+    ).fetchone()
+    if exists and FTS_TOKENIZER not in exists[0]:
+        # Index lama dengan tokenizer berbeda dibuat ulang dari tabel utama
+        conn.execute(f"DROP TABLE {fts_table}")
+        exists = None
+
+    try:
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                {cols}, content='{table}', content_rowid='id',
+                tokenize="{FTS_TOKENIZER}"
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 tidak tersedia untuk {table}, fallback ke LIKE: {str(e)}")
+        return False
+
+    # Trigger agar index selalu sinkron dengan tabel utama.
+    # Trigger update hanya re-index jika kolom FTS berubah (upsert scraper menyentuh setiap baris)
+    changed = " OR ".join(f"old.{c} IS NOT new.{c}" for c in columns)
+    conn.executescript(f"""
+        DROP TRIGGER IF EXISTS {table}_fts_au;
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} WHEN {changed} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END;
+    """)
+
+    # Index data lama yang sudah ada sebelum FTS dibuat
+    if not exists:
+        conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+    return True
+
+def _ensure_column(conn, table: str, column: str, definition: str) -> bool:
+    """Tambah kolom ke tabel lama jika belum ada. Return True jika kolom baru ditambahkan"""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column in columns:
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+def _ensure_retention_columns(conn, table: str):
+    """Kolom untuk last_seen tracking dan retention pada tabel lama"""
+    if _ensure_column(conn, table, "last_seen", "TIMESTAMP"):
+        conn.execute(f"UPDATE {table} SET last_seen = tanggal_scrape WHERE last_seen IS NULL")
+    # Jumlah crawl lengkap berturut-turut yang tidak lagi memuat listing ini
+    _ensure_column(conn, table, "missed_scrapes", "INTEGER NOT NULL DEFAULT 0")
+    _ensure_column(conn, table, "expired_at", "TIMESTAMP")
+
+def _create_listing_indexes(conn, table: str, key_columns: Tuple[str, str]):
+    """
+    Index untuk pola query yang umum:
+    - recency: ORDER BY tanggal_scrape DESC LIMIT n pada listing aktif tanpa sort penuh
+    - sumber: mark_missed (sumber + last_seen) dan get_known_keys (covering, tanpa baca tabel)
+    - expired_at: purge listing expired (parsial, agar planner tidak memakainya untuk expired_at IS NULL)
+    """
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{table}_recent
+        ON {table}(tanggal_scrape DESC) WHERE expired_at IS NULL
+    """)
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{table}_sumber
+        ON {table}(sumber, last_seen, {key_columns[0]}, {key_columns[1]})
+    """)
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{table}_expired_at
+        ON {table}(expired_at) WHERE expired_at IS NOT NULL
+    """)
+    conn.execute(f"ANALYZE {table}")
+
+def _deadline_iso(text: str, scraped_at: str = None):
+    """Deadline dalam format ISO; tahun yang tidak disebut ditebak relatif ke tanggal scraping"""
+    reference = datetime.fromisoformat(scraped_at[:10]).date() if scraped_at else None
+    deadline = parse_deadline(text, today=reference)
+    return deadline.isoformat() if deadline else None
+
+def _normalized_listing(item: Dict) -> Tuple:
+    """Kolom terstruktur hasil normalisasi: (gaji_min, gaji_max, gaji_currency, lokasi_kota)"""
+    return (*parse_salary(item.get('gaji')), canonical_city(item.get('lokasi')))
+
+def _ensure_normalized_columns(conn, table: str):
+    """
+    Kolom gaji numerik dan kota kanonik (backfill dari teks gaji/lokasi) beserta index-nya:
+    - kota + recency: filter lokasi tanpa LIKE dan tanpa sort
+    - mata uang + gaji_max: filter rentang gaji
+    """
+    for column, definition in (("gaji_min", "INTEGER"), ("gaji_max", "INTEGER"),
+                               ("gaji_currency", "TEXT"), ("lokasi_kota", "TEXT")):
+        _ensure_column(conn, table, column, definition)
+
+    rows = conn.execute(f"SELECT id, gaji, lokasi FROM {table}").fetchall()
+    conn.executemany(
+        f"UPDATE {table} SET gaji_min = ?, gaji_max = ?, gaji_currency = ?, lokasi_kota = ? WHERE id = ?",
+        [(*_normalized_listing(dict(row)), row['id']) for row in rows]
+    )
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{table}_kota_recent
+        ON {table}(lokasi_kota, tanggal_scrape DESC) WHERE expired_at IS NULL
+    """)
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{table}_gaji
+        ON {table}(gaji_currency, gaji_max) WHERE expired_at IS NULL AND gaji_max IS NOT NULL
+    """)
+
+def _listing_filters(location: str = "", min_salary: int = None, deadline_before: date = None,
+                     currency: str = "IDR", alias: str = "") -> Tuple[str, List[str], List]:
+    """
+    Filter terstruktur untuk magang/jobs lewat kolom hasil normalisasi.
+    Lokasi yang seluruhnya dikenali sebagai kota memakai lokasi_kota (index),
+    selain itu teks lokasi dikembalikan untuk dicocokkan seperti biasa.
+    Return (sisa teks lokasi, kondisi SQL, parameter).
+    """
+    conditions, params = [], []
+    cities, rest = split_location(location)
+    if cities and not rest:
+        conditions.append(f"{alias}lokasi_kota IN ({', '.join('?' * len(cities))})")
+        params.extend(cities)
+        location = ""
+    if min_salary:
+        conditions.append(f"{alias}gaji_currency = ? AND {alias}gaji_max >= ?")
+        params.extend([currency, int(min_salary)])
+    if deadline_before:
+        conditions.append(f"{alias}deadline_date BETWEEN date('now', 'localtime') AND ?")
+        params.append(deadline_before.isoformat())
+    return location, conditions, params
+
+def _mark_missed(conn, table: str, sumber: str, since: str) -> int:
+    """Naikkan missed_scrapes untuk listing sumber ini yang tidak terlihat sejak `since` (UTC)"""
+    cursor = conn.execute(f"""
+        UPDATE {table} SET missed_scrapes = missed_scrapes + 1
+        WHERE sumber = ? AND last_seen < ? AND expired_at IS NULL
+    """, (sumber, since))
+    conn.commit()
+    return cursor.rowcount
+
+def _expire_rows(conn, table: str, max_missed: int, max_age_hours: float = 0, deadline_column: str = None) -> int:
+    """
+    Tandai expired: tidak terlihat di max_missed crawl lengkap, last_seen lebih tua dari
+    max_age_hours (0 = nonaktif) atau deadline sudah lewat
+    """
+    condition = "missed_scrapes >= ?"
+    params = [max_missed]
+    if max_age_hours > 0:
+        # Sumber besar jarang crawl sampai akhir (SCRAPER_PAGE_BUDGET), jadi missed_scrapes tidak naik
+        condition += " OR last_seen < datetime('now', ?)"
+        params.append(f"-{float(max_age_hours)} hours")
+    if deadline_column:
+        condition += f" OR {deadline_column} < ?"
+        params.append(date.today().isoformat())
+    cursor = conn.execute(f"""
+        UPDATE {table} SET expired_at = CURRENT_TIMESTAMP
+        WHERE expired_at IS NULL AND ({condition})
+    """, params)
+    conn.commit()
+    return cursor.rowcount
+
+def _purge_expired(conn, table: str, grace_days: int, archive: bool = True) -> int:
+    """Hapus listing yang sudah expired lebih dari grace_days, opsional dipindah ke {table}_archive dulu"""
+    cutoff = f"-{int(grace_days)} days"
+    with conn:
+        if archive:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table}_archive AS SELECT * FROM {table} WHERE 0")
+            # Kolom yang ditambahkan belakangan ikut ditambahkan ke tabel arsip
+            archived = {row[1] for row in conn.execute(f"PRAGMA table_info({table}_archive)")}
+            for column in columns:
+                if column not in archived:
+                    conn.execute(f"ALTER TABLE {table}_archive ADD COLUMN {column}")
+            cols = ", ".join(columns)
+            conn.execute(f"""
+                INSERT INTO {table}_archive ({cols})
+                SELECT {cols} FROM {table}
+                WHERE expired_at IS NOT NULL AND expired_at < datetime('now', ?)
+            """, (cutoff,))
+        cursor = conn.execute(
+            f"DELETE FROM {table} WHERE expired_at IS NOT NULL AND expired_at < datetime('now', ?)", (cutoff,)
+        )
+    return cursor.rowcount
+
+def _import_legacy(conn, table: str) -> int:
+    """
+    Salin isi tabel dari file database lama ke database gabungan (sekali, lewat migrasi).
+    Hanya kolom yang ada di kedua sisi yang disalin, duplikat dilewati. File lama tidak diubah.
+    """
+    main_file = Path(conn.execute("PRAGMA database_list").fetchone()[2] or "").resolve()
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[1] != "id"]
+    imported = 0
+
+    for legacy_file in legacy_database_files(table):
+        if legacy_file == main_file:
+            continue
+        legacy = sqlite3.connect(f"{legacy_file.as_uri()}?mode=ro", uri=True)
+        try:
+            legacy_columns = {row[1] for row in legacy.execute(f"PRAGMA table_info({table})")}
+            common = [column for column in columns if column in legacy_columns]
+            if not common:
+                continue
+            select = list(common)
+            # File sebelum retention belum punya last_seen
+            if "last_seen" not in legacy_columns and "tanggal_scrape" in legacy_columns:
+                common.append("last_seen")
+                select.append("tanggal_scrape")
+            rows = legacy.execute(f"SELECT {', '.join(select)} FROM {table}").fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Gagal membaca {table} dari {legacy_file}: {str(e)}")
+            continue
+        finally:
+            legacy.close()
+
+        cursor = conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({', '.join(common)}) VALUES ({', '.join('?' * len(common))})", rows
+        )
+        imported += cursor.rowcount
+        logger.info(f"📦 {cursor.rowcount} baris {table} diimpor dari {legacy_file} (file lama boleh dihapus)")
+    return imported
+
+def _fts_terms(text: str) -> List[str]:
+    """Pecah teks menjadi token FTS (prefix match) yang aman dari syntax FTS5, "c++" / "c#" tetap utuh"""
+    return [f'"{token}"*' for token in re.findall(r"\w+[+#]*", text.lower())]
+
+def _build_fts_query(keyword: str = "", location: str = "", location_column: str = "lokasi") -> str:
+    """
+    Keyword dicocokkan per token (semua token wajib ada),
+    lokasi cukup salah satu token yang cocok di kolom lokasi.
+    """
+    parts = []
+    keyword_terms = _fts_terms(keyword)
+    if keyword_terms:
+        parts.append(" AND ".join(keyword_terms))
+    location_terms = _fts_terms(location)
+    if location_terms:
+        parts.append(f"{location_column} : ({' OR '.join(location_terms)})")
+    return " AND ".join(parts)
 
 class DatabaseIntern:
     def __init__(self):
-        # Pastikan database directories sudah diinisialisasi
-        init_databases()
-        self.db_path = Path(os.getenv("DB_INTERN"))
-        self.db_path.parent.mkdir(exist_ok=True)
+        self.db_path = init_databases()
         self._init_db()
 
     def _init_db(self):
-        """Buat tabel jika belum ada"""
+        """Buat / migrasi tabel"""
         with self._get_connection() as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS magang (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    sumber TEXT NOT NULL,
-                    perusahaan TEXT NOT NULL,
-                    posisi TEXT NOT NULL,
-                    lokasi TEXT,
-                    gaji TEXT,
-                    deadline TEXT,
-                    tanggal_scrape TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(perusahaan, posisi)  
-                )
-            """)
+            _migrate(conn, "magang", MAGANG_MIGRATIONS)
+            self.fts_enabled = _init_fts(conn, "magang", ["posisi", "perusahaan", "lokasi"])
             conn.commit()
 
+    @staticmethod
+    def _migration_create(conn):
+        """Tabel magang"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS magang (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sumber TEXT NOT NULL,
+                perusahaan TEXT NOT NULL,
+                posisi TEXT NOT NULL,
+                lokasi TEXT,
+                gaji TEXT,
+                deadline TEXT,
+                tanggal_scrape TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(perusahaan, posisi)  
+            )
+        """)
+
+    @staticmethod
+    def _migration_retention(conn):
+        """Kolom last_seen, retention dan deadline_date"""
+        _ensure_retention_columns(conn, "magang")
+        if _ensure_column(conn, "magang", "deadline_date", "DATE"):
+            # Parse deadline data lama sekali saja
+            rows = conn.execute("SELECT id, deadline, tanggal_scrape FROM magang").fetchall()
+            conn.executemany("UPDATE magang SET deadline_date = ? WHERE id = ?", [
+                (_deadline_iso(row['deadline'], row['tanggal_scrape']), row['id']) for row in rows
+            ])
+
+    @staticmethod
+    def _migration_indexes(conn):
+        """Index recency, sumber dan expired_at"""
+        _create_listing_indexes(conn, "magang", ("perusahaan", "posisi"))
+
+    @staticmethod
+    def _migration_import_legacy(conn):
+        """Impor data dari intern.db lama"""
+        if _import_legacy(conn, "magang"):
+            rows = conn.execute(
+                "SELECT id, deadline, tanggal_scrape FROM magang WHERE deadline_date IS NULL AND deadline IS NOT NULL"
+            ).fetchall()
+            conn.executemany("UPDATE magang SET deadline_date = ? WHERE id = ?", [
+                (_deadline_iso(row['deadline'], row['tanggal_scrape']), row['id']) for row in rows
+            ])
+
+    @staticmethod
+    def _migration_normalized(conn):
+        """Kolom gaji, kota dan index deadline"""
+        _ensure_normalized_columns(conn, "magang")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_magang_deadline ON magang(deadline_date) WHERE expired_at IS NULL"
+        )
+        conn.execute("ANALYZE magang")
+
+    @staticmethod
+    def _migration_renormalize(conn):
+        """Backfill ulang lokasi_kota setelah LOCATION_PATTERNS ditambah kota baru"""
+        _ensure_normalized_columns(conn, "magang")
+
     def _get_connection(self):
-        """Koneksi ke SQLite dengan hasil berupa dictionary"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Koneksi ke SQLite (dari pool) dengan hasil berupa dictionary"""
+        return connection_pool.get(self.db_path)
 
     def save_magang(self, data):
-        """Simpan data magang dari Kalibrr"""
+        """Simpan (upsert) data magang dari Kalibrr, listing yang sudah ada diperbarui"""
         if not data:
             return
         
         with self._get_connection() as conn:
             conn.executemany("""
-                INSERT OR IGNORE INTO magang 
-                (sumber, perusahaan, posisi, lokasi, gaji, deadline)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT INTO magang 
+                (sumber, perusahaan, posisi, lokasi, gaji, deadline, deadline_date,
+                 gaji_min, gaji_max, gaji_currency, lokasi_kota, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(perusahaan, posisi) DO UPDATE SET
+                    sumber = excluded.sumber,
+                    lokasi = excluded.lokasi,
+                    gaji = excluded.gaji,
+                    deadline = excluded.deadline,
+                    deadline_date = excluded.deadline_date,
+                    gaji_min = excluded.gaji_min,
+                    gaji_max = excluded.gaji_max,
+                    gaji_currency = excluded.gaji_currency,
+                    lokasi_kota = excluded.lokasi_kota,
+                    last_seen = excluded.last_seen,
+                    missed_scrapes = 0,
+                    expired_at = NULL
             """, [
                 (
                     item['sumber'],
@@ -71,21 +552,28 @@ class DatabaseIntern:
                     item['lokasi'],
                     item['gaji'],
                     item['deadline'],
+                    _deadline_iso(item['deadline']),
+                    *_normalized_listing(item),
                 ) for item in data
             ])
             conn.commit()
 
-    def search_magang(self, keyword: str = "", location: str = "", limit: int = 5) -> List[Dict]:
-        """Cari magang dengan parameter yang aman"""
+    def search_magang(self, keyword: str = "", location: str = "", limit: int = 5,
+                      min_salary: int = None, deadline_before: date = None) -> List[Dict]:
+        """Cari magang dengan parameter yang aman. Filter kota, gaji dan deadline memakai kolom hasil normalisasi"""
+        location_text, filters, params = _listing_filters(location, min_salary, deadline_before)
+        if self.fts_enabled and (keyword or location_text):
+            return self.search_magang_fts(keyword, location, limit, min_salary, deadline_before)
+        location = location_text
+
         with self._get_connection() as conn:
-            params = []
             query = "SELECT * FROM magang"
             
-            # Bangun klausa WHERE dinamis
-            conditions = []
+            # Bangun klausa WHERE dinamis (listing expired tidak ditampilkan)
+            conditions = ["expired_at IS NULL"] + filters
             if keyword:
-                conditions.append("(posisi LIKE ? OR perusahaan LIKE ? OR gaji LIKE ?)")
-                params.extend([f"%{keyword}%"] * 3)
+                conditions.append("(posisi LIKE ? OR perusahaan LIKE ?)")
+                params.extend([f"%{keyword}%"] * 2)
             if location:
                 conditions.append("lokasi LIKE ?")
                 params.append(f"%{location}%")
@@ -96,20 +584,74 @@ class DatabaseIntern:
             query += " ORDER BY tanggal_scrape DESC LIMIT ?"
             params.append(limit)
             
-            cursor = conn.execute(query, params)
-            return [dict(row) for row in cursor.fetchall()]
+            return _run_query(conn, query, params)
+
+    def get_known_keys(self, sumber: str) -> Set[Tuple[str, str]]:
+        """Pasangan (perusahaan, posisi) yang sudah tersimpan untuk satu sumber"""
+        with self._get_connection() as conn:
+            cursor = conn.execute("SELECT perusahaan, posisi FROM magang WHERE sumber = ?", (sumber,))
+            return {(row[0], row[1]) for row in cursor.fetchall()}
+
+    def mark_seen(self, keys: List[Tuple[str, str]]):
+        """Perbarui last_seen listing yang masih ada tapi tidak berubah"""
+        if not keys:
+            return
+        with self._get_connection() as conn:
+            conn.executemany(
+                "UPDATE magang SET last_seen = CURRENT_TIMESTAMP, missed_scrapes = 0, expired_at = NULL "
+                "WHERE perusahaan = ? AND posisi = ?", keys
+            )
+            conn.commit()
+
+    def mark_missed(self, sumber: str, since: str) -> int:
+        """Catat listing yang tidak muncul di crawl lengkap yang dimulai pada `since`"""
+        with self._get_connection() as conn:
+            return _mark_missed(conn, "magang", sumber, since)
+
+    def expire(self, max_missed: int, max_age_hours: float = 0) -> int:
+        """Tandai magang yang hilang dari sumber atau deadline-nya sudah lewat"""
+        with self._get_connection() as conn:
+            return _expire_rows(conn, "magang", max_missed, max_age_hours, deadline_column="deadline_date")
+
+    def purge_expired(self, grace_days: int, archive: bool = True) -> int:
+        with self._get_connection() as conn:
+            return _purge_expired(conn, "magang", grace_days, archive)
+
+    def search_magang_fts(self, keyword: str = "", location: str = "", limit: int = 5,
+                          min_salary: int = None, deadline_before: date = None) -> List[Dict]:
+        """Full-text search magang, diurutkan berdasarkan skor bm25"""
+        location, filters, params = _listing_filters(location, min_salary, deadline_before, alias="m.")
+        match = _build_fts_query(keyword, location)
+        if not match:
+            return []
+
+        with self._get_connection() as conn:
+            # Bobot bm25: posisi > perusahaan > lokasi
+            return _run_query(conn, f"""
+                SELECT m.*, bm25(magang_fts, 10.0, 5.0, 2.0) AS bm25
+                FROM magang_fts
+                JOIN magang m ON m.id = magang_fts.rowid
+                WHERE magang_fts MATCH ? AND m.expired_at IS NULL{"".join(" AND " + condition for condition in filters)}
+                ORDER BY bm25, m.tanggal_scrape DESC
+                LIMIT ?
+            """, (match, *params, limit))
 
 class DatabaseJob:
     def __init__(self):
-        init_databases()
-        self.db_path = Path(os.getenv('DB_JOB'))
-        self.db_path.parent.mkdir(exist_ok=True)
+        self.db_path = init_databases()
         self._init_db()
     
     def _init_db(self):
-        """Buat tabel jika belum ada"""
+        """Buat / migrasi tabel"""
         with self._get_connection() as conn:
-            conn.execute("""
+            _migrate(conn, "jobs", JOBS_MIGRATIONS)
+            self.fts_enabled = _init_fts(conn, "jobs", ["posisi", "perusahaan", "lokasi", "job_type"])
+            conn.commit()
+
+    @staticmethod
+    def _migration_create(conn):
+        """Tabel jobs"""
+        conn.execute("""
             CREATE TABLE IF NOT EXISTS jobs(
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             sumber TEXT,
@@ -119,24 +661,64 @@ class DatabaseJob:
             gaji TEXT,
             job_type TEXT,
             tanggal_scrape TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             UNIQUE(perusahaan, posisi) 
             )
         """)
-            conn.commit()
+
+    @staticmethod
+    def _migration_retention(conn):
+        """Kolom last_seen dan retention"""
+        _ensure_retention_columns(conn, "jobs")
+
+    @staticmethod
+    def _migration_indexes(conn):
+        """Index recency, sumber dan expired_at"""
+        _create_listing_indexes(conn, "jobs", ("perusahaan", "posisi"))
+
+    @staticmethod
+    def _migration_import_legacy(conn):
+        """Impor data dari job.db / jobs.db lama"""
+        _import_legacy(conn, "jobs")
+
+    @staticmethod
+    def _migration_normalized(conn):
+        """Kolom gaji dan kota"""
+        _ensure_normalized_columns(conn, "jobs")
+        conn.execute("ANALYZE jobs")
+
+    @staticmethod
+    def _migration_renormalize(conn):
+        """Backfill ulang lokasi_kota setelah LOCATION_PATTERNS ditambah kota baru"""
+        _ensure_normalized_columns(conn, "jobs")
 
     def _get_connection(self):
-        """Koneksi ke SQLite dengan hasil berupa dictionary"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Koneksi ke SQLite (dari pool) dengan hasil berupa dictionary"""
+        return connection_pool.get(self.db_path)
     
     def save_jobs(self, data):
-        """Simpan data magang dari Glints"""
+        """Simpan (upsert) data pekerjaan dari Glints, listing yang sudah ada diperbarui"""
+        if not data:
+            return
+
         with self._get_connection() as conn:
             conn.executemany("""
-        INSERT OR IGNORE INTO jobs
-        (sumber, perusahaan, posisi, lokasi, gaji, job_type) 
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO jobs
+        (sumber, perusahaan, posisi, lokasi, gaji, job_type,
+         gaji_min, gaji_max, gaji_currency, lokasi_kota, last_seen)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(perusahaan, posisi) DO UPDATE SET
+            sumber = excluded.sumber,
+            lokasi = excluded.lokasi,
+            gaji = excluded.gaji,
+            job_type = excluded.job_type,
+            gaji_min = excluded.gaji_min,
+            gaji_max = excluded.gaji_max,
+            gaji_currency = excluded.gaji_currency,
+            lokasi_kota = excluded.lokasi_kota,
+            last_seen = excluded.last_seen,
+            missed_scrapes = 0,
+            expired_at = NULL
         """, [
             (
                 item['sumber'],
@@ -145,22 +727,27 @@ class DatabaseJob:
                 item['lokasi'],
                 item['gaji'],
                 item['job_type'],
+                *_normalized_listing(item),
             ) for item in data
         ])
+            conn.commit()
 
-        conn.commit()
+    def search_jobs(self, keyword: str = "", location: str = "", limit: int = 5,
+                    min_salary: int = None) -> List[Dict]:
+        """Cari magang dengan parameter yang aman. Filter kota dan gaji memakai kolom hasil normalisasi"""
+        location_text, filters, params = _listing_filters(location, min_salary)
+        if self.fts_enabled and (keyword or location_text):
+            return self.search_jobs_fts(keyword, location, limit, min_salary)
+        location = location_text
 
-    def search_jobs(self, keyword: str = "", location: str = "", limit: int = 5) -> List[Dict]:
-        """Cari magang dengan parameter yang aman"""
         with self._get_connection() as conn:
-            params = []
             query = "SELECT * FROM jobs"
             
-            # Bangun klausa WHERE dinamis
-            conditions = []
+            # Bangun klausa WHERE dinamis (listing expired tidak ditampilkan)
+            conditions = ["expired_at IS NULL"] + filters
             if keyword:
-                conditions.append("(posisi LIKE ? OR perusahaan LIKE ? OR gaji LIKE ?)")
-                params.extend([f"%{keyword}%"] * 3)
+                conditions.append("(posisi LIKE ? OR perusahaan LIKE ?)")
+                params.extend([f"%{keyword}%"] * 2)
             if location:
                 conditions.append("lokasi LIKE ?")
                 params.append(f"%{location}%")
@@ -171,47 +758,121 @@ class DatabaseJob:
             query += " ORDER BY tanggal_scrape DESC LIMIT ?"
             params.append(limit)
             
-            cursor = conn.execute(query, params)
-            return [dict(row) for row in cursor.fetchall()]
+            return _run_query(conn, query, params)
+
+    def get_known_keys(self, sumber: str) -> Set[Tuple[str, str]]:
+        """Pasangan (perusahaan, posisi) yang sudah tersimpan untuk satu sumber"""
+        with self._get_connection() as conn:
+            cursor = conn.execute("SELECT perusahaan, posisi FROM jobs WHERE sumber = ?", (sumber,))
+            return {(row[0], row[1]) for row in cursor.fetchall()}
+
+    def mark_seen(self, keys: List[Tuple[str, str]]):
+        """Perbarui last_seen listing yang masih ada tapi tidak berubah"""
+        if not keys:
+            return
+        with self._get_connection() as conn:
+            conn.executemany(
+                "UPDATE jobs SET last_seen = CURRENT_TIMESTAMP, missed_scrapes = 0, expired_at = NULL "
+                "WHERE perusahaan = ? AND posisi = ?", keys
+            )
+            conn.commit()
+
+    def mark_missed(self, sumber: str, since: str) -> int:
+        """Catat listing yang tidak muncul di crawl lengkap yang dimulai pada `since`"""
+        with self._get_connection() as conn:
+            return _mark_missed(conn, "jobs", sumber, since)
+
+    def expire(self, max_missed: int, max_age_hours: float = 0) -> int:
+        """Tandai pekerjaan yang sudah hilang dari sumber"""
+        with self._get_connection() as conn:
+            return _expire_rows(conn, "jobs", max_missed, max_age_hours)
+
+    def purge_expired(self, grace_days: int, archive: bool = True) -> int:
+        with self._get_connection() as conn:
+            return _purge_expired(conn, "jobs", grace_days, archive)
+
+    def search_jobs_fts(self, keyword: str = "", location: str = "", limit: int = 5,
+                        min_salary: int = None) -> List[Dict]:
+        """Full-text search jobs, diurutkan berdasarkan skor bm25"""
+        location, filters, params = _listing_filters(location, min_salary, alias="j.")
+        match = _build_fts_query(keyword, location)
+        if not match:
+            return []
+
+        with self._get_connection() as conn:
+            # Bobot bm25: posisi > perusahaan > lokasi > job_type
+            return _run_query(conn, f"""
+                SELECT j.*, bm25(jobs_fts, 10.0, 5.0, 2.0, 1.0) AS bm25
+                FROM jobs_fts
+                JOIN jobs j ON j.id = jobs_fts.rowid
+                WHERE jobs_fts MATCH ? AND j.expired_at IS NULL{"".join(" AND " + condition for condition in filters)}
+                ORDER BY bm25, j.tanggal_scrape DESC
+                LIMIT ?
+            """, (match, *params, limit))
 
 class DatabaseCourse:
     def __init__(self):
-        init_databases()
-        self.db_path = Path(os.getenv('DB_COURSE'))
-        self.db_path.parent.mkdir(exist_ok=True)
+        self.db_path = init_databases()
         self._init_db()
     
     def _init_db(self):
+        """Buat / migrasi tabel"""
         with self._get_connection() as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS courses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    sumber TEXT,
-                    title TEXT,
-                    duration TEXT,
-                    module_total TEXT,
-                    tanggal_scrape TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(title, duration) 
-                )
-            """)
+            _migrate(conn, "courses", COURSES_MIGRATIONS)
+            self.fts_enabled = _init_fts(conn, "courses", ["title", "sumber"])
             conn.commit()
+
+    @staticmethod
+    def _migration_create(conn):
+        """Tabel courses"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS courses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sumber TEXT,
+                title TEXT,
+                duration TEXT,
+                module_total TEXT,
+                tanggal_scrape TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(title, duration) 
+            )
+        """)
+
+    @staticmethod
+    def _migration_retention(conn):
+        """Kolom last_seen dan retention"""
+        _ensure_retention_columns(conn, "courses")
+
+    @staticmethod
+    def _migration_indexes(conn):
+        """Index recency, sumber dan expired_at"""
+        _create_listing_indexes(conn, "courses", ("title", "duration"))
+
+    @staticmethod
+    def _migration_import_legacy(conn):
+        """Impor data dari course.db lama"""
+        _import_legacy(conn, "courses")
             
     def _get_connection(self):
-        """Koneksi ke SQLite dengan hasil berupa dictionary"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Koneksi ke SQLite (dari pool) dengan hasil berupa dictionary"""
+        return connection_pool.get(self.db_path)
     
     def save_courses(self, data):
-        """Simpan data course dari Dicoding"""
+        """Simpan (upsert) data course dari Dicoding, kursus yang sudah ada diperbarui"""
         if not data:
             return
             
         with self._get_connection() as conn:
             conn.executemany("""
-                INSERT OR IGNORE INTO courses 
-                (sumber, title, duration, module_total) 
-                VALUES (?, ?, ?, ?)
+                INSERT INTO courses 
+                (sumber, title, duration, module_total, last_seen) 
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(title, duration) DO UPDATE SET
+                    sumber = excluded.sumber,
+                    module_total = excluded.module_total,
+                    last_seen = excluded.last_seen,
+                    missed_scrapes = 0,
+                    expired_at = NULL
             """, [
                 (
                     item['sumber'],
@@ -224,16 +885,377 @@ class DatabaseCourse:
 
     def search_course(self, keyword: str = "", limit: int = 5) -> List[Dict]:
         """Implementasi untuk kursus (tanpa lokasi)"""
+        if self.fts_enabled and keyword:
+            return self.search_course_fts(keyword, limit)
+
         with self._get_connection() as conn:
-            query = "SELECT * FROM courses"
+            query = "SELECT * FROM courses WHERE expired_at IS NULL"
             params = []
             
             if keyword:
-                query += " WHERE (title LIKE ? OR sumber LIKE ? OR duration LIKE ?)"
+                query += " AND (title LIKE ? OR sumber LIKE ? OR duration LIKE ?)"
                 params.extend([f"%{keyword}%"] * 3)
                 
             query += " ORDER BY tanggal_scrape DESC LIMIT ?"
             params.append(limit)
             
-            cursor = conn.execute(query, params)
+            return _run_query(conn, query, params)
+
+    def get_known_keys(self, sumber: str) -> Set[Tuple[str, str]]:
+        """Pasangan (title, duration) yang sudah tersimpan untuk satu sumber"""
+        with self._get_connection() as conn:
+            cursor = conn.execute("SELECT title, duration FROM courses WHERE sumber = ?", (sumber,))
+            return {(row[0], row[1]) for row in cursor.fetchall()}
+
+    def mark_seen(self, keys: List[Tuple[str, str]]):
+        """Perbarui last_seen kursus yang masih ada tapi tidak berubah"""
+        if not keys:
+            return
+        with self._get_connection() as conn:
+            conn.executemany(
+                "UPDATE courses SET last_seen = CURRENT_TIMESTAMP, missed_scrapes = 0, expired_at = NULL "
+                "WHERE title = ? AND duration = ?", keys
+            )
+            conn.commit()
+
+    def mark_missed(self, sumber: str, since: str) -> int:
+        """Catat kursus yang tidak muncul di crawl lengkap yang dimulai pada `since`"""
+        with self._get_connection() as conn:
+            return _mark_missed(conn, "courses", sumber, since)
+
+    def expire(self, max_missed: int, max_age_hours: float = 0) -> int:
+        """Tandai kursus yang sudah hilang dari sumber"""
+        with self._get_connection() as conn:
+            return _expire_rows(conn, "courses", max_missed, max_age_hours)
+
+    def purge_expired(self, grace_days: int, archive: bool = True) -> int:
+        with self._get_connection() as conn:
+            return _purge_expired(conn, "courses", grace_days, archive)
+
+    def search_course_fts(self, keyword: str = "", limit: int = 5) -> List[Dict]:
+        """Full-text search kursus, diurutkan berdasarkan skor bm25"""
+        match = _build_fts_query(keyword)
+        if not match:
+            return []
+
+        with self._get_connection() as conn:
+            return _run_query(conn, """
+                SELECT c.*, bm25(courses_fts, 10.0, 1.0) AS bm25
+                FROM courses_fts
+                JOIN courses c ON c.id = courses_fts.rowid
+                WHERE courses_fts MATCH ? AND c.expired_at IS NULL
+                ORDER BY bm25, c.tanggal_scrape DESC
+                LIMIT ?
+            """, (match, limit))
+
+# Urutan migrasi per tabel: hanya boleh ditambah di akhir
+MAGANG_MIGRATIONS = [
+    DatabaseIntern._migration_create,
+    DatabaseIntern._migration_retention,
+    DatabaseIntern._migration_indexes,
+    DatabaseIntern._migration_import_legacy,
+    DatabaseIntern._migration_normalized,
+    DatabaseIntern._migration_renormalize,
+]
+JOBS_MIGRATIONS = [
+    DatabaseJob._migration_create,
+    DatabaseJob._migration_retention,
+    DatabaseJob._migration_indexes,
+    DatabaseJob._migration_import_legacy,
+    DatabaseJob._migration_normalized,
+    DatabaseJob._migration_renormalize,
+]
+COURSES_MIGRATIONS = [
+    DatabaseCourse._migration_create,
+    DatabaseCourse._migration_retention,
+    DatabaseCourse._migration_indexes,
+    DatabaseCourse._migration_import_legacy,
+]
+
+class DatabaseSearch:
+    """
+    Pencarian lintas kategori (magang, pekerjaan, kursus) dalam satu query UNION ALL,
+    karena ketiga tabel sekarang berada di satu file database.
+    """
+
+    # tipe item -> (tabel, bobot bm25 per kolom FTS, kolom LIKE keyword, punya kolom lokasi)
+    SOURCES = {
+        "magang": ("magang", (10.0, 5.0, 2.0), ("posisi", "perusahaan"), True),
+        "pekerjaan": ("jobs", (10.0, 5.0, 2.0, 1.0), ("posisi", "perusahaan"), True),
+        "kursus": ("courses", (10.0, 1.0), ("title", "sumber", "duration"), False),
+    }
+
+    def __init__(self, db_intern: DatabaseIntern = None, db_job: DatabaseJob = None,
+                 db_course: DatabaseCourse = None):
+        # Instance per kategori memastikan tabel, migrasi dan FTS sudah siap
+        databases = {
+            "magang": db_intern or DatabaseIntern(),
+            "pekerjaan": db_job or DatabaseJob(),
+            "kursus": db_course or DatabaseCourse(),
+        }
+        self.db_path = init_databases()
+        self.fts_enabled = {item_type: db.fts_enabled for item_type, db in databases.items()}
+        with self._get_connection() as conn:
+            self.columns = {
+                item_type: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+                for item_type, (table, _, _, _) in self.SOURCES.items()
+            }
+
+    def _get_connection(self):
+        """Koneksi ke SQLite (dari pool) dengan hasil berupa dictionary"""
+        return connection_pool.get(self.db_path)
+
+    def _subquery(self, item_type: str, keyword: str, location: str):
+        """SELECT per kategori (maks `limit` baris), None jika query tidak menghasilkan token"""
+        table, weights, like_columns, has_location = self.SOURCES[item_type]
+        # Lokasi berupa kota yang dikenali difilter lewat lokasi_kota (index), bukan teks
+        location, filters, params = _listing_filters(location, alias="t.") if has_location else ("", [], [])
+        if not keyword and not location:
+            conditions = " AND ".join(["expired_at IS NULL"] + filters)
+            return f"SELECT * FROM {table} t WHERE {conditions} ORDER BY tanggal_scrape DESC LIMIT ?", params
+
+        if self.fts_enabled[item_type]:
+            match = _build_fts_query(keyword, location)
+            if not match:
+                return None
+            return f"""
+                SELECT t.* FROM {table}_fts
+                JOIN {table} t ON t.id = {table}_fts.rowid
+                WHERE {table}_fts MATCH ? AND t.expired_at IS NULL{"".join(" AND " + condition for condition in filters)}
+                ORDER BY bm25({table}_fts, {", ".join(map(str, weights))}), t.tanggal_scrape DESC
+                LIMIT ?
+            """, [match] + params
+
+        conditions = ["expired_at IS NULL"] + filters
+        if keyword:
+            conditions.append("(" + " OR ".join(f"{column} LIKE ?" for column in like_columns) + ")")
+            params.extend([f"%{keyword}%"] * len(like_columns))
+        if location:
+            conditions.append("lokasi LIKE ?")
+            params.append(f"%{location}%")
+        return f"SELECT * FROM {table} t WHERE {' AND '.join(conditions)} ORDER BY tanggal_scrape DESC LIMIT ?", params
+
+    def search_all(self, keyword: str = "", location: str = "", limit: int = 3) -> List[Dict]:
+        """Maks `limit` hasil per kategori, setiap item diberi kunci `type`"""
+        parts, params = [], []
+        for item_type in self.SOURCES:
+            subquery = self._subquery(item_type, keyword, location)
+            if subquery is None:
+                continue
+            sql, sub_params = subquery
+            # Kolom tiap tabel berbeda, jadi setiap baris dibungkus sebagai objek JSON
+            fields = ", ".join(f"'{column}', {column}" for column in self.columns[item_type])
+            parts.append(f"SELECT '{item_type}' AS type, json_object({fields}) AS item FROM ({sql})")
+            params.extend(sub_params + [limit])
+
+        if not parts:
+            return []
+        with self._get_connection() as conn:
+            rows = _run_query(conn, " UNION ALL ".join(parts), params)
+        return [{**json.loads(row['item']), "type": row['type']} for row in rows]
+
+    def get_items(self, item_type: str, ids: List[int], location: str = "",
+                  min_salary: int = None, deadline_before: date = None) -> List[Dict]:
+        """Listing aktif berdasarkan id (kandidat semantic search), dengan filter yang sama seperti pencarian biasa"""
+        if not ids:
+            return []
+        table, _, _, has_location = self.SOURCES[item_type]
+        conditions = [f"id IN ({', '.join('?' * len(ids))})", "expired_at IS NULL"]
+        params = list(ids)
+        if has_location:
+            # deadline_date hanya ada di tabel magang
+            location, filters, filter_params = _listing_filters(
+                location, min_salary, deadline_before if table == "magang" else None
+            )
+            conditions += filters
+            params += filter_params
+            if location:
+                conditions.append("lokasi LIKE ?")
+                params.append(f"%{location}%")
+        with self._get_connection() as conn:
+            rows = _run_query(conn, f"SELECT * FROM {table} WHERE {' AND '.join(conditions)}", params)
+        return [{**row, "type": item_type} for row in rows]
+
+class EmbeddingStore:
+    """
+    Embedding listing untuk semantic search, disimpan sebagai vektor int8 (+ skala per baris)
+    di file database yang sama. text_hash menandai teks yang sudah di-embed,
+    sehingga hanya listing baru / berubah yang perlu di-embed ulang.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else init_databases()
+        self._init_db()
+
+    def _init_db(self):
+        with self._get_connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS listing_embeddings (
+                    item_type TEXT NOT NULL,
+                    item_id INTEGER NOT NULL,
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    scale REAL NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (item_type, item_id)
+                );
+            """)
+            conn.commit()
+
+    def _get_connection(self):
+        """Koneksi ke SQLite (dari pool) dengan hasil berupa dictionary"""
+        return connection_pool.get(self.db_path)
+
+    def listing_texts(self, item_type: str, columns: Tuple[str, ...]) -> List[Dict]:
+        """Teks listing aktif per tipe beserta hash embedding yang tersimpan (jika ada)"""
+        table = DatabaseSearch.SOURCES[item_type][0]
+        fields = ", ".join(f"t.{column}" for column in columns)
+        with self._get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT t.id, {fields}, e.model, e.text_hash
+                FROM {table} t
+                LEFT JOIN listing_embeddings e ON e.item_type = ? AND e.item_id = t.id
+                WHERE t.expired_at IS NULL
+            """, (item_type,))
             return [dict(row) for row in cursor.fetchall()]
+
+    def save(self, item_type: str, model: str, rows: List[Tuple[int, str, float, bytes]]):
+        """Simpan embedding (item_id, text_hash, scale, vector int8)"""
+        with self._get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO listing_embeddings (item_type, item_id, model, text_hash, scale, vector)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(item_type, item_id) DO UPDATE SET
+                    model = excluded.model, text_hash = excluded.text_hash,
+                    scale = excluded.scale, vector = excluded.vector
+            """, [(item_type, item_id, model, text_hash, scale, vector)
+                  for item_id, text_hash, scale, vector in rows])
+            conn.commit()
+
+    def prune(self, item_type: str) -> int:
+        """Hapus embedding listing yang sudah tidak ada di tabel (dipindah ke arsip)"""
+        table = DatabaseSearch.SOURCES[item_type][0]
+        with self._get_connection() as conn:
+            cursor = conn.execute(f"""
+                DELETE FROM listing_embeddings
+                WHERE item_type = ? AND item_id NOT IN (SELECT id FROM {table})
+            """, (item_type,))
+            conn.commit()
+            return cursor.rowcount
+
+    def load(self, model: str) -> List[Dict]:
+        """Embedding semua listing aktif untuk model ini, dikelompokkan per tipe"""
+        parts = [
+            f"SELECT e.item_type, e.item_id, e.scale, e.vector FROM listing_embeddings e "
+            f"JOIN {table} t ON t.id = e.item_id "
+            f"WHERE e.item_type = '{item_type}' AND e.model = ? AND t.expired_at IS NULL"
+            for item_type, (table, _, _, _) in DatabaseSearch.SOURCES.items()
+        ]
+        with self._get_connection() as conn:
+            cursor = conn.execute(" UNION ALL ".join(parts), [model] * len(parts))
+            return [dict(row) for row in cursor.fetchall()]
+
+class ScrapeStateStore:
+    """Fingerprint per sumber (halaman dan listing) untuk scraping incremental"""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._init_db()
+
+    def _init_db(self):
+        with self._get_connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS scrape_pages (
+                    sumber TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    item_keys TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (sumber, url)
+                );
+                CREATE TABLE IF NOT EXISTS scrape_items (
+                    sumber TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    item_hash TEXT,
+                    card_hash TEXT,
+                    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (sumber, item_key)
+                );
+                CREATE TABLE IF NOT EXISTS scrape_runs (
+                    sumber TEXT PRIMARY KEY,
+                    last_full_crawl TIMESTAMP
+                );
+            """)
+            conn.commit()
+
+    def _get_connection(self):
+        """Koneksi ke SQLite (dari pool) dengan hasil berupa dictionary"""
+        return connection_pool.get(self.db_path)
+
+    def load_pages(self, sumber: str) -> Dict[str, Dict]:
+        """State terakhir setiap halaman listing (ETag, Last-Modified, hash konten)"""
+        with self._get_connection() as conn:
+            cursor = conn.execute("SELECT * FROM scrape_pages WHERE sumber = ?", (sumber,))
+            pages = {}
+            for row in cursor.fetchall():
+                page = dict(row)
+                page['item_keys'] = json.loads(page['item_keys'] or "[]")
+                pages[page['url']] = page
+            return pages
+
+    def load_items(self, sumber: str) -> Dict[str, Dict]:
+        """Fingerprint listing yang pernah terlihat: item_key -> {item_hash, card_hash}"""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT item_key, item_hash, card_hash FROM scrape_items WHERE sumber = ?", (sumber,)
+            )
+            return {row['item_key']: {'item_hash': row['item_hash'], 'card_hash': row['card_hash']}
+                    for row in cursor.fetchall()}
+
+    def hours_since_full_crawl(self, sumber: str):
+        """Jam sejak crawl terakhir yang sampai akhir listing (None jika belum pernah)"""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT (julianday('now') - julianday(last_full_crawl)) * 24 AS hours FROM scrape_runs WHERE sumber = ?",
+                (sumber,)
+            ).fetchone()
+            return row['hours'] if row else None
+
+    def save_run(self, sumber: str, pages: List[Dict], items: List[Dict],
+                 seen_keys: List[str], removed_keys: List[str], complete: bool = False):
+        """Simpan hasil satu run dalam satu transaksi"""
+        with self._get_connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO scrape_pages
+                (sumber, url, etag, last_modified, content_hash, item_keys, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, [
+                (sumber, page['url'], page.get('etag'), page.get('last_modified'),
+                 page.get('content_hash'), json.dumps(page.get('item_keys', [])))
+                for page in pages
+            ])
+            conn.executemany("""
+                INSERT OR REPLACE INTO scrape_items
+                (sumber, item_key, item_hash, card_hash, last_seen)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, [
+                (sumber, item['item_key'], item['item_hash'], item.get('card_hash'))
+                for item in items
+            ])
+            # Listing yang tidak berubah tetap dicatat terlihat di run ini
+            conn.executemany(
+                "UPDATE scrape_items SET last_seen = CURRENT_TIMESTAMP WHERE sumber = ? AND item_key = ?",
+                [(sumber, key) for key in seen_keys]
+            )
+            conn.executemany(
+                "DELETE FROM scrape_items WHERE sumber = ? AND item_key = ?",
+                [(sumber, key) for key in removed_keys]
+            )
+            if complete:
+                conn.execute("""
+                    INSERT OR REPLACE INTO scrape_runs (sumber, last_full_crawl)
+                    VALUES (?, CURRENT_TIMESTAMP)
+                """, (sumber,))
+            conn.commit()
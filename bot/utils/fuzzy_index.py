@@ -0,0 +1,126 @@
+import os
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+from rapidfuzz.distance import OSA
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """Semua variasi kata dengan menghapus sampai `distance` huruf (termasuk kata itu sendiri)"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+# Kata pekerjaan umum berbahasa Indonesia yang mirip term kosakata (kasir ~ karir,
+# wartawan ~ karyawan, logistik ~ logistics) dan tidak boleh "dikoreksi"
+PROTECTED_WORDS = frozenset({
+    'kasir', 'kurir', 'wartawan', 'gaming', 'animator', 'industri', 'logistik', 'kreator',
+    'sopir', 'supir', 'satpam', 'perawat', 'bidan', 'dokter', 'apoteker', 'akuntan', 'teknisi',
+    'montir', 'mekanik', 'pelayan', 'barista', 'penjahit', 'tukang', 'mandor', 'penulis',
+    'penerjemah', 'fotografer', 'videografer', 'desainer', 'editor', 'operator', 'pramugari',
+    'pramuniaga', 'resepsionis', 'sekretaris', 'penyiar', 'peneliti', 'petani', 'nelayan',
+    'pengajar', 'instruktur', 'konsultan', 'arsitek', 'apotek', 'farmasi', 'perbankan',
+    'perhotelan', 'pertambangan', 'perkebunan', 'konstruksi', 'kuliner', 'otomotif',
+})
+
+class FuzzyIndex:
+    """
+    Lookup kata yang salah ketik ("jakrta", "progammer", "magng") ke kosakata yang dikenal.
+
+    Index SymSpell: setiap term kosakata disimpan bersama semua hasil penghapusan sampai
+    max_distance huruf. Saat lookup cukup membuat variasi hapus dari kata input lalu
+    mencocokkannya ke dict, jadi biaya lookup tidak bergantung pada besar kosakata.
+    Kandidat diverifikasi dengan jarak OSA (Damerau-Levenshtein terbatas) dari RapidFuzz.
+
+    Term frasa ("kelapa gading", "data scientist") diindex utuh dan dicocokkan dengan
+    rangkaian kata input sepanjang frasa itu; potongan katanya hanya dianggap kata yang dikenal.
+    """
+
+    def __init__(self, vocabulary: Iterable[str], max_distance: int = None, min_length: int = None):
+        self.max_distance = max_distance if max_distance is not None else int(os.getenv("FUZZY_MAX_DISTANCE", 2))
+        # Kata pendek terlalu mudah "dikoreksi" ke kata lain, jadi tidak dicari
+        self.min_length = min_length or int(os.getenv("FUZZY_MIN_LENGTH", 5))
+        self.words: Dict[str, int] = {}       # term -> urutan (prioritas jika jarak sama)
+        self.tokens: Set[str] = set()         # semua kata di dalam term, tidak pernah dikoreksi
+        self.max_words = 1
+        self._index: Dict[str, List[str]] = {}
+
+        for term in vocabulary:
+            if term in self.words or not term.replace(" ", "").isalpha():
+                continue
+            self.words[term] = len(self.words)
+            self.tokens.update(term.split(" "))
+            self.max_words = max(self.max_words, term.count(" ") + 1)
+            for variant in _deletes(term, self._allowed_distance(term)):
+                self._index.setdefault(variant, []).append(term)
+
+    def _allowed_distance(self, word: str) -> int:
+        """Jarak maksimum per panjang kata: 1 untuk kata pendek, max_distance untuk kata >= 8 huruf"""
+        return min(self.max_distance, 1 if len(word) < 8 else 2)
+
+    def lookup(self, word: str) -> Optional[Tuple[str, int]]:
+        """(term kosakata terdekat, jarak) atau None jika tidak ada yang cukup dekat"""
+        if word in self.words:
+            return word, 0
+        if len(word) < self.min_length or not word.replace(" ", "").isalpha():
+            return None
+
+        distance = self._allowed_distance(word)
+        best: Optional[Tuple[int, int, str]] = None
+        checked = set()
+        for variant in _deletes(word, distance):
+            for candidate in self._index.get(variant, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                # Batas jarak juga mengikuti panjang kandidat, agar kata pendek tidak cocok dengan jarak 2
+                limit = min(distance, self._allowed_distance(candidate))
+                found = OSA.distance(word, candidate, score_cutoff=limit)
+                if found <= limit:
+                    key = (found, self.words[candidate], candidate)
+                    if best is None or key < best:
+                        best = key
+        if best is None:
+            return None
+        return best[2], best[0]
+
+    def correct(self, words: List[str], skip: Set[str] = frozenset(),
+                accept: Callable[[List[str], List[str]], bool] = None) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        Ganti rangkaian kata yang tidak dikenal dengan koreksinya, frasa terpanjang dulu.
+        Hasil: (kata setelah koreksi, daftar (teks asli, koreksi)).
+        Kata di `skip` dan PROTECTED_WORDS tidak disentuh. `accept(sebelum, sesudah)` bisa
+        menolak koreksi, mis. jika koreksi tidak menambah match apa pun.
+        """
+        corrected = list(words)
+        corrections = []
+        position = 0
+        while position < len(corrected):
+            step = 1
+            for size in range(min(self.max_words, len(corrected) - position), 0, -1):
+                window = corrected[position:position + size]
+                term = " ".join(window)
+                if term in self.words or any(word in skip or word in PROTECTED_WORDS for word in window):
+                    continue
+                if not any(len(word) >= self.min_length for word in window if word not in self.tokens):
+                    continue
+                found = self.lookup(term)
+                if not found:
+                    continue
+                replacement = found[0].split(" ")
+                candidate = corrected[:position] + replacement + corrected[position + size:]
+                if accept and not accept(corrected, candidate):
+                    continue
+                logger.debug(f"Koreksi ejaan: {term} -> {found[0]}")
+                corrected = candidate
+                corrections.append((term, found[0]))
+                step = len(replacement)
+                break
+            position += step
+        return corrected, corrections
@@ -0,0 +1,226 @@
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pola yang dikenali: \b(alt|alt|...)\b atau \bA.*B\b, alt = kata literal atau gapped "A.*B"
+_PATTERN_BODY = re.compile(r"^\\b\(?(?P<body>[^()]*?)\)?\\b$")
+_LITERAL_TERM = re.compile(r"^[\w+# ]+$")
+_GAP_PART = re.compile(r"^\w+$")
+
+class KeywordMatcher:
+    """
+    Matcher satu kali jalan untuk semua kosakata EnhancedKeywordExtractor.
+
+    Setiap pola regex dipecah menjadi alternatifnya:
+    - literal ("data scientist") dimasukkan ke trie berbasis kata, sehingga teks cukup dipindai
+      sekali per posisi kata untuk semua label sekaligus
+    - gapped ("web.*dev") dicocokkan lewat index prefix kata: A harus diawali batas kata,
+      lalu B dicari setelah A dan harus diakhiri batas kata (sama dengan \\bA.*B\\b)
+
+    Input harus teks yang sudah dibersihkan (_clean_text: lowercase, kata \\w dengan akhiran "+"/"#"
+    dan spasi tunggal). "c++" / "c#" dicocokkan sebagai kata utuh (di regex lama \\b setelah "+"
+    tidak pernah cocok), alternatif dengan karakter lain (mis. "co-op") tidak mungkin cocok dan dibuang.
+    Pola yang tidak bisa diurai tetap dijalankan sebagai regex biasa.
+    """
+
+    def __init__(self, groups: Dict[str, Dict[str, List[str]]], count_groups: Tuple[str, ...] = ()):
+        # groups: nama grup -> label -> daftar pola; count_groups: grup yang butuh jumlah match (re.findall)
+        self.groups = groups
+        self.count_groups = set(count_groups)
+        self._trie: Dict = {}
+        self._gap_prefixes: Dict[str, List[Tuple[str, int]]] = {}   # A -> [(B, id pola)]
+        self._patterns: List[Tuple[str, str]] = []      # id pola -> (grup, label)
+        self._literal_patterns = set()                  # id pola yang punya alternatif literal
+        self._fallback: List[Tuple[int, re.Pattern]] = []
+        self.dropped_terms: List[str] = []
+        self.vocabulary: Dict[str, List[str]] = {group: [] for group in groups}   # grup -> term literal utuh
+
+        for group, labels in groups.items():
+            for label, patterns in labels.items():
+                for pattern in patterns:
+                    pattern_id = len(self._patterns)
+                    self._patterns.append((group, label))
+                    if not self._add_pattern(pattern, pattern_id, count=group in self.count_groups,
+                                             vocabulary=self.vocabulary[group]):
+                        logger.debug(f"Pola diproses sebagai regex biasa: {pattern[:60]}")
+                        self._fallback.append((pattern_id, re.compile(pattern, re.IGNORECASE)))
+
+        self.vocabulary = {group: list(dict.fromkeys(words)) for group, words in self.vocabulary.items()}
+
+        # A dikelompokkan per huruf pertama agar tiap kata hanya dicek terhadap sedikit kandidat
+        self._gap_heads: Dict[str, List[str]] = {}
+        for first in self._gap_prefixes:
+            self._gap_heads.setdefault(first[0], []).append(first)
+        self._count_ids = [pattern_id for pattern_id in sorted(self._literal_patterns)
+                           if self._patterns[pattern_id][0] in self.count_groups]
+
+    def _add_pattern(self, pattern: str, pattern_id: int, count: bool, vocabulary: List[str]) -> bool:
+        match = _PATTERN_BODY.match(pattern)
+        if not match:
+            return False
+        body = match.group("body")
+        # Tanpa kurung, \b hanya menempel ke alternatif pertama / terakhir
+        if "|" in body and not pattern.startswith("\\b("):
+            return False
+        alternatives = body.split("|")
+        gapped = [alt for alt in alternatives if ".*" in alt]
+        # Jumlah match findall untuk pola campuran (literal + gapped) tidak disimulasikan
+        if count and gapped and len(alternatives) > 1:
+            return False
+
+        parsed = []
+        for order, alternative in enumerate(alternatives):
+            if ".*" in alternative:
+                first, _, last = alternative.partition(".*")
+                if not (_GAP_PART.match(first) and _GAP_PART.match(last)):
+                    return False
+                parsed.append(("gap", first.lower(), last.lower(), order))
+                continue
+            term = re.sub(r"\\(.)", r"\1", alternative).lower()
+            if not _LITERAL_TERM.match(term) or "  " in term or term != term.strip():
+                # Karakter di luar \w, "+", "#" dan spasi sudah dihapus _clean_text, jadi tidak akan pernah cocok
+                self.dropped_terms.append(term)
+                continue
+            parsed.append(("literal", term, None, order))
+
+        for kind, first, last, order in parsed:
+            if kind == "gap":
+                self._gap_prefixes.setdefault(first, []).append((last, pattern_id))
+            else:
+                # Hanya term utuh ("kelapa gading"), bukan potongan katanya ("gading")
+                vocabulary.append(first)
+                node = self._trie
+                for word in first.split(" "):
+                    node = node.setdefault(word, {})
+                node.setdefault(None, []).append((pattern_id, order, first.count(" ") + 1, first))
+                self._literal_patterns.add(pattern_id)
+        return True
+
+    def _literal_matches(self, words: List[str]) -> List[List[Tuple[int, int, int, str]]]:
+        """Per posisi kata: semua (id pola, urutan alternatif, panjang kata, term) yang cocok mulai di posisi itu"""
+        trie = self._trie
+        matches = []
+        for start in range(len(words)):
+            found = []
+            node = trie
+            for word in words[start:]:
+                node = node.get(word)
+                if node is None:
+                    break
+                terminals = node.get(None)
+                if terminals:
+                    found.extend(terminals)
+            matches.append(found)
+        return matches
+
+    def _gap_matches(self, text: str, words: List[str]) -> Dict[int, Tuple[int, str]]:
+        """Id pola gapped yang cocok (\\bA.*B\\b) -> (posisi karakter, teks dari awal A sampai akhir B)"""
+        if not self._gap_prefixes:
+            return {}
+        # A -> posisi akhir kemunculan pertama (di awal kata)
+        first_end: Dict[str, int] = {}
+        prefixes, heads = self._gap_prefixes, self._gap_heads
+        offset = 0
+        for word in words:
+            for first in heads.get(word[:1], ()):
+                if first not in first_end and word.startswith(first):
+                    first_end[first] = offset + len(first)
+            offset += len(word) + 1
+
+        # B hanya dicari untuk A yang ditemukan: kemunculan setelah A yang diakhiri batas kata
+        matched = {}
+        for first, end in first_end.items():
+            for last, pattern_id in prefixes[first]:
+                if pattern_id in matched:
+                    continue
+                start = text.find(last, end)
+                while start != -1:
+                    stop = start + len(last)
+                    if stop == len(text) or text[stop] == " ":
+                        matched[pattern_id] = (end - len(first), text[end - len(first):stop])
+                        break
+                    start = text.find(last, start + 1)
+        return matched
+
+    def match(self, text: str) -> Dict[str, Dict[str, int]]:
+        """
+        Label yang cocok per grup, dengan urutan label sama seperti di definisi pola.
+        Nilai = jumlah match ala re.findall untuk count_groups, selain itu 1.
+        """
+        return self.analyze(text, with_terms=False)[0]
+
+    def analyze(self, text: str, with_terms: bool = True) -> Tuple[Dict[str, Dict[str, int]], Dict[str, List[str]]]:
+        """
+        Seperti match(), ditambah teks yang cocok per grup (urut sesuai kemunculan di teks).
+        Term yang sudah tercakup term lain yang lebih panjang di grup yang sama tidak diulang.
+        with_terms=False melewati pengumpulan term (dipakai match()).
+        """
+        words = text.split(" ") if text else []
+        literal = self._literal_matches(words)
+        gapped = self._gap_matches(text, words)
+
+        counts: Dict[int, int] = {}
+        spans: Dict[Tuple[int, int], str] = {}
+        offset = 0
+        for word, position in zip(words, literal):
+            for pattern_id, _, _, term in position:
+                counts[pattern_id] = 1
+                if with_terms:
+                    spans.setdefault((offset, pattern_id), term)
+            offset += len(word) + 1
+        for pattern_id in self._count_ids:
+            if pattern_id in counts:
+                counts[pattern_id] = self._count_literal(literal, pattern_id)
+        for pattern_id, (start, term) in gapped.items():
+            # Greedy .* menghabiskan sampai B terakhir, jadi findall paling banyak menemukan 1 match
+            counts.setdefault(pattern_id, 1)
+            if with_terms:
+                spans.setdefault((start, pattern_id), term)
+        for pattern_id, regex in self._fallback:
+            group, _ = self._patterns[pattern_id]
+            matches = list(regex.finditer(text))
+            if not matches:
+                continue
+            counts[pattern_id] = len(matches) if group in self.count_groups else 1
+            for found_match in matches:
+                spans.setdefault((found_match.start(), pattern_id), found_match.group(0).lower())
+
+        # Id pola berurutan sesuai definisi, jadi label juga keluar sesuai urutan definisi
+        result: Dict[str, Dict[str, int]] = {group: {} for group in self.groups}
+        for pattern_id in sorted(counts):
+            value = counts[pattern_id]
+            if not value:
+                continue
+            group, label = self._patterns[pattern_id]
+            labels = result[group]
+            labels[label] = labels.get(label, 0) + value if group in self.count_groups else 1
+
+        terms: Dict[str, List[str]] = {group: [] for group in self.groups}
+        for (_, pattern_id), term in sorted(spans.items()):
+            group_terms = terms[self._patterns[pattern_id][0]]
+            if term not in group_terms:
+                group_terms.append(term)
+        for group, group_terms in terms.items():
+            if len(group_terms) > 1:
+                terms[group] = [term for term in group_terms
+                                if not any(other != term and f" {term} " in f" {other} " for other in group_terms)]
+        return result, terms
+
+    @staticmethod
+    def _count_literal(literal: List[List[Tuple[int, int, int, str]]], pattern_id: int) -> int:
+        """Simulasi re.findall(\\b(alt1|alt2)\\b): dari kiri, alternatif pertama yang cocok menang"""
+        count = 0
+        position = 0
+        while position < len(literal):
+            best: Optional[Tuple[int, int]] = None
+            for candidate_id, order, length, _ in literal[position]:
+                if candidate_id == pattern_id and (best is None or order < best[0]):
+                    best = (order, length)
+            if best is None:
+                position += 1
+                continue
+            count += 1
+            position += best[1]
+        return count
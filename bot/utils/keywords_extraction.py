@@ -1,38 +1,27 @@
 from typing import List, Dict
 import re
-from typing import Dict, List, Set
 from dataclasses import dataclass
+from bot.utils.keyword_matcher import KeywordMatcher
 
-class KeywordExtractor:
-    """Ekstrak kata kunci dari input pengguna"""
-    @staticmethod
-    def extract(text: str) -> Dict:
-        text = text.lower()
-        return {
-            "intent": KeywordExtractor._detect_intent(text),
-            "field": KeywordExtractor._extract_field(text),
-            "location": KeywordExtractor._extract_location(text)
-        }
-
-    @staticmethod
-    def _detect_intent(text: str) -> str:
-        if any(k in text for k in ["magang", "internship", "pkl", "praktik kerja"]):
-            return "magang"
-        elif any(k in text for k in ["pekerjaan", "job", "lowongan", "karir", "rekrutmen", "loker"]):
-            return "pekerjaan"
-        elif any(k in text for k in ["kursus", "pelatihan", "training", "bootcamp", "sertifikasi"]):
-            return "kursus"
-        return "umum"
-
-    @staticmethod
-    def _extract_field(text: str) -> List[str]:
-        fields = ["data science", "marketing", "programmer","design", "keuangan", "bisnis", "it"]
-        return [f for f in fields if f in text]
-
-    @staticmethod
-    def _extract_location(text: str) -> List[str]:
-        locations = ["jakarta", "bandung", "remote", "hybrid", "online", "onsite", "tangerang", "banten", "semarang", "yogyakarta"]
-        return [loc for loc in locations if loc in text]
+# Pola lokasi: key = nama kota kanonik (juga dipakai normalisasi kolom lokasi_kota di database)
+LOCATION_PATTERNS = {
+    'Jakarta': [r'\b(jakarta|jkt|dki|ibu kota|ibukota|kemang|menteng|sudirman|thamrin|kuningan|senayan|kelapa gading|pondok indah|kebayoran|tanah abang|gambir|sawah besar|senen|cempaka putih|johar baru|kemayoran|grogol petamburan|tambora|taman sari|cengkareng|kembangan|kebon jeruk|palmerah|kota administrasi|jakarta pusat|jakarta utara|jakarta selatan|jakarta timur|jakarta barat)\b'],
+    'Bandung': [r'\b(bandung|bdg|kota kembang|paris van java|dago|cihampelas|braga|asia afrika|gasibu|alun-alun|cicendo|coblong|sukasari|sukajadi|cidadap|andir|astanaanyar|babakan ciparay|batununggal|bojongloa kaler|bojongloa kidul|buahbatu|cibeunying kaler|cibeunying kidul|cibiru|gedebage|kiaracondong|lengkong|mandalajati|panyileukan|rancasari|regol|ujung berung|arcamanik|antapani|bandung kidul|bandung kulon|bandung wetan|cinambo|margacinta|margahayu|ujung berung)\b'],
+    'Surabaya': [r'\b(surabaya|sby|kota pahlawan|hero city|tunjungan|gubeng|wonokromo|sawahan|genteng|bubutan|simokerto|pabean cantian|krembangan|semampir|bulak|kenjeran|lakarsantri|benowo|pakal|asemrowo|sukomanunggal|tandes|sambikerep|dukuh pakis|gayungan|jambangan|karang pilang|wonocolo|wiyung|mulyorejo|gunung anyar|rungkut|tenggilis mejoyo|sukolilo)\b'],
+    'Medan': [r'\b(medan|mdn|kota medan|medan kota|medan timur|medan barat|medan utara|medan selatan|medan tembung|medan amplas|medan area|medan baru|medan belawan|medan deli|medan denai|medan helvetia|medan johor|medan krio|medan labuhan|medan maimun|medan marelan|medan petisah|medan polonia|medan selayang|medan sunggal|medan tuntungan)\b'],
+    'Yogyakarta': [r'\b(yogyakarta|yogya|jogja|jogjakarta|diy|istimewa|gudeg|malioboro|tugu|kraton|pakualaman|kotagede|umbulharjo|mergangsan|danurejan|gedongtengen|ngampilan|wirobrajan|mantrijeron|gondomanan|jetis|tegalrejo|umbulharjo)\b'],
+    'Semarang': [r'\b(semarang|smg|kota semarang|semarang tengah|semarang utara|semarang selatan|semarang timur|semarang barat|candisari|gajahmungkur|gayamsari|genuk|gunungpati|mijen|ngaliyan|pedurungan|tembalang|tugu|banyumanik)\b'],
+    'Makassar': [r'\b(makassar|ujung pandang|kota makassar|mariso|mamajang|tamalate|rappocini|makassar|ujung tanah|tallo|bontoala|ujung pandang|wajo|kepulauan sangkarrang|biringkanaya|tamalanrea|manggala|pangkajene)\b'],
+    'Palembang': [r'\b(palembang|plg|kota palembang|ilir barat|ilir timur|seberang ulu|kemuning|kalidoni|bukit kecil|gandus|kertapati|plaju|radial|sako|sematang borang|sukarami|alang-alang lebar|jakabaring)\b'],
+    'Bali': [r'\b(bali|denpasar|ubud|sanur|kuta|seminyak|nusa dua|jimbaran|uluwatu|canggu|tabanan|gianyar|bangli|klungkung|karangasem|buleleng|badung|denpasar utara|denpasar selatan|denpasar timur|denpasar barat)\b'],
+    'Batam': [r'\b(batam|kota batam|nagoya|sekupang|sagulung|batu aji|nongsa|lubuk baja|sei beduk|bulang|galang|riau kepulauan|kepri)\b'],
+    'Balikpapan': [r'\b(balikpapan|bpp|kota balikpapan|balikpapan utara|balikpapan selatan|balikpapan timur|balikpapan barat|balikpapan tengah|sepinggan|kariangau|manggar|klandasan)\b'],
+    'Tangerang': [r'\b(tangerang|tangsel|tangerang selatan|bsd|serpong|gading serpong|alam sutera|karawaci|cikokol|ciputat|pamulang|cipondoh)\b'],
+    'Bekasi': [r'\b(bekasi|kota bekasi|cikarang|harapan indah|jatiasih|bantar gebang|tambun)\b'],
+    'Depok': [r'\b(depok|kota depok|margonda|cinere|sawangan|cimanggis|beji)\b'],
+    'Bogor': [r'\b(bogor|kota bogor|cibinong|sentul|cileungsi|dramaga)\b'],
+    'Remote': [r'\b(remote|work from home|wfh|dari rumah|online|virtual|digital nomad|anywhere|location independent|telecommute|hybrid|flexible)\b']
+}
 
 @dataclass
 class KeywordExtractionResult:
@@ -92,20 +81,7 @@ class EnhancedKeywordExtractor:
         }
         
         # Pola untuk lokasi
-        self.location_patterns = {
-            'Jakarta': [r'\b(jakarta|jkt|dki|ibu kota|ibukota|kemang|menteng|sudirman|thamrin|kuningan|senayan|kelapa gading|pondok indah|kebayoran|tanah abang|gambir|sawah besar|senen|cempaka putih|johar baru|kemayoran|grogol petamburan|tambora|taman sari|cengkareng|kembangan|kebon jeruk|palmerah|kota administrasi|jakarta pusat|jakarta utara|jakarta selatan|jakarta timur|jakarta barat)\b'],
-            'Bandung': [r'\b(bandung|bdg|kota kembang|paris van java|dago|cihampelas|braga|asia afrika|gasibu|alun-alun|cicendo|coblong|sukasari|sukajadi|cidadap|andir|astanaanyar|babakan ciparay|batununggal|bojongloa kaler|bojongloa kidul|buahbatu|cibeunying kaler|cibeunying kidul|cibiru|gedebage|kiaracondong|lengkong|mandalajati|panyileukan|rancasari|regol|ujung berung|arcamanik|antapani|bandung kidul|bandung kulon|bandung wetan|cinambo|margacinta|margahayu|ujung berung)\b'],
-            'Surabaya': [r'\b(surabaya|sby|kota pahlawan|hero city|tunjungan|gubeng|wonokromo|sawahan|genteng|bubutan|simokerto|pabean cantian|krembangan|semampir|bulak|kenjeran|lakarsantri|benowo|pakal|asemrowo|sukomanunggal|tandes|sambikerep|dukuh pakis|gayungan|jambangan|karang pilang|wonocolo|wiyung|mulyorejo|gunung anyar|rungkut|tenggilis mejoyo|sukolilo)\b'],
-            'Medan': [r'\b(medan|mdn|kota medan|medan kota|medan timur|medan barat|medan utara|medan selatan|medan tembung|medan amplas|medan area|medan baru|medan belawan|medan deli|medan denai|medan helvetia|medan johor|medan krio|medan labuhan|medan maimun|medan marelan|medan petisah|medan polonia|medan selayang|medan sunggal|medan tuntungan)\b'],
-            'Yogyakarta': [r'\b(yogyakarta|yogya|jogja|jogjakarta|diy|istimewa|gudeg|malioboro|tugu|kraton|pakualaman|kotagede|umbulharjo|mergangsan|danurejan|gedongtengen|ngampilan|wirobrajan|mantrijeron|gondomanan|jetis|tegalrejo|umbulharjo)\b'],
-            'Semarang': [r'\b(semarang|smg|kota semarang|semarang tengah|semarang utara|semarang selatan|semarang timur|semarang barat|candisari|gajahmungkur|gayamsari|genuk|gunungpati|mijen|ngaliyan|pedurungan|tembalang|tugu|banyumanik)\b'],
-            'Makassar': [r'\b(makassar|ujung pandang|kota makassar|mariso|mamajang|tamalate|rappocini|makassar|ujung tanah|tallo|bontoala|ujung pandang|wajo|kepulauan sangkarrang|biringkanaya|tamalanrea|manggala|pangkajene)\b'],
-            'Palembang': [r'\b(palembang|plg|kota palembang|ilir barat|ilir timur|seberang ulu|kemuning|kalidoni|bukit kecil|gandus|kertapati|plaju|radial|sako|sematang borang|sukarami|alang-alang lebar|jakabaring)\b'],
-            'Bali': [r'\b(bali|denpasar|ubud|sanur|kuta|seminyak|nusa dua|jimbaran|uluwatu|canggu|tabanan|gianyar|bangli|klungkung|karangasem|buleleng|badung|denpasar utara|denpasar selatan|denpasar timur|denpasar barat)\b'],
-            'Batam': [r'\b(batam|kota batam|nagoya|sekupang|sagulung|batu aji|nongsa|lubuk baja|sei beduk|bulang|galang|riau kepulauan|kepri)\b'],
-            'Balikpapan': [r'\b(balikpapan|bpp|kota balikpapan|balikpapan utara|balikpapan selatan|balikpapan timur|balikpapan barat|balikpapan tengah|sepinggan|kariangau|manggar|klandasan)\b'],
-            'Remote': [r'\b(remote|work from home|wfh|dari rumah|online|virtual|digital nomad|anywhere|location independent|telecommute|hybrid|flexible)\b']
-        }
+        self.location_patterns = LOCATION_PATTERNS
         
         # Pola untuk experience level
         self.experience_patterns = {
@@ -121,6 +97,34 @@ class EnhancedKeywordExtractor:
             'Internship': [r'\b(internship|intern|magang|trainee|apprentice|praktik kerja|pkl|co-op|work study)\b'],
             'Remote': [r'\b(remote|work from home|wfh|telecommute|virtual|online|digital nomad|hybrid|flexible)\b']
         }
+
+        # Pola untuk intent (jumlah kemunculan menentukan intent)
+        self.intent_patterns = {
+            'magang': [
+                r'\b(magang|internship|intern|praktik kerja|praktek kerja|pkl|trainee|apprentice|co-op|work study)\b',
+                r'\bcari.*magang\b',
+                r'\bintern.*program\b',
+                r'\bpraktik.*kerja\b'
+            ],
+            'pekerjaan': [
+                r'\b(kerja|job|pekerjaan|lowongan|loker|karir|career|rekrutmen|work|employment|position|posisi|jabatan|staff|karyawan)\b',
+                r'\bcari.*kerja\b',
+                r'\blowongan.*kerja\b',
+                r'\bfull.*time\b',
+                r'\bpart.*time\b'
+            ],
+            'kursus': [
+                r'\b(kursus|course|pelatihan|training|belajar|learn|study|class|workshop|seminar|bootcamp|certification|sertifikasi)\b',
+                r'\bcari.*kursus\b',
+                r'\bingin.*belajar\b',
+                r'\bpelatihan.*online\b'
+            ]
+        }
+        
+        # Pola sapaan (hanya dipakai QueryAnalyzer jika tidak ada intent pencarian)
+        self.greeting_patterns = {
+            'greeting': [r'\b(hai|halo|hello|hi|selamat|apa kabar|mulai)\b']
+        }
         
         # Stop words bahasa Indonesia
         self.stop_words = {
@@ -133,11 +137,50 @@ class EnhancedKeywordExtractor:
             'tentang', 'mengenai', 'sekitar', 'kurang', 'lebih', 'sangat',
             'paling', 'terbaik', 'bagus', 'baik', 'cocok', 'sesuai'
         }
+
+        # Semua pola dikompilasi sekali menjadi satu matcher (satu kali pindai per pesan)
+        self._matcher = KeywordMatcher({
+            'intent': self.intent_patterns,
+            'field': self.field_patterns,
+            'location': self.location_patterns,
+            'experience': self.experience_patterns,
+            'work_type': self.work_type_patterns,
+            'greeting': self.greeting_patterns,
+        }, count_groups=('intent',))
     
     def extract(self, text: str) -> Dict:
         """Extract keywords dengan confidence scoring"""
         text_lower = text.lower()
         
+        # Bersihkan teks
+        cleaned_text = self._clean_text(text_lower)
+        matched = self._matcher.match(cleaned_text)
+        
+        # Intent dengan jumlah kemunculan tertinggi (urutan intent_patterns jika seri)
+        intent_scores = {intent: matched['intent'].get(intent, 0) for intent in self.intent_patterns}
+        intent = max(intent_scores, key=intent_scores.get)
+        fields = list(matched['field']) or self._guess_fields(cleaned_text)
+        locations = list(matched['location'])
+        experience = list(matched['experience'])
+        work_type = list(matched['work_type'])
+        
+        # Hitung confidence score
+        confidence = self._calculate_confidence(intent, fields, locations)
+        
+        return {
+            'intent': intent,
+            'field': fields,
+            'location': locations,
+            'experience': experience,
+            'work_type': work_type,
+            'confidence': confidence,
+            'original_text': text
+        }
+    
+    def extract_reference(self, text: str) -> Dict:
+        """Implementasi lama (regex satu per satu), dipakai sebagai pembanding di benchmark_keywords"""
+        text_lower = text.lower()
+        
         # Bersihkan teks
         cleaned_text = self._clean_text(text_lower)
         
@@ -163,39 +206,15 @@ class EnhancedKeywordExtractor:
     
     def _clean_text(self, text: str) -> str:
         """Bersihkan teks dari karakter yang tidak perlu"""
-        # Hapus karakter khusus kecuali spasi dan huruf
-        text = re.sub(r'[^\w\s]', ' ', text)
-        # Hapus multiple spaces
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        # Hanya kata yang tersisa, dipisah satu spasi; "+" / "#" setelah huruf tetap ikut ("c++", "c#")
+        return " ".join(re.findall(r'\w+(?:(?<=[^\W\d_])[+#]+)?', text))
     
     def _extract_intent(self, text: str) -> str:
         """Extract intent dari teks"""
-        intent_patterns = {
-            'magang': [
-                r'\b(magang|internship|intern|praktik kerja|pkl|trainee|apprentice|co-op|work study)\b',
-                r'\bcari.*magang\b',
-                r'\bintern.*program\b',
-                r'\bpraktik.*kerja\b'
-            ],
-            'pekerjaan': [
-                r'\b(kerja|job|pekerjaan|lowongan|karir|career|work|employment|position|posisi|jabatan|staff|karyawan)\b',
-                r'\bcari.*kerja\b',
-                r'\blowongan.*kerja\b',
-                r'\bfull.*time\b',
-                r'\bpart.*time\b'
-            ],
-            'kursus': [
-                r'\b(kursus|course|pelatihan|training|belajar|learn|study|class|workshop|seminar|bootcamp|certification|sertifikasi)\b',
-                r'\bcari.*kursus\b',
-                r'\bingin.*belajar\b',
-                r'\bpelatihan.*online\b'
-            ]
-        }
         
         # Hitung score untuk setiap intent
         intent_scores = {}
-        for intent, patterns in intent_patterns.items():
+        for intent, patterns in self.intent_patterns.items():
             score = 0
             for pattern in patterns:
                 matches = len(re.findall(pattern, text))
@@ -220,19 +239,23 @@ class EnhancedKeywordExtractor:
         
         # Jika tidak ada field yang ditemukan, coba extract manual
         if not found_fields:
-            words = text.split()
-            filtered_words = [word for word in words if word not in self.stop_words and len(word) > 2]
-            
-            # Ambil kata-kata yang mungkin field
-            potential_fields = []
-            for word in filtered_words:
-                if word not in ['cari', 'mencari', 'butuh', 'perlu', 'mau', 'ingin']:
-                    potential_fields.append(word)
-            
-            return potential_fields[:3]  # Maksimal 3 field
+            return self._guess_fields(text)
         
         return found_fields
     
+    def _guess_fields(self, text: str) -> List[str]:
+        """Kata-kata yang mungkin field jika tidak ada pola field yang cocok"""
+        words = text.split()
+        filtered_words = [word for word in words if word not in self.stop_words and len(word) > 2]
+        
+        # Ambil kata-kata yang mungkin field
+        potential_fields = []
+        for word in filtered_words:
+            if word not in ['cari', 'mencari', 'butuh', 'perlu', 'mau', 'ingin']:
+                potential_fields.append(word)
+        
+        return potential_fields[:3]  # Maksimal 3 field
+    
     def _extract_locations(self, text: str) -> List[str]:
         """Extract lokasi dari teks"""
         found_locations = []
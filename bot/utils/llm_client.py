@@ -0,0 +1,108 @@
+import os
+import json
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Optional
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (httpx butuh paket h2 untuk HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class LLMTimeoutError(Exception):
+    """Request LLM melewati batas waktu (deadline) per request"""
+
+
+class AsyncLLMClient:
+    """Client async untuk endpoint LLM dengan satu connection pool bersama"""
+
+    def __init__(self, api_url: str, headers: Dict[str, str],
+                 timeout: float = None, max_connections: int = None):
+        self.api_url = api_url
+        self.headers = headers
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT", 30))
+        self.max_connections = max_connections or int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Lazy init supaya client dibuat di dalam event loop yang sedang berjalan"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60,
+                ),
+                # Timeout per operasi jaringan, deadline total diatur di stream_chat
+                timeout=httpx.Timeout(self.timeout, connect=10),
+            )
+            logger.info(f"LLM client dibuat (http2={HTTP2_AVAILABLE}, max_connections={self.max_connections})")
+        return self._client
+
+    async def stream_chat(self, payload: Dict, timeout: float = None) -> AsyncIterator[str]:
+        """
+        Stream potongan konten dari SSE endpoint tanpa memblok event loop.
+        Raise LLMTimeoutError jika seluruh request melewati deadline.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.timeout)
+
+        def remaining() -> float:
+            left = deadline - loop.time()
+            if left <= 0:
+                raise LLMTimeoutError(f"LLM request melewati {timeout or self.timeout} detik")
+            return left
+
+        client = self._get_client()
+        try:
+            request = client.build_request("POST", self.api_url, json=payload)
+            response = await asyncio.wait_for(client.send(request, stream=True), remaining())
+        except asyncio.TimeoutError as e:
+            raise LLMTimeoutError("LLM request timeout saat menunggu respons") from e
+
+        try:
+            response.raise_for_status()
+            lines = response.aiter_lines()
+            while True:
+                try:
+                    line = await asyncio.wait_for(lines.__anext__(), remaining())
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError as e:
+                    raise LLMTimeoutError("LLM stream timeout") from e
+
+                line = line.strip()
+                if not line.startswith("data:"):
+                    continue
+
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+
+                if chunk.get("choices"):
+                    content = chunk["choices"][0].get("delta", {}).get("content", "")
+                    if content:
+                        yield content
+        finally:
+            await response.aclose()
+
+    async def aclose(self):
+        """Tutup connection pool"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
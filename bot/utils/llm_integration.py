@@ -1,27 +1,25 @@
 import os
-import re
-import json
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
-from enum import Enum
+from typing import List, Dict, Optional, Callable, Awaitable
 from dataclasses import dataclass
 from dotenv import load_dotenv
-import requests
+import httpx
 from telegram import Update
 from telegram.ext import ContextTypes
 from bot.utils.database import DatabaseJob, DatabaseCourse, DatabaseIntern
-from bot.utils.keywords_extraction import KeywordExtractor
+from bot.utils.async_database import AsyncDatabase
+from bot.utils.query_cache import query_cache, normalize_terms, MISS
+from bot.utils.query_analyzer import QueryAnalyzer, QueryAnalysis, IntentType, SEARCH_INTENTS
+from bot.utils.semantic_search import semantic_index
+from bot.utils.ranking import RankingEngine
+from bot.utils.llm_client import AsyncLLMClient, LLMTimeoutError
 import logging
 
 load_dotenv()
 
-class IntentType(Enum):
-    MAGANG = "magang"
-    PEKERJAAN = "pekerjaan"
-    KURSUS = "kursus"
-    GREETING = "greeting"
-    UNKNOWN = "unknown"
+# Callback untuk menerima teks parsial selama LLM streaming
+PartialCallback = Callable[[str], Awaitable[None]]
 
 @dataclass
 class UserContext:
@@ -61,44 +59,6 @@ class ConversationManager:
         if len(context.conversation_history) > self.MAX_HISTORY * 2:
             context.conversation_history = context.conversation_history[-self.MAX_HISTORY * 2:]
 
-class EnhancedIntentDetector:
-    """Deteksi intent yang lebih akurat dengan pattern matching"""
-    
-    def __init__(self):
-        self.patterns = {
-            IntentType.MAGANG: [
-                r'\b(magang|internship|intern|praktek kerja|pkl)\b',
-                r'\bcari.*magang\b',
-                r'\bintern.*program\b'
-            ],
-            IntentType.PEKERJAAN: [
-                r'\b(kerja|job|pekerjaan|lowongan|karir)\b',
-                r'\bcari.*kerja\b',
-                r'\blowongan.*kerja\b',
-                r'\bfull.*time\b'
-            ],
-            IntentType.KURSUS: [
-                r'\b(kursus|course|pelatihan|training|belajar)\b',
-                r'\bcari.*kursus\b',
-                r'\bingin.*belajar\b'
-            ],
-            IntentType.GREETING: [
-                r'\b(hai|halo|hello|hi|selamat)\b',
-                r'\bapa kabar\b',
-                r'\bmulai\b'
-            ],
-        }
-    
-    def detect_intent(self, text: str) -> IntentType:
-        text_lower = text.lower()
-        
-        for intent, patterns in self.patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    return intent
-        
-        return IntentType.UNKNOWN
-
 class EnhancedLLMIntegration:
     """Enhanced LLM Integration dengan UX yang lebih baik"""
     
@@ -109,15 +69,18 @@ class EnhancedLLMIntegration:
             "Authorization": f"Bearer {self.HF_TOKEN}",
             "Content-Type": "application/json"
         }
+        self.llm_client = AsyncLLMClient(self.API_URL, self.HEADERS)
         
         # Database instances
         self.db_job = DatabaseJob()
         self.db_course = DatabaseCourse()
         self.db_intern = DatabaseIntern()
-        self.extractor = KeywordExtractor()
+        # Akses async agar query tidak memblok event loop
+        self.db = AsyncDatabase(self.db_intern, self.db_job, self.db_course)
         
-        # Enhanced components
-        self.intent_detector = EnhancedIntentDetector()
+        # Enhanced components (satu analisis per pesan untuk intent dan keyword)
+        self.analyzer = QueryAnalyzer()
+        self.ranker = RankingEngine(self.analyzer)
         self.conversation_manager = ConversationManager()
         
         # Response templates
@@ -126,14 +89,17 @@ class EnhancedLLMIntegration:
             IntentType.UNKNOWN: self._get_unknown_response
         }
     
-    async def process_user_request(self, user_input: str, update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
+    async def process_user_request(self, user_input: str, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                    on_partial: Optional[PartialCallback] = None) -> str:
         """Proses request dengan context awareness dan intent detection"""
         try:
             user_id = update.effective_user.id
             user_context = self.conversation_manager.get_context(user_id)
             
-            # Deteksi intent
-            intent = self.intent_detector.detect_intent(user_input)
+            # Analisis pesan sekali: intent, bidang, lokasi dll. dipakai ulang di semua tahap
+            analysis = self.analyzer.analyze(user_input)
+            logging.debug(f"🔎 Analisis pesan user {user_id}: {analysis.as_dict()}")
+            intent = analysis.intent
             
             # Handle special intents
             if intent in self.response_templates:
@@ -143,39 +109,38 @@ class EnhancedLLMIntegration:
                 return response
             
             # Handle search intents
-            if intent in [IntentType.MAGANG, IntentType.PEKERJAAN, IntentType.KURSUS]:
-                return await self._handle_search_intent(user_input, intent, update, context, user_context)
+            if intent in SEARCH_INTENTS:
+                return await self._handle_search_intent(user_input, analysis, update, context, user_context, on_partial)
             
             # Fallback untuk intent unknown
-            return await self._handle_unknown_with_search(user_input, update, context, user_context)
+            return await self._handle_unknown_with_search(user_input, analysis, update, context, user_context, on_partial)
             
         except Exception as e:
             logging.error(f"Error in process_user_request: {str(e)}")
             return f"⚠️ Terjadi error: {str(e)[:100]}..."
     
-    async def _handle_search_intent(self, user_input: str, intent: IntentType, 
+    async def _handle_search_intent(self, user_input: str, analysis: QueryAnalysis, 
                                     update: Update, context: ContextTypes.DEFAULT_TYPE, 
-                                    user_context: UserContext) -> str:
+                                    user_context: UserContext,
+                                    on_partial: Optional[PartialCallback] = None) -> str:
         """Handle search dengan context awareness"""
         
-        # Extract keywords
-        keywords = self.extractor.extract(user_input)
-        
         # Search database
-        items = await self._search_database(intent, keywords)
+        items = await self._search_database(analysis)
         
         if not items:
-            return await self._handle_empty_results(intent, keywords, update, context, user_context)
+            return await self._handle_empty_results(analysis, update, context, user_context)
         
         # Update context
-        user_context.last_search_type = intent.value
+        user_context.last_search_type = analysis.intent.value
         
         # Generate enhanced response
-        prompt = self._build_enhanced_prompt(user_input, intent, keywords, items, user_context)
+        prompt = self._build_enhanced_prompt(user_input, analysis, items, user_context)
         response = await self.generate_response(
             messages=[{"role": "user", "content": prompt}],
             update=update,
-            context=context
+            context=context,
+            on_partial=on_partial
         )
         
         # Save to context
@@ -185,41 +150,69 @@ class EnhancedLLMIntegration:
         
         return response
     
-    async def _search_database(self, intent: IntentType, keywords: Dict) -> List[Dict]:
-        """Search database berdasarkan intent"""
+    async def _search_database(self, analysis: QueryAnalysis) -> List[Dict]:
+        """
+        Search database berdasarkan intent: kandidat diambil berlebih lalu diurutkan RankingEngine.
+        Hasil yang sama dipakai ulang sampai scraper menyimpan data baru.
+        """
+        intent = analysis.intent
+        # Dengan LIKE (tanpa FTS) urutan term ikut menentukan hasil, jadi tidak diurutkan
+        fields = normalize_terms(analysis.field_terms, ordered=not self.db.fts_enabled(intent.value))
+        locations = tuple(sorted(analysis.locations))
+        # Dengan semantic search hasil juga bergantung pada seluruh teks pesan
+        semantic_query = analysis.text if semantic_index.enabled else ""
+        # hint_terms tidak ikut query database, tapi mengubah urutan ranking
+        cache_key = (intent.value, fields, analysis.hint_terms, locations, analysis.experience,
+                     analysis.work_type, analysis.min_salary, analysis.deadline_before, 8, semantic_query)
+        cached = query_cache.get(cache_key)
+        if cached is not MISS:
+            return [dict(item) for item in cached]
+        generation = query_cache.generation
+        candidates = self.ranker.overfetch(8)
+
         items = []
-        
         try:
             if intent == IntentType.MAGANG:
-                items = self.db_intern.search_magang(
-                    keyword=" ".join(keywords.get("field", [])),
-                    location=" ".join(keywords.get("location", [])),
-                    limit=8
+                items = await self.db.search_magang(
+                    keyword=" ".join(fields),
+                    location=" ".join(locations),
+                    limit=candidates,
+                    semantic_query=semantic_query,
+                    min_salary=analysis.min_salary,
+                    deadline_before=analysis.deadline_before
                 )
             elif intent == IntentType.PEKERJAAN:
-                items = self.db_job.search_jobs(
-                    keyword=" ".join(keywords.get("field", [])),
-                    location=" ".join(keywords.get("location", [])),
-                    limit=8
+                items = await self.db.search_jobs(
+                    keyword=" ".join(fields),
+                    location=" ".join(locations),
+                    limit=candidates,
+                    semantic_query=semantic_query,
+                    min_salary=analysis.min_salary
                 )
             elif intent == IntentType.KURSUS:
-                items = self.db_course.search_course(
-                    keyword=" ".join(keywords.get("field", [])),
-                    limit=8
+                items = await self.db.search_course(
+                    keyword=" ".join(fields),
+                    limit=candidates,
+                    semantic_query=semantic_query
                 )
+            items = self.ranker.rank(items, analysis, limit=8, item_type=intent.value)
+            # Hanya hasil yang berhasil yang di-cache (bukan timeout / error)
+            query_cache.set(cache_key, [dict(item) for item in items], generation)
+        except asyncio.TimeoutError:
+            logging.error(f"Timeout searching database for intent {intent.value}")
+            items = []
         except Exception as e:
             logging.error(f"Error searching database: {str(e)}")
             items = []
         
         return items
     
-    def _build_enhanced_prompt(self, user_input: str, intent: IntentType, 
-                                keywords: Dict, items: List[Dict], 
-                                context: UserContext) -> str:
+    def _build_enhanced_prompt(self, user_input: str, analysis: QueryAnalysis, 
+                                items: List[Dict], context: UserContext) -> str:
         """Build prompt yang lebih interactive dan contextual"""
         
         # Format items berdasarkan intent
-        items_str = self._format_items_for_prompt(items, intent)
+        items_str = self._format_items_for_prompt(items, analysis.intent)
         
         # Build context dari conversation history
         context_str = self._build_context_string(context)
@@ -234,8 +227,8 @@ KONTEKS PERCAKAPAN:
 {context_str}
 
 PERMINTAAN USER: "{user_input}"
-INTENT: {intent.value}
-KEYWORDS: {keywords}
+INTENT: {analysis.intent.value}
+KEYWORDS: {analysis.as_dict()}
 
 DATA HASIL PENCARIAN:
 {items_str}
@@ -323,10 +316,11 @@ KEPRIBADIAN:
 TUJUAN: Membantu user menemukan peluang karir yang sesuai dengan kebutuhan mereka.
 """
     
-    async def _handle_empty_results(self, intent: IntentType, keywords: Dict, 
+    async def _handle_empty_results(self, analysis: QueryAnalysis, 
                                     update: Update, context: ContextTypes.DEFAULT_TYPE, 
                                     user_context: UserContext) -> str:
         """Handle ketika tidak ada hasil pencarian"""
+        intent = analysis.intent
         
         suggestions = {
             IntentType.MAGANG: [
@@ -401,41 +395,28 @@ Atau ketik "/help" untuk panduan lengkap.
 Coba tanyakan dengan cara yang lebih spesifik ya! 😊
 """
     
-    async def _handle_unknown_with_search(self, user_input: str, update: Update, 
-                                            context: ContextTypes.DEFAULT_TYPE,
-                                            user_context: UserContext) -> str:
+    async def _handle_unknown_with_search(self, user_input: str, analysis: QueryAnalysis,
+                                            update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                            user_context: UserContext,
+                                            on_partial: Optional[PartialCallback] = None) -> str:
         """Handle unknown intent dengan mencoba search"""
         
-        # Coba ekstrak keywords dan search
-        keywords = self.extractor.extract(user_input)
-        
         # Search di semua database
         all_items = []
         
         try:
-            # Search magang
-            magang_items = self.db_intern.search_magang(
-                keyword=" ".join(keywords.get("field", [])),
-                location=" ".join(keywords.get("location", [])),
-                limit=3
-            )
-            all_items.extend([{**item, "type": "magang"} for item in magang_items])
-            
-            # Search jobs
-            job_items = self.db_job.search_jobs(
-                keyword=" ".join(keywords.get("field", [])),
-                location=" ".join(keywords.get("location", [])),
-                limit=3
-            )
-            all_items.extend([{**item, "type": "pekerjaan"} for item in job_items])
-            
-            # Search courses
-            course_items = self.db_course.search_course(
-                keyword=" ".join(keywords.get("field", [])),
-                limit=3
+            # Search paralel di semua database, hasil digabung berdasarkan relevansi
+            all_items = await self.db.search_all(
+                keyword=analysis.keyword,
+                location=analysis.location,
+                limit=self.ranker.overfetch(3),
+                semantic_query=analysis.text if semantic_index.enabled else ""
             )
-            all_items.extend([{**item, "type": "kursus"} for item in course_items])
+            all_items = self.ranker.rank(all_items, analysis, per_type=3)
             
+        except asyncio.TimeoutError:
+            logging.error("Timeout in unknown search")
+            all_items = []
         except Exception as e:
             logging.error(f"Error in unknown search: {str(e)}")
             all_items = []
@@ -461,7 +442,8 @@ Gunakan emoji dan format yang menarik.
             return await self.generate_response(
                 messages=[{"role": "user", "content": prompt}],
                 update=update,
-                context=context
+                context=context,
+                on_partial=on_partial
             )
         
         return await self._get_unknown_response(user_input, user_context)
@@ -484,8 +466,12 @@ Gunakan emoji dan format yang menarik.
         return "\n".join(formatted)
     
     async def generate_response(self, messages: List[dict], update: Update, 
-                                context: ContextTypes.DEFAULT_TYPE) -> str:
-        """Generate response dengan error handling yang lebih baik"""
+                                context: ContextTypes.DEFAULT_TYPE,
+                                on_partial: Optional[PartialCallback] = None) -> str:
+        """
+        Generate response dengan error handling yang lebih baik.
+        Jika on_partial diberikan, teks yang sudah terkumpul dikirim setiap ada chunk baru.
+        """
         payload = {
             "messages": messages,
             "model": "SeaLLMs/SeaLLMs-v3-7B-Chat",
@@ -498,32 +484,12 @@ Gunakan emoji dan format yang menarik.
         full_response = ""
         
         try:
-            # Set timeout untuk request
-            timeout = 30
-            
-            response = requests.post(
-                self.API_URL, 
-                headers=self.HEADERS, 
-                json=payload, 
-                stream=True, 
-                timeout=timeout
-            )
-            response.raise_for_status()
-            
             has_content = False
-            for line in response.iter_lines():
-                if line:
-                    decoded_line = line.decode('utf-8').strip()
-                    if decoded_line.startswith("data:"):
-                        try:
-                            chunk = json.loads(decoded_line[5:])
-                            if chunk.get("choices"):
-                                content = chunk["choices"][0]["delta"].get("content", "")
-                                if content:
-                                    has_content = True
-                                    full_response += content
-                        except json.JSONDecodeError:
-                            continue
+            async for content in self.llm_client.stream_chat(payload):
+                has_content = True
+                full_response += content
+                if on_partial:
+                    await on_partial(full_response)
 
             # Handle empty response
             if not has_content or not full_response.strip():
@@ -531,11 +497,11 @@ Gunakan emoji dan format yang menarik.
             
             return full_response.strip()
 
-        except requests.exceptions.Timeout:
+        except (LLMTimeoutError, httpx.TimeoutException):
             return "⏱️ Respons terlalu lama. Coba lagi dengan pertanyaan yang lebih sederhana."
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logging.error(f"Request error: {str(e)}")
             return "🚨 Terjadi masalah koneksi. Silakan coba lagi."
         except Exception as e:
             logging.error(f"Unexpected error in generate_response: {str(e)}")
-            return f"🚨 Terjadi error: {str(e)[:100]}..."
\ No newline at end of file
+            return f"🚨 Terjadi error: {str(e)[:100]}..."
@@ -0,0 +1,164 @@
+import re
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from bot.utils.keywords_extraction import LOCATION_PATTERNS
+
+# Nama bulan Indonesia & Inggris (termasuk singkatan) -> nomor bulan
+MONTHS = {
+    "jan": 1, "januari": 1, "january": 1,
+    "feb": 2, "februari": 2, "february": 2, "pebruari": 2,
+    "mar": 3, "maret": 3, "march": 3,
+    "apr": 4, "april": 4,
+    "mei": 5, "may": 5,
+    "jun": 6, "juni": 6, "june": 6,
+    "jul": 7, "juli": 7, "july": 7,
+    "agu": 8, "agt": 8, "agus": 8, "agustus": 8, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9,
+    "okt": 10, "oct": 10, "oktober": 10, "october": 10,
+    "nov": 11, "nopember": 11, "november": 11,
+    "des": 12, "dec": 12, "desember": 12, "december": 12,
+}
+
+_ISO_DATE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_DAY_MONTH = re.compile(r"(\d{1,2})\s+([a-z]+)\.?(?:,?\s+(\d{4}))?")
+_MONTH_DAY = re.compile(r"([a-z]+)\.?\s+(\d{1,2})(?:,?\s+(\d{4}))?")
+_DAYS_LEFT = re.compile(r"(\d+)\s*(?:hari|days?)\s*(?:lagi|left|remaining)")
+
+def _make_date(year: Optional[str], month: int, day: str, today: date) -> Optional[date]:
+    try:
+        if year:
+            return date(int(year), month, int(day))
+        parsed = date(today.year, month, int(day))
+    except ValueError:
+        return None
+    # Tanpa tahun: tanggal yang sudah lewat jauh berarti tahun depan (mis. "Apply before 15 Jan" di bulan Desember)
+    if parsed < today - timedelta(days=180):
+        parsed = parsed.replace(year=today.year + 1)
+    return parsed
+
+def parse_deadline(text: Optional[str], today: Optional[date] = None) -> Optional[date]:
+    """
+    Parse teks deadline hasil scraping menjadi tanggal.
+    Contoh: "2025-10-31T16:59:59Z", "Apply before 31 Oct", "Lamar sebelum 5 Agustus 2025",
+    "Oct 31, 2025", "3 hari lagi". Return None jika tidak dikenali (mis. "Tidak ada").
+    """
+    if not text:
+        return None
+    today = today or datetime.now().date()
+    text = text.strip().lower()
+
+    match = _ISO_DATE.search(text)
+    if match:
+        try:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            return None
+
+    match = _DAYS_LEFT.search(text)
+    if match:
+        return today + timedelta(days=int(match.group(1)))
+
+    for match in _DAY_MONTH.finditer(text):
+        month = MONTHS.get(match.group(2))
+        if month:
+            return _make_date(match.group(3), month, match.group(1), today)
+
+    for match in _MONTH_DAY.finditer(text):
+        month = MONTHS.get(match.group(1))
+        if month:
+            return _make_date(match.group(3), month, match.group(2), today)
+
+    return None
+
+# Mata uang gaji -> kode ISO (default IDR jika hanya angka)
+CURRENCIES = {"idr": "IDR", "rp": "IDR", "usd": "USD", "$": "USD", "us$": "USD", "sgd": "SGD", "s$": "SGD",
+              "myr": "MYR", "rm": "MYR", "eur": "EUR", "€": "EUR"}
+# Satuan ringkas: "5 juta", "5jt", "500rb", "5k"
+SALARY_UNITS = {"jt": 1_000_000, "juta": 1_000_000, "m": 1_000_000, "mio": 1_000_000, "million": 1_000_000,
+                "rb": 1_000, "ribu": 1_000, "k": 1_000}
+
+_CURRENCY = re.compile(r"(us\$|s\$|\$|€|\b(?:idr|rp|usd|sgd|myr|rm|eur)(?=[\s\d.]|$))")
+_AMOUNT = re.compile(r"(\d+(?:[.,]\d+)*)\s*(jt|juta|mio|million|rb|ribu|k|m)?\b")
+_YEARLY = re.compile(r"\b(tahun|year|annum|yearly|annual)\b")
+
+def _parse_number(digits: str, has_unit: bool) -> Optional[float]:
+    """"4.000.000" / "1,000" -> pemisah ribuan, "5,5" / "4.5" / "1.500.000,00" -> desimal"""
+    groups = re.split(r"[.,]", digits)
+    if len(groups) > 1 and all(len(group) == 3 for group in groups[1:]) and not (has_unit and len(groups) == 2):
+        return float("".join(groups))
+    if len(groups) == 1:
+        return float(groups[0])
+    # Bagian terakhir adalah desimal: "5,5" atau "1.500.000,00"
+    return float(f"{''.join(groups[:-1])}.{groups[-1]}")
+
+def parse_salary(text: Optional[str]) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """
+    Parse teks gaji menjadi (min, max, mata uang) per bulan.
+    Contoh: "IDR 4.000.000 - 6.000.000", "Rp5 - 7 juta /bulan", "USD 1,000", "Tidak disebutkan" -> (None, None, None)
+    """
+    if not text:
+        return None, None, None
+    text = text.lower()
+
+    amounts = []
+    for match in _AMOUNT.finditer(text):
+        unit = match.group(2)
+        value = _parse_number(match.group(1), bool(unit))
+        if value is not None:
+            amounts.append([value, unit])
+        if len(amounts) == 2:
+            break
+    if not amounts:
+        return None, None, None
+
+    # "5 - 7 juta": satuan di angka terakhir berlaku juga untuk angka sebelumnya
+    last_unit = amounts[-1][1]
+    values = []
+    for value, unit in amounts:
+        unit = unit or (last_unit if value < 1000 else None)
+        values.append(value * SALARY_UNITS.get(unit, 1))
+
+    currency = _CURRENCY.search(text)
+    # Angka kecil tanpa satuan / mata uang (mis. "3 orang") bukan gaji
+    if not currency and not last_unit and max(values) < 1000:
+        return None, None, None
+
+    if _YEARLY.search(text):
+        values = [value / 12 for value in values]
+    low, high = min(values), max(values)
+    return int(low), int(high), CURRENCIES[currency.group(1)] if currency else "IDR"
+
+def _longest_first(pattern: str) -> str:
+    """Urutkan alternatif pola kota dari yang terpanjang, agar "jakarta barat" cocok utuh (bukan hanya "jakarta")"""
+    match = re.fullmatch(r"\\b\((.*)\)\\b", pattern)
+    if not match:
+        return pattern
+    alternatives = sorted(match.group(1).split("|"), key=len, reverse=True)
+    return rf"\b({'|'.join(alternatives)})\b"
+
+_CITY_PATTERNS = [(city, re.compile("|".join(map(_longest_first, patterns)), re.IGNORECASE))
+                  for city, patterns in LOCATION_PATTERNS.items()]
+
+def split_location(text: Optional[str]) -> Tuple[List[str], str]:
+    """
+    Pisahkan teks lokasi menjadi kota kanonik (key LOCATION_PATTERNS) dan sisa teks yang tidak dikenali.
+    Contoh: "Kebon Jeruk, Jakarta Barat" -> (["Jakarta"], ""), "jakarta karawang" -> (["Jakarta"], "karawang")
+    """
+    if not text:
+        return [], ""
+    found = []
+    rest = text.lower()
+    for city, pattern in _CITY_PATTERNS:
+        matches = list(pattern.finditer(rest))
+        if matches:
+            found.append((matches[0].start(), city))
+            rest = pattern.sub(" ", rest)
+    # Urut sesuai posisi kemunculan di teks
+    cities = [city for _, city in sorted(found)]
+    rest = " ".join(re.findall(r"\w+", rest))
+    return cities, rest
+
+def canonical_city(text: Optional[str]) -> Optional[str]:
+    """Kota kanonik pertama yang disebut di teks lokasi listing, None jika tidak dikenali"""
+    cities, _ = split_location(text)
+    return cities[0] if cities else None
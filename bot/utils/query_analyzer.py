@@ -0,0 +1,206 @@
+import os
+import re
+import logging
+import calendar
+from enum import Enum
+from functools import lru_cache
+from dataclasses import dataclass, asdict, replace
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+from dotenv import load_dotenv
+from bot.utils.keywords_extraction import EnhancedKeywordExtractor
+from bot.utils.fuzzy_index import FuzzyIndex
+from bot.utils.normalize import parse_deadline, parse_salary
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+class IntentType(Enum):
+    MAGANG = "magang"
+    PEKERJAAN = "pekerjaan"
+    KURSUS = "kursus"
+    GREETING = "greeting"
+    UNKNOWN = "unknown"
+
+SEARCH_INTENTS = (IntentType.MAGANG, IntentType.PEKERJAAN, IntentType.KURSUS)
+
+# Nominal gaji: "5 juta", "5jt", "rp 5.000.000", "idr 4,5 juta"
+_AMOUNT = r"(?:rp\.?\s*|idr\s*)?\d[\d.,]*\s*(?:jt|juta|rb|ribu|k)?"
+# "gaji (di atas|minimal|...) 5 juta" atau tanpa kata gaji jika nominal punya satuan: "minimal 5 juta"
+_SALARY_PHRASE = re.compile(
+    rf"\b(?:(?:gaji|salary|upah)\s+(?:(?:di ?atas|minimal|min|minimum|mulai|lebih dari|setidaknya|>=?)\s*)?(?P<amount>{_AMOUNT})"
+    rf"|(?:di ?atas|minimal|minimum|lebih dari|setidaknya)\s+(?P<unit_amount>(?:rp\.?\s*|idr\s*)?\d[\d.,]*\s*(?:jt|juta|rb|ribu|k)))\b"
+)
+# "deadline minggu ini", "batas pendaftaran sebelum 31 oktober", "ditutup dalam 3 hari"
+_DEADLINE_PHRASE = re.compile(
+    r"\b(?:deadline|batas(?: waktu)?(?: pendaftaran| lamaran)?|tutup|ditutup|closing)\s+"
+    r"(?:(?:sebelum|dalam|tanggal|tgl)\s+)?"
+    r"(?P<when>hari ini|besok|minggu ini|minggu depan|bulan ini|bulan depan"
+    r"|\d+\s*(?:hari|minggu)(?:\s+lagi)?|\d{1,2}\s+[a-z]+(?:\s+\d{4})?)\b"
+)
+
+def _deadline_from_phrase(when: str, today: date) -> Optional[date]:
+    """Batas akhir deadline dari frasa relatif ("minggu ini") atau tanggal ("31 oktober")"""
+    if when == "hari ini":
+        return today
+    if when == "besok":
+        return today + timedelta(days=1)
+    if when.startswith("minggu"):
+        end_of_week = today + timedelta(days=6 - today.weekday())
+        return end_of_week if when == "minggu ini" else end_of_week + timedelta(days=7)
+    if when.startswith("bulan"):
+        year, month = today.year, today.month
+        if when == "bulan depan":
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return date(year, month, calendar.monthrange(year, month)[1])
+    match = re.fullmatch(r"(\d+)\s*(hari|minggu)(?:\s+lagi)?", when)
+    if match:
+        return today + timedelta(days=int(match.group(1)) * (7 if match.group(2) == "minggu" else 1))
+    return parse_deadline(when, today=today)
+
+@dataclass(frozen=True)
+class QueryAnalysis:
+    """
+    Hasil analisis satu pesan (immutable, aman dipakai bersama dari cache).
+    fields = label bidang (mis. "IT"), field_terms = term kosakata yang dipakai sebagai keyword pencarian
+    (mis. "data science"), hint_terms = kata sisa tanpa pola bidang (mis. "kasir") yang hanya dipakai
+    untuk ranking, bukan token wajib di query, locations = kota kanonik seperti di kolom lokasi_kota.
+    """
+    text: str
+    intent: IntentType
+    fields: Tuple[str, ...] = ()
+    field_terms: Tuple[str, ...] = ()
+    hint_terms: Tuple[str, ...] = ()
+    locations: Tuple[str, ...] = ()
+    experience: Tuple[str, ...] = ()
+    work_type: Tuple[str, ...] = ()
+    confidence: float = 0.0
+    corrections: Tuple[Tuple[str, str], ...] = ()   # (kata asli, koreksi ejaan)
+    min_salary: Optional[int] = None                # filter gaji_max >= min_salary (IDR per bulan)
+    deadline_before: Optional[date] = None          # filter deadline_date sampai tanggal ini (magang)
+
+    @property
+    def keyword(self) -> str:
+        """Keyword untuk query database"""
+        return " ".join(self.field_terms)
+
+    @property
+    def location(self) -> str:
+        """Lokasi untuk query database"""
+        return " ".join(self.locations)
+
+    def as_dict(self) -> Dict:
+        """Ringkasan untuk prompt dan log"""
+        data = asdict(self)
+        data["intent"] = self.intent.value
+        data.pop("text")
+        if self.deadline_before:
+            data["deadline_before"] = self.deadline_before.isoformat()
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in data.items()}
+
+class QueryAnalyzer(EnhancedKeywordExtractor):
+    """
+    Satu tahap analisis per pesan: intent, bidang, lokasi, experience, work type dan confidence
+    dari satu kali pindai KeywordMatcher. Hasil di-cache per teks yang sudah dibersihkan,
+    sehingga pencarian, pembuatan prompt dan logging memakai hasil yang sama.
+    Kata yang salah ketik dikoreksi lebih dulu lewat FuzzyIndex atas kosakata matcher.
+    Frasa gaji dan deadline ("gaji di atas 5 juta", "deadline minggu ini") diubah menjadi filter
+    min_salary / deadline_before dan dihapus dari teks sebelum analisis keyword.
+    """
+
+    def __init__(self, cache_size: int = None, fuzzy: bool = None):
+        super().__init__()
+        cache_size = cache_size or int(os.getenv("QUERY_ANALYZER_CACHE_SIZE", 1024))
+        self._analyze_cleaned = lru_cache(maxsize=cache_size)(self._analyze_cleaned)
+        self.listing_signals = lru_cache(maxsize=cache_size)(self.listing_signals)
+
+        if fuzzy is None:
+            fuzzy = os.getenv("FUZZY_MATCHING", "true").lower() == "true"
+        self.fuzzy_index = None
+        if fuzzy:
+            # Kosakata intent dulu, agar koreksi dengan jarak sama memilih kata intent
+            groups = ('intent', 'location', 'field', 'work_type', 'experience', 'greeting')
+            self.fuzzy_index = FuzzyIndex(word for group in groups for word in self._matcher.vocabulary[group])
+
+    def analyze(self, text: str, today: date = None) -> QueryAnalysis:
+        """Analisis pesan pengguna (hasil di-cache)"""
+        text = text.lower()
+        min_salary, deadline_before = None, None
+
+        # Frasa dicari di teks asli (sebelum _clean_text) agar "5.000.000" tidak terpecah
+        salary = _SALARY_PHRASE.search(text)
+        if salary:
+            low, _, currency = parse_salary(salary.group("amount") or salary.group("unit_amount"))
+            # Filter gaji hanya untuk rupiah (kolom gaji_currency default IDR)
+            if low and currency == "IDR":
+                min_salary = low
+                text = text[:salary.start()] + " " + text[salary.end():]
+        deadline = _DEADLINE_PHRASE.search(text)
+        if deadline:
+            deadline_before = _deadline_from_phrase(deadline.group("when"), today or date.today())
+            if deadline_before:
+                text = text[:deadline.start()] + " " + text[deadline.end():]
+
+        analysis = self._analyze_cleaned(self._clean_text(text))
+        if min_salary or deadline_before:
+            analysis = replace(analysis, min_salary=min_salary, deadline_before=deadline_before)
+        return analysis
+
+    def listing_signals(self, text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Experience level dan work type yang disebut di teks listing (posisi, tipe pekerjaan)"""
+        matched = self._matcher.match(self._clean_text(text.lower()))
+        return tuple(matched['experience']), tuple(matched['work_type'])
+
+    def cache_info(self):
+        return self._analyze_cleaned.cache_info()
+
+    def _adds_match(self, words, corrected) -> bool:
+        """Koreksi hanya dipakai jika menghasilkan label yang tidak cocok dengan teks asli"""
+        before = self._matcher.match(" ".join(words))
+        after = self._matcher.match(" ".join(corrected))
+        return any(label not in before[group] for group, labels in after.items() for label in labels)
+
+    def _analyze_cleaned(self, cleaned_text: str) -> QueryAnalysis:
+        corrections = ()
+        if self.fuzzy_index and cleaned_text:
+            words = cleaned_text.split(" ")
+            corrected, found = self.fuzzy_index.correct(words, skip=self.stop_words, accept=self._adds_match)
+            corrections = tuple(found)
+            cleaned_text = " ".join(corrected)
+        matched, terms = self._matcher.analyze(cleaned_text)
+
+        # Intent pencarian dengan skor tertinggi (urutan intent_patterns jika seri), lalu sapaan
+        scores = {intent: matched['intent'].get(intent, 0) for intent in self.intent_patterns}
+        best = max(scores, key=scores.get)
+        if scores[best]:
+            intent = IntentType(best)
+        elif matched['greeting']:
+            intent = IntentType.GREETING
+        else:
+            intent = IntentType.UNKNOWN
+
+        field_terms = terms['field'][:3]
+        hint_terms = []
+        if not field_terms and intent != IntentType.GREETING:
+            # Tanpa pola bidang: kata sisa (kecuali yang dikenali sebagai intent/lokasi/dll.) hanya jadi
+            # petunjuk ranking; kata pengisi seperti "terbaru" / "dong" tidak boleh jadi token FTS wajib
+            covered = {word for group in ('intent', 'location', 'experience', 'work_type', 'greeting')
+                       for term in terms[group] for word in term.split()}
+            hint_terms = self._guess_fields(" ".join(word for word in cleaned_text.split() if word not in covered))
+
+        fields = tuple(matched['field'])
+        locations = tuple(matched['location'])
+        confidence = self._calculate_confidence(intent.value, list(fields or field_terms or hint_terms), list(locations))
+        return QueryAnalysis(
+            text=cleaned_text,
+            intent=intent,
+            fields=fields,
+            field_terms=tuple(field_terms),
+            hint_terms=tuple(hint_terms),
+            locations=locations,
+            experience=tuple(matched['experience']),
+            work_type=tuple(matched['work_type']),
+            confidence=round(confidence, 2),
+            corrections=corrections,
+        )
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Penanda cache miss (hasil kosong [] tetap boleh di-cache)
+MISS = object()
+
+def normalize_terms(terms: Iterable[str], ordered: bool = True) -> Tuple[str, ...]:
+    """
+    Lowercase, rapikan spasi dan buang duplikat. ordered=False mengurutkan term, untuk query
+    yang hasilnya tidak bergantung urutan (FTS: semua token wajib ada), sehingga
+    "jakarta python" dan "python jakarta" memakai entry cache yang sama.
+    """
+    normalized = (" ".join(str(term).lower().split()) for term in terms or [])
+    unique = tuple(dict.fromkeys(term for term in normalized if term))
+    return unique if ordered else tuple(sorted(unique))
+
+class QueryCache:
+    """
+    Cache hasil pencarian in-process: LRU dengan batas jumlah entry dan total byte.
+    Setiap entry dicatat dengan generation saat disimpan; scraper menaikkan generation
+    setelah menyimpan data sehingga semua hasil lama otomatis tidak berlaku.
+    TTL menjadi batas atas untuk perubahan dari proses lain (mis. `python -m bot.scraper`).
+    """
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None, ttl: float = None):
+        self.max_entries = max_entries or int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 512))
+        self.max_bytes = max_bytes or int(os.getenv("QUERY_CACHE_MAX_BYTES", 4 * 1024 * 1024))
+        self.ttl = ttl if ttl is not None else float(os.getenv("QUERY_CACHE_TTL", 600))
+        self.enabled = os.getenv("QUERY_CACHE", "true").lower() == "true"
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _size(value: Any) -> int:
+        """Perkiraan ukuran hasil dalam byte (ukuran JSON-nya)"""
+        return len(json.dumps(value, ensure_ascii=False, default=str))
+
+    def _drop(self, key: Hashable):
+        _, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable) -> Any:
+        """Hasil yang tersimpan, atau MISS jika tidak ada / sudah tidak berlaku"""
+        if not self.enabled:
+            return MISS
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generation, stored_at, _, value = entry
+                if generation == self.generation and (not self.ttl or time.monotonic() - stored_at < self.ttl):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._drop(key)
+            self.misses += 1
+            return MISS
+
+    def set(self, key: Hashable, value: Any, generation: int = None):
+        """
+        Simpan hasil. `generation` = nilai generation sebelum query dijalankan,
+        agar hasil query yang berjalan bersamaan dengan scraper tidak ikut disimpan.
+        """
+        if not self.enabled:
+            return
+        size = self._size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self.generation, time.monotonic(), size, value)
+            self._bytes += size
+            # Buang entry paling lama tidak dipakai sampai kembali di bawah batas
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def bump(self, reason: str = ""):
+        """Naikkan generation: semua hasil yang tersimpan tidak berlaku lagi"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+        logger.debug(f"Query cache generation {self.generation}{f' ({reason})' if reason else ''}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+# Cache bersama untuk proses bot (dipakai EnhancedLLMIntegration, di-bump oleh scraper)
+query_cache = QueryCache()
+
+def bump_generation(reason: str = ""):
+    query_cache.bump(reason)
@@ -0,0 +1,140 @@
+import os
+import re
+import logging
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+from bot.utils.query_analyzer import QueryAnalysis, QueryAnalyzer
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Fitur relevansi (urutan kolom matriks fitur) dan bobot default
+FEATURES = ("title", "company", "other", "phrase", "location", "recency", "experience", "work_type", "semantic")
+DEFAULT_WEIGHTS = {
+    "title": 3.0,        # proporsi token keyword di posisi / judul kursus
+    "company": 1.0,      # ... di perusahaan / platform
+    "other": 0.5,        # ... di kolom lain (tipe pekerjaan)
+    "phrase": 2.0,       # term bidang muncul utuh sebagai frasa di judul
+    "location": 1.5,     # kota listing sesuai lokasi yang diminta
+    "recency": 1.0,      # peluruhan eksponensial dari tanggal_scrape
+    "experience": 1.0,   # level experience cocok (+1) / jelas berbeda (-1)
+    "work_type": 0.75,   # work type cocok (+1) / jelas berbeda (-1)
+    "semantic": 2.0,     # cosine similarity dari semantic search (jika aktif)
+}
+
+# Kolom per tipe item untuk fitur title / company / other
+COLUMN_FEATURES = {
+    "magang": {"title": "posisi", "company": "perusahaan"},
+    "pekerjaan": {"title": "posisi", "company": "perusahaan", "other": "job_type"},
+    "kursus": {"title": "title", "company": "sumber"},
+}
+
+def _tokens(text) -> set:
+    return set(re.findall(r"\w+", str(text or "").lower()))
+
+def _parse_weights(text: str) -> Dict[str, float]:
+    """RANKING_WEIGHTS="title=3,recency=0.5" -> bobot yang menimpa default"""
+    weights = {}
+    for part in (text or "").split(","):
+        name, _, value = part.partition("=")
+        if name.strip() in DEFAULT_WEIGHTS and value.strip():
+            weights[name.strip()] = float(value)
+    return weights
+
+def _match_signal(wanted: Sequence[str], found: Sequence[str]) -> float:
+    """+1 jika listing menyebut salah satu yang dicari, -1 jika hanya menyebut yang lain, 0 jika tidak diketahui"""
+    if not wanted or not found:
+        return 0.0
+    return 1.0 if set(wanted) & set(found) else -1.0
+
+class RankingEngine:
+    """
+    Urutkan kandidat hasil pencarian sebelum dikirim ke LLM.
+    Kandidat diambil berlebih (RANKING_OVERFETCH x jumlah yang dibutuhkan), setiap kandidat
+    diubah menjadi satu baris matriks fitur, lalu skor = matriks fitur @ bobot dalam satu kali hitung.
+    Sinyal experience / work type listing dideteksi dengan kosakata QueryAnalyzer yang sama.
+    """
+
+    def __init__(self, analyzer: QueryAnalyzer, weights: Dict[str, float] = None):
+        self.analyzer = analyzer
+        weights = {**DEFAULT_WEIGHTS, **_parse_weights(os.getenv("RANKING_WEIGHTS", "")), **(weights or {})}
+        self.weights = np.array([weights[name] for name in FEATURES], dtype=np.float32)
+        self.overfetch_factor = int(os.getenv("RANKING_OVERFETCH", 5))
+        self.recency_half_life = float(os.getenv("RANKING_RECENCY_DAYS", 14))
+
+    def overfetch(self, limit: int) -> int:
+        """Jumlah kandidat yang diambil dari database untuk `limit` hasil akhir"""
+        return max(limit, limit * self.overfetch_factor)
+
+    def features(self, items: List[Dict], analysis: QueryAnalysis, item_type: str = None) -> np.ndarray:
+        """Matriks fitur (jumlah item x len(FEATURES))"""
+        matrix = np.zeros((len(items), len(FEATURES)), dtype=np.float32)
+        keyword_tokens = _tokens(" ".join(analysis.field_terms + analysis.hint_terms))
+        phrases = [f" {term} " for term in analysis.field_terms]
+        cities = set(analysis.locations)
+        column = {name: position for position, name in enumerate(FEATURES)}
+
+        for row, item in enumerate(items):
+            columns = COLUMN_FEATURES.get(item.get("type", item_type), {})
+            if keyword_tokens:
+                for feature, name in columns.items():
+                    matrix[row, column[feature]] = len(keyword_tokens & _tokens(item.get(name))) / len(keyword_tokens)
+            title = " ".join(re.findall(r"\w+", str(item.get(columns.get("title")) or "").lower()))
+            if phrases and any(phrase in f" {title} " for phrase in phrases):
+                matrix[row, column["phrase"]] = 1.0
+            if cities and item.get("lokasi_kota") in cities:
+                matrix[row, column["location"]] = 1.0
+            if analysis.experience or analysis.work_type:
+                experience, work_type = self.analyzer.listing_signals(f"{title} {item.get('job_type') or ''}")
+                matrix[row, column["experience"]] = _match_signal(analysis.experience, experience)
+                matrix[row, column["work_type"]] = _match_signal(analysis.work_type, work_type)
+            matrix[row, column["semantic"]] = item.get("semantic_score") or 0.0
+
+        matrix[:, column["recency"]] = self._recency([item.get("tanggal_scrape") for item in items])
+        return matrix
+
+    def _recency(self, timestamps: List[Optional[str]]) -> np.ndarray:
+        """exp(-ln2 * umur / half-life), 0 untuk tanggal yang tidak valid"""
+        parsed = np.array([self._timestamp(value) for value in timestamps], dtype="datetime64[s]")
+        valid = ~np.isnat(parsed)
+        age_days = np.zeros(len(parsed), dtype=np.float64)
+        age_days[valid] = (np.datetime64("now", "s") - parsed[valid]).astype(np.float64) / 86400
+        recency = np.exp(-np.log(2) * np.clip(age_days, 0, None) / self.recency_half_life)
+        return np.where(valid, recency, 0.0)
+
+    @staticmethod
+    def _timestamp(value) -> np.datetime64:
+        try:
+            return np.datetime64(str(value).replace(" ", "T")[:19], "s")
+        except ValueError:
+            return np.datetime64("NaT", "s")
+
+    def rank(self, items: List[Dict], analysis: QueryAnalysis, limit: int = None,
+             item_type: str = None, per_type: int = None) -> List[Dict]:
+        """
+        Item terurut dari skor tertinggi, masing-masing diberi `rank_score`.
+        per_type membatasi jumlah item per kategori (hasil campuran search_all).
+        """
+        if not items:
+            return []
+        try:
+            scores = self.features(items, analysis, item_type) @ self.weights
+        except Exception as e:
+            logger.error(f"❌ Ranking gagal, urutan database dipakai: {str(e)}")
+            return items[:limit] if limit else items
+
+        # argsort stabil: skor sama tetap mengikuti urutan database (bm25 / terbaru)
+        order = np.argsort(-scores, kind="stable")
+        ranked, counts = [], {}
+        for position in order:
+            item = items[position]
+            kind = item.get("type", item_type)
+            if per_type and counts.get(kind, 0) >= per_type:
+                continue
+            counts[kind] = counts.get(kind, 0) + 1
+            ranked.append({**item, "rank_score": round(float(scores[position]), 4)})
+            if limit and len(ranked) >= limit:
+                break
+        return ranked
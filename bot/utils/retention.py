@@ -0,0 +1,91 @@
+import os
+import time
+import logging
+from typing import Dict, List
+from dotenv import load_dotenv
+from bot.utils.database import DatabaseIntern, DatabaseJob, DatabaseCourse, connection_pool
+from bot.utils.query_cache import bump_generation
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+class RetentionManager:
+    """
+    Retention listing dan perawatan file SQLite:
+    1. expire  - listing yang tidak terlihat di N crawl lengkap, tidak terlihat selama N x interval
+                 scraping, atau deadline-nya lewat ditandai expired
+    2. purge   - listing expired lebih dari grace period dipindah ke tabel *_archive lalu dihapus
+    3. compact - optimize index FTS, ANALYZE, VACUUM (jika banyak halaman kosong) dan PRAGMA optimize
+    Dijalankan terjadwal di jam sepi (lihat Dispatcher).
+    """
+
+    def __init__(self, databases: List = None):
+        self.databases = databases or [DatabaseIntern(), DatabaseJob(), DatabaseCourse()]
+        self.max_missed = int(os.getenv("RETENTION_UNSEEN_SCRAPES", 3))
+        # Fallback berbasis umur: N x interval terlama antara scraping dan crawl penuh
+        interval_hours = max(int(os.getenv("SCRAPE_INTERVAL_MINUTES", 360)) / 60,
+                             float(os.getenv("SCRAPER_FULL_CRAWL_HOURS", 24)))
+        self.max_age_hours = float(os.getenv("RETENTION_MAX_AGE_HOURS", self.max_missed * interval_hours))
+        self.grace_days = int(os.getenv("RETENTION_GRACE_DAYS", 7))
+        # archive: pindahkan ke tabel *_archive | purge: hapus langsung | keep: hanya tandai expired
+        self.mode = os.getenv("RETENTION_MODE", "archive").lower()
+        # VACUUM hanya jika proporsi halaman kosong melewati batas ini
+        self.vacuum_free_ratio = float(os.getenv("RETENTION_VACUUM_FREE_RATIO", 0.2))
+
+    def expire(self) -> Dict[str, int]:
+        return {type(db).__name__: db.expire(self.max_missed, self.max_age_hours) for db in self.databases}
+
+    def purge(self) -> Dict[str, int]:
+        if self.mode == "keep":
+            return {}
+        archive = self.mode != "purge"
+        return {type(db).__name__: db.purge_expired(self.grace_days, archive=archive) for db in self.databases}
+
+    def compact(self, db_path) -> bool:
+        """Rawat satu file database. Return True jika VACUUM dijalankan"""
+        conn = connection_pool.get(db_path)
+
+        # Gabungkan segmen index FTS5 yang terfragmentasi
+        fts_tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%fts5%'"
+        )]
+        for fts_table in fts_tables:
+            conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('optimize')")
+        conn.commit()
+
+        conn.execute("ANALYZE")
+
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        vacuumed = False
+        if page_count and freelist / page_count >= self.vacuum_free_ratio:
+            conn.execute("VACUUM")
+            vacuumed = True
+
+        conn.execute("PRAGMA optimize")
+        # Kecilkan file WAL setelah penulisan besar
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return vacuumed
+
+    def run(self):
+        """Satu putaran retention + perawatan (untuk job terjadwal)"""
+        started = time.monotonic()
+        try:
+            expired = self.expire()
+            purged = self.purge()
+            if any(expired.values()):
+                bump_generation("retention")
+
+            vacuumed = []
+            for db_path in dict.fromkeys(str(db.db_path) for db in self.databases):
+                if self.compact(db_path):
+                    vacuumed.append(os.path.basename(db_path))
+
+            logger.info(
+                f"🧹 Retention selesai dalam {time.monotonic() - started:.1f} detik - "
+                f"expired: {expired}, {'diarsip' if self.mode == 'archive' else 'dihapus'}: {purged}, "
+                f"VACUUM: {', '.join(vacuumed) or '-'}"
+            )
+        except Exception as e:
+            logger.error(f"❌ Retention gagal: {str(e)}", exc_info=True)
@@ -0,0 +1,221 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from bot.utils.database import EmbeddingStore
+from bot.utils.query_cache import query_cache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_SEARCH = os.getenv("SEMANTIC_SEARCH", "false").lower() == "true"
+
+# Kolom yang di-embed per tipe item (lokasi tidak ikut, lokasi difilter lewat kolom terstruktur)
+EMBED_COLUMNS = {
+    "magang": ("posisi", "perusahaan"),
+    "pekerjaan": ("posisi", "perusahaan", "job_type"),
+    "kursus": ("title", "sumber"),
+}
+
+def _listing_text(row: Dict, columns: Sequence[str]) -> str:
+    return " ".join(str(row[column]) for column in columns if row.get(column))
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """float32 (N x D) -> int8 (N x D) dengan skala per baris (nilai asli ~= int8 * skala)"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+class StaticEmbedder:
+    """
+    Embedding statis ala Model2Vec: setiap token punya satu vektor, embedding teks = rata-rata
+    vektor token lalu dinormalisasi. Tanpa transformer, jadi cukup CPU dan cepat.
+    Model berupa tokenizer.json + model.safetensors (tensor "embeddings"), dari folder lokal
+    atau diunduh dari Hugging Face Hub.
+    """
+
+    def __init__(self, model_name: str = None):
+        from tokenizers import Tokenizer
+        from safetensors import safe_open
+
+        self.model_name = model_name or os.getenv("SEMANTIC_MODEL", "minishlab/potion-multilingual-128M")
+        path = self.model_name
+        if not os.path.isdir(path):
+            from huggingface_hub import snapshot_download
+            path = snapshot_download(self.model_name, allow_patterns=["tokenizer.json", "model.safetensors", "config.json"])
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(path, "tokenizer.json"))
+        with safe_open(os.path.join(path, "model.safetensors"), framework="numpy") as f:
+            # float16 cukup untuk tabel token dan memakai separuh memori
+            self.embeddings = f.get_tensor("embeddings").astype(np.float16)
+        self.dimension = self.embeddings.shape[1]
+
+        unk_token = getattr(self.tokenizer.model, "unk_token", None)
+        self.unk_id = self.tokenizer.token_to_id(unk_token) if unk_token else None
+        logger.info(f"🧠 Model embedding {self.model_name} dimuat ({self.embeddings.shape[0]} token x {self.dimension})")
+
+    def encode(self, texts: List[str], batch_size: int = 256) -> np.ndarray:
+        """Embedding ternormalisasi (float32, N x D); teks tanpa token dikenal menjadi vektor nol"""
+        result = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size], add_special_tokens=False)
+            for offset, encoding in enumerate(encodings):
+                ids = [token_id for token_id in encoding.ids if token_id != self.unk_id]
+                if ids:
+                    result[start + offset] = self.embeddings[ids].astype(np.float32).mean(axis=0)
+        norms = np.linalg.norm(result, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return result / norms
+
+class SemanticIndex:
+    """
+    Index embedding listing aktif di memori untuk top-k cosine similarity.
+    Di database disimpan sebagai int8 (EmbeddingStore); di memori didekuantisasi sekali menjadi
+    matriks float32 yang diurutkan per tipe, sehingga satu query = satu perkalian matriks-vektor
+    pada potongan tipe yang diminta.
+    Index dimuat ulang jika scraper menaikkan generation query cache atau setelah SEMANTIC_RELOAD_SECONDS.
+    """
+
+    def __init__(self, enabled: bool = None, model_name: str = None):
+        self.enabled = SEMANTIC_SEARCH if enabled is None else enabled
+        self.model_name = model_name or os.getenv("SEMANTIC_MODEL", "minishlab/potion-multilingual-128M")
+        self.reload_seconds = float(os.getenv("SEMANTIC_RELOAD_SECONDS", 600))
+        self.weight = float(os.getenv("SEMANTIC_WEIGHT", 0.5))
+        # Kandidat yang hanya ditemukan lewat embedding harus minimal semirip ini
+        self.min_similarity = float(os.getenv("SEMANTIC_MIN_SIMILARITY", 0.3))
+        self._embedder: Optional[StaticEmbedder] = None
+        self._store: Optional[EmbeddingStore] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._slices: Dict[str, Tuple[int, int]] = {}
+        self._rows: Dict[Tuple[str, int], int] = {}
+        self._loaded_generation = None
+        self._loaded_at = 0.0
+
+    @property
+    def embedder(self) -> StaticEmbedder:
+        with self._lock:
+            if self._embedder is None:
+                self._embedder = StaticEmbedder(self.model_name)
+            return self._embedder
+
+    @property
+    def store(self) -> EmbeddingStore:
+        if self._store is None:
+            self._store = EmbeddingStore()
+        return self._store
+
+    def ingest(self, item_types: Iterable[str] = None) -> int:
+        """Embed listing aktif yang belum punya embedding atau teksnya berubah (dipanggil setelah scraping)"""
+        if not self.enabled:
+            return 0
+        total = 0
+        for item_type in item_types or EMBED_COLUMNS:
+            columns = EMBED_COLUMNS[item_type]
+            pending = []
+            for row in self.store.listing_texts(item_type, columns):
+                text = _listing_text(row, columns)
+                text_hash = _text_hash(text)
+                if row["model"] != self.model_name or row["text_hash"] != text_hash:
+                    pending.append((row["id"], text, text_hash))
+            removed = self.store.prune(item_type)
+            if not pending:
+                continue
+
+            vectors, scales = quantize(self.embedder.encode([text for _, text, _ in pending]))
+            self.store.save(item_type, self.model_name, [
+                (item_id, text_hash, float(scale), vector.tobytes())
+                for (item_id, _, text_hash), scale, vector in zip(pending, scales, vectors)
+            ])
+            total += len(pending)
+            logger.info(f"🧠 {len(pending)} embedding {item_type} diperbarui ({removed} dihapus)")
+        return total
+
+    def warm_up(self):
+        """Muat model, embed listing yang belum punya embedding, lalu muat index"""
+        try:
+            self.ingest()
+            self.load()
+        except Exception as e:
+            logger.error(f"❌ Gagal menyiapkan semantic search: {str(e)}", exc_info=True)
+
+    def load(self):
+        """Muat semua embedding listing aktif ke memori"""
+        # Generation dicatat sebelum membaca, agar data yang masuk selama load memicu reload berikutnya
+        generation = query_cache.generation
+        rows = self.store.load(self.model_name)
+        rows.sort(key=lambda row: list(EMBED_COLUMNS).index(row["item_type"]))
+
+        dimension = len(rows[0]["vector"]) if rows else 0
+        quantized = np.frombuffer(b"".join(row["vector"] for row in rows), dtype=np.int8).reshape(len(rows), dimension)
+        scales = np.array([row["scale"] for row in rows], dtype=np.float32)
+        matrix = quantized.astype(np.float32) * scales[:, None]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        slices, start = {}, 0
+        for item_type in EMBED_COLUMNS:
+            count = sum(1 for row in rows if row["item_type"] == item_type)
+            slices[item_type] = (start, start + count)
+            start += count
+
+        with self._lock:
+            self._matrix = matrix / norms
+            self._ids = np.array([row["item_id"] for row in rows], dtype=np.int64)
+            self._slices = slices
+            self._rows = {(row["item_type"], row["item_id"]): position for position, row in enumerate(rows)}
+            self._loaded_generation = generation
+            self._loaded_at = time.monotonic()
+        logger.info(f"🧠 Semantic index dimuat: {len(rows)} listing")
+
+    def _stale(self) -> bool:
+        return (self._loaded_generation != query_cache.generation
+                or time.monotonic() - self._loaded_at > self.reload_seconds)
+
+    def _ensure_loaded(self):
+        if self._stale():
+            # Satu thread yang memuat ulang, thread lain menunggu lalu memakai hasilnya
+            with self._load_lock:
+                if self._stale():
+                    self.load()
+
+    def search(self, query: str, item_type: str, top_k: int = 20,
+               include_ids: Iterable[int] = ()) -> Dict[int, float]:
+        """
+        Cosine similarity query terhadap listing satu tipe: top_k teratas (minimal min_similarity)
+        ditambah skor untuk `include_ids` (mis. hasil pencarian keyword). Return {item_id: skor}.
+        """
+        if not self.enabled or not query:
+            return {}
+        self._ensure_loaded()
+        query_vector = self.embedder.encode([query])[0]
+        with self._lock:
+            start, stop = self._slices.get(item_type, (0, 0))
+            matrix, ids, rows = self._matrix[start:stop], self._ids[start:stop], self._rows
+        if not len(ids) or not query_vector.any():
+            return {}
+
+        scores = matrix @ query_vector
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        result = {int(ids[position]): float(scores[position]) for position in top
+                  if scores[position] >= self.min_similarity}
+        for item_id in include_ids:
+            position = rows.get((item_type, item_id))
+            if position is not None and item_id not in result:
+                result[item_id] = float(scores[position - start])
+        return result
+
+# Index bersama untuk proses bot (diisi scraper setelah menyimpan data)
+semantic_index = SemanticIndex()
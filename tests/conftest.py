@@ -0,0 +1,19 @@
+import pytest
+from bot.utils.database import connection_pool
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    """Database gabungan baru per test (DB_FILE di folder sementara)"""
+    path = tmp_path / "telebot.db"
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path))
+    monkeypatch.setenv("DB_FILE", str(path))
+    yield path
+    connection_pool.close_all()
+
+@pytest.fixture
+def scraper_env(db_file, monkeypatch):
+    monkeypatch.setenv("SCRAPER_FETCH_MODE", "http")
+    monkeypatch.setenv("SCRAPER_RATE_LIMIT_GLINTS", "0")
+    monkeypatch.setenv("SCRAPER_PAGE_CONCURRENCY", "3")
+    monkeypatch.setenv("SCRAPER_PAGE_BUDGET", "5")
+    return db_file
@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlparse
+import httpx
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from bot.scraper import data_scraper
+from bot.scraper.data_scraper import GlintsScraper
+
+LISTING_URL = "https://glints.test/lowongan"
+
+def _card(company: str, position: str) -> str:
+    return (
+        '<div class="JobCardsc__JobCardWrapper-sc-hmqj50-1">'
+        f'<h3>{position}</h3>'
+        f'<a class="CompactOpportunityCardsc__CompanyLink-sc-dkg8my-14">{company}</a>'
+        '</div>'
+    )
+
+def _html(cards) -> str:
+    return f"<html><body>{''.join(_card(*card) for card in cards)}</body></html>"
+
+class FakeGlints:
+    """Situs Glints palsu untuk httpx.MockTransport: page -> daftar (perusahaan, posisi)"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params.get("page", 1))
+        self.requested.append(page)
+        return httpx.Response(200, text=_html(self.pages.get(page, [])))
+
+def scrape(site: FakeGlints, full_crawl_hours: float):
+    """Satu run GlintsScraper terhadap situs palsu, termasuk simpan dan commit state"""
+    scraper = GlintsScraper(url=LISTING_URL)
+    scraper.http_transport = httpx.MockTransport(site)
+    scraper.full_crawl_hours = full_crawl_hours
+    scraper.scrape(sink=scraper.save)
+    scraper.commit_state()
+    return scraper
+
+class FakeBrowser:
+    """Driver Selenium palsu di atas FakeGlints; halaman di `timeouts` tidak pernah selesai dimuat"""
+
+    def __init__(self, site: FakeGlints, timeouts=()):
+        self.site = site
+        self.timeouts = set(timeouts)
+        self.page_source = ""
+
+    def set_page_load_timeout(self, seconds: float):
+        pass
+
+    def get(self, url: str):
+        page = int(parse_qs(urlparse(url).query).get("page", ["1"])[0])
+        self.site.requested.append(page)
+        if page in self.timeouts:
+            raise TimeoutException(f"Timed out loading {url}")
+        self.page_source = _html(self.site.pages.get(page, []))
+
+    def find_elements(self, by, value):
+        return [value] * self.page_source.count("JobCardWrapper")
+
+    def find_element(self, by, value):
+        if not self.find_elements(by, value):
+            raise NoSuchElementException(value)
+        return value
+
+    def execute_script(self, script: str, *args):
+        if "readyState" in script:
+            return "complete"
+        if "scrollHeight" in script:
+            return len(self.page_source)
+        return None
+
+class FakeBrowserPool:
+    """Pengganti browser_pool yang selalu meminjamkan FakeBrowser yang sama"""
+
+    def __init__(self, driver: FakeBrowser):
+        self.driver = driver
+
+    @contextmanager
+    def session(self):
+        yield self.driver
+
+    def record_pages(self, driver, count: int = 1):
+        pass
+
+def scrape_browser(site: FakeGlints, monkeypatch, timeouts=()):
+    """Satu run GlintsScraper via browser palsu (crawl penuh), termasuk simpan dan commit state"""
+    monkeypatch.setenv("SCRAPER_FETCH_MODE", "browser")
+    monkeypatch.setenv("SCRAPER_SCROLL_WAIT", "0")
+    monkeypatch.setenv("SCRAPER_NEXT_PAGE_WAIT", "0.1")
+    monkeypatch.setattr(data_scraper, "browser_pool", FakeBrowserPool(FakeBrowser(site, timeouts)))
+    scraper = GlintsScraper(url=LISTING_URL)
+    scraper.full_crawl_hours = 0
+    scraper.scrape(sink=scraper.save)
+    scraper.commit_state()
+    return scraper
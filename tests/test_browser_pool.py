@@ -0,0 +1,84 @@
+from bot.scraper.browser_pool import BrowserPool
+
+class FakeDriver:
+    """Pengganti webdriver.Chrome secukupnya untuk reset dan quit di pool"""
+
+    def __init__(self):
+        self.quit_called = False
+        self.current_url = "about:blank"
+        self.window_handles = ["main"]
+        self.switch_to = self
+        self.service = None
+
+    def window(self, handle):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        self.current_url = url
+
+    def quit(self):
+        self.quit_called = True
+
+class FakeClock:
+    """Monotonic clock yang hanya maju lewat advance()"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+def _pool(idle_timeout, max_pages=50, clock=None):
+    pool = BrowserPool(max_size=1, max_pages=max_pages, max_memory_mb=400, idle_timeout=idle_timeout,
+                       clock=clock or FakeClock())
+    pool._create_driver = FakeDriver
+    return pool
+
+def test_idle_driver_reused_then_closed_after_timeout():
+    clock = FakeClock()
+    pool = _pool(idle_timeout=300, clock=clock)
+    with pool.session() as driver:
+        pass
+    clock.advance(200)
+    with pool.session() as reused:
+        assert reused is driver
+
+    # idle_since dihitung dari checkin terakhir
+    clock.advance(250)
+    assert pool.close_idle(idle_for=300) == 0
+    assert not driver.quit_called
+
+    clock.advance(50)
+    assert pool.close_idle(idle_for=300) == 1
+    assert driver.quit_called
+    assert pool._idle == []
+    pool.shutdown()
+
+def test_driver_recycled_after_max_pages():
+    pool = _pool(idle_timeout=0, max_pages=3)
+    with pool.session() as driver:
+        pool.record_pages(driver, 1)
+    with pool.session() as reused:
+        assert reused is driver
+    assert driver.quit_called
+    assert pool._idle == []
+
+    with pool.session() as fresh:
+        assert fresh is not driver
+
+def test_idle_timeout_zero_keeps_driver():
+    pool = _pool(idle_timeout=0)
+    with pool.session() as driver:
+        pass
+    assert pool._reaper is None
+    assert pool.close_idle(idle_for=60) == 0
+    assert not driver.quit_called
+
+    pool.shutdown()
+    assert driver.quit_called
@@ -0,0 +1,105 @@
+import sqlite3
+from bot.utils.database import DatabaseCourse, DatabaseIntern, DatabaseJob, DatabaseSearch
+
+LEGACY_MAGANG = """
+    CREATE TABLE magang (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, sumber TEXT NOT NULL, perusahaan TEXT NOT NULL,
+        posisi TEXT NOT NULL, lokasi TEXT, gaji TEXT, deadline TEXT,
+        tanggal_scrape TIMESTAMP DEFAULT CURRENT_TIMESTAMP, UNIQUE(perusahaan, posisi)
+    )
+"""
+LEGACY_JOBS = """
+    CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, sumber TEXT, perusahaan TEXT, posisi TEXT,
+        lokasi TEXT, gaji TEXT, job_type TEXT, tanggal_scrape TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(perusahaan, posisi)
+    )
+"""
+
+def _legacy_file(path, schema, table, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(schema)
+    columns = ", ".join(rows[0])
+    conn.executemany(
+        f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' * len(rows[0]))})",
+        [tuple(row.values()) for row in rows]
+    )
+    conn.commit()
+    conn.close()
+
+def _rows(db, table):
+    with db._get_connection() as conn:
+        return [dict(row) for row in conn.execute(f"SELECT * FROM {table} ORDER BY id")]
+
+def test_legacy_files_imported_and_normalized(db_file):
+    _legacy_file(db_file.parent / "intern.db", LEGACY_MAGANG, "magang", [
+        {"sumber": "Kalibrr", "perusahaan": "PT A", "posisi": "Data Intern", "lokasi": "Kebon Jeruk, Jakarta Barat",
+         "gaji": "Rp 3.000.000 - Rp 4.500.000", "deadline": "-", "tanggal_scrape": "2025-01-02 10:00:00"},
+        {"sumber": "Kalibrr", "perusahaan": "PT B", "posisi": "HR Intern", "lokasi": "Bandung",
+         "gaji": "-", "deadline": "-", "tanggal_scrape": "2025-01-03 10:00:00"},
+    ])
+    job = {"sumber": "Glints", "perusahaan": "PT C", "posisi": "Backend Engineer", "lokasi": "Surabaya",
+           "gaji": "IDR 8.000.000", "job_type": "Full Time", "tanggal_scrape": "2025-01-04 10:00:00"}
+    # job.db dan jobs.db sama-sama ada; baris yang sama hanya diimpor sekali
+    _legacy_file(db_file.parent / "job.db", LEGACY_JOBS, "jobs", [job])
+    _legacy_file(db_file.parent / "jobs.db", LEGACY_JOBS, "jobs", [job])
+
+    magang = _rows(DatabaseIntern(), "magang")
+    jobs = _rows(DatabaseJob(), "jobs")
+
+    assert [row["perusahaan"] for row in magang] == ["PT A", "PT B"]
+    assert magang[0]["lokasi_kota"] == "Jakarta"
+    assert (magang[0]["gaji_min"], magang[0]["gaji_max"], magang[0]["gaji_currency"]) == (3_000_000, 4_500_000, "IDR")
+    assert magang[0]["last_seen"] == "2025-01-02 10:00:00"
+    assert magang[1]["gaji_max"] is None
+    assert len(jobs) == 1
+    assert (jobs[0]["lokasi_kota"], jobs[0]["gaji_min"]) == ("Surabaya", 8_000_000)
+
+    # Migrasi hanya berjalan sekali, impor tidak diulang
+    assert len(_rows(DatabaseIntern(), "magang")) == 2
+
+def _seed(db_file):
+    intern, job, course = DatabaseIntern(), DatabaseJob(), DatabaseCourse()
+    intern.save_magang([
+        {"sumber": "Kalibrr", "perusahaan": f"PT M{n}", "posisi": f"Intern {n}", "lokasi": "Jakarta",
+         "gaji": "-", "deadline": "-"} for n in range(4)
+    ])
+    job.save_jobs([
+        {"sumber": "Glints", "perusahaan": "PT Python", "posisi": "Accountant", "lokasi": "Jakarta",
+         "gaji": "-", "job_type": "Full Time"},
+        {"sumber": "Glints", "perusahaan": "PT J", "posisi": "Python Developer", "lokasi": "Jakarta",
+         "gaji": "-", "job_type": "Full Time"},
+        {"sumber": "Glints", "perusahaan": "PT Mesin", "posisi": "C++ Engineer", "lokasi": "Bandung",
+         "gaji": "-", "job_type": "Full Time"},
+        {"sumber": "Glints", "perusahaan": "PT C", "posisi": "Sales", "lokasi": "Bandung",
+         "gaji": "-", "job_type": "Full Time"},
+    ])
+    course.save_courses([
+        {"sumber": "Dicoding", "title": f"Kelas {n}", "duration": f"{n} jam", "module_total": "10"} for n in range(2)
+    ])
+    with intern._get_connection() as conn:
+        # Urutan recency: Intern 3 paling baru
+        for n in range(4):
+            conn.execute("UPDATE magang SET tanggal_scrape = ? WHERE posisi = ?", (f"2025-01-0{n + 1}", f"Intern {n}"))
+        conn.commit()
+    return DatabaseSearch(intern, job, course)
+
+def test_search_all_groups_by_type_with_limit(db_file):
+    results = _seed(db_file).search_all(limit=3)
+
+    assert [item["type"] for item in results] == ["magang"] * 3 + ["pekerjaan"] * 3 + ["kursus"] * 2
+    assert [item["posisi"] for item in results[:3]] == ["Intern 3", "Intern 2", "Intern 1"]
+
+def test_search_all_keyword_ranked_by_bm25(db_file):
+    results = _seed(db_file).search_all(keyword="python", limit=3)
+
+    # Cocok di posisi lebih relevan daripada cocok di nama perusahaan
+    assert [item["posisi"] for item in results] == ["Python Developer", "Accountant"]
+    assert {item["type"] for item in results} == {"pekerjaan"}
+
+def test_symbol_terms_kept_intact(db_file):
+    search = _seed(db_file)
+
+    # Sebelumnya "c++" menyusut menjadi prefix "c" dan ikut mencocokkan "PT C"
+    assert [item["posisi"] for item in search.search_all(keyword="c++")] == ["C++ Engineer"]
+    assert search.search_all(keyword="c#") == []
@@ -0,0 +1,52 @@
+import pytest
+from bot.utils.fuzzy_index import FuzzyIndex
+from bot.utils.query_analyzer import IntentType, QueryAnalyzer
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return QueryAnalyzer(fuzzy=True)
+
+def test_phrases_indexed_whole():
+    index = FuzzyIndex(["kelapa gading", "karir", "data scientist"])
+    assert "gading" not in index.words
+    assert index.lookup("gaming") is None
+    assert index.lookup("data scintist") == ("data scientist", 1)
+
+@pytest.mark.parametrize("word", [
+    "kasir", "kurir", "wartawan", "gaming", "animator", "industri", "logistik", "kreator",
+])
+def test_job_words_not_corrected(analyzer, word):
+    analysis = analyzer.analyze(f"lowongan {word} jakarta")
+    assert analysis.corrections == ()
+    assert word in analysis.text.split()
+
+def test_kasir_kept_as_hint(analyzer):
+    analysis = analyzer.analyze("lowongan kasir jakarta")
+    assert analysis.intent == IntentType.PEKERJAAN
+    assert analysis.keyword == ""
+    assert analysis.hint_terms == ("kasir",)
+    assert analysis.location == "Jakarta"
+
+def test_gaming_not_rewritten_to_location(analyzer):
+    analysis = analyzer.analyze("magang gaming jakarta")
+    assert analysis.intent == IntentType.MAGANG
+    assert analysis.hint_terms == ("gaming",)
+    assert analysis.locations == ("Jakarta",)
+
+def test_correction_requires_new_match():
+    index = FuzzyIndex(["karir", "kasur"])
+    # Tanpa PROTECTED_WORDS pun koreksi ditolak jika accept() tidak melihat match baru
+    words, corrections = index.correct(["lowongan", "kasar"], accept=lambda before, after: False)
+    assert words == ["lowongan", "kasar"]
+    assert corrections == []
+
+def test_typos_corrected(analyzer):
+    analysis = analyzer.analyze("magng progammer di jakrta")
+    assert analysis.intent == IntentType.MAGANG
+    assert analysis.locations == ("Jakarta",)
+    assert ("progammer", "programmer") in analysis.corrections
+
+def test_phrase_typo_corrected(analyzer):
+    analysis = analyzer.analyze("kursus data scintist")
+    assert analysis.corrections == (("data scintist", "data scientist"),)
+    assert analysis.keyword == "data scientist"
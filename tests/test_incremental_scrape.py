@@ -0,0 +1,66 @@
+import httpx
+from bot.scraper.data_scraper import GlintsScraper, _run_parallel
+from bot.utils.database import connection_pool
+from tests.fake_sites import LISTING_URL, FakeGlints, scrape, scrape_browser
+
+def test_unprocessed_page_is_parsed_again_on_next_crawl(scraper_env):
+    site = FakeGlints({
+        1: [("PT A", "Backend Engineer"), ("PT A", "Frontend Engineer")],
+        2: [("PT B", "Data Analyst")],
+    })
+    scraper = scrape(site, full_crawl_hours=1e6)
+    assert scraper.db.get_known_keys("Glints") == {
+        ("PT A", "Backend Engineer"), ("PT A", "Frontend Engineer"), ("PT B", "Data Analyst"),
+    }
+
+    # Listing C muncul di halaman 2; halaman 1 tidak berubah jadi crawl incremental berhenti
+    # setelah halaman 1, meskipun halaman 2 sudah ikut di-fetch dalam batch yang sama
+    site.pages[2] = [("PT B", "Data Analyst"), ("PT C", "QA Engineer")]
+    site.requested.clear()
+    scraper = scrape(site, full_crawl_hours=1e6)
+    assert 2 in site.requested
+    assert ("PT C", "QA Engineer") not in scraper.db.get_known_keys("Glints")
+
+    # Crawl berikutnya harus mem-parse halaman 2 lagi, bukan menganggapnya tidak berubah
+    scraper = scrape(site, full_crawl_hours=0)
+    assert ("PT C", "QA Engineer") in scraper.db.get_known_keys("Glints")
+
+def test_page_state_only_saved_for_processed_pages(scraper_env):
+    site = FakeGlints({1: [("PT A", "Backend Engineer")], 2: [("PT B", "Data Analyst")]})
+    scraper = scrape(site, full_crawl_hours=1e6)
+    before = scraper.state_store.load_pages("Glints")
+
+    site.pages[2] = [("PT B", "Data Analyst"), ("PT C", "QA Engineer")]
+    scraper = scrape(site, full_crawl_hours=1e6)
+    after = scraper.state_store.load_pages("Glints")
+
+    page_2 = f"{LISTING_URL}?page=2"
+    assert after[page_2]["content_hash"] == before[page_2]["content_hash"]
+    assert after[page_2]["item_keys"] == before[page_2]["item_keys"]
+
+def test_browser_timeout_does_not_complete_crawl(scraper_env, monkeypatch):
+    site = FakeGlints({1: [("PT A", "Backend Engineer")], 2: [("PT B", "Data Analyst")]})
+    scraper = scrape_browser(site, monkeypatch)
+    assert site.requested == [1, 2, 3]
+    assert scraper.last_delta.new == 2
+
+    # Listing B hilang, tapi halaman 2 timeout: crawl tidak lengkap jadi B belum dianggap hilang
+    site.pages = {1: [("PT A", "Backend Engineer")]}
+    scraper = scrape_browser(site, monkeypatch, timeouts={2})
+    assert scraper.last_delta.removed == 0
+
+    # Halaman 2 termuat tanpa kartu = akhir listing, baru B dihitung hilang
+    scraper = scrape_browser(site, monkeypatch)
+    assert scraper.last_delta.removed == 1
+
+def test_parallel_runs_do_not_leak_connections(scraper_env):
+    site = FakeGlints({1: [("PT A", "Backend Engineer")]})
+    scrape(site, full_crawl_hours=1e6)
+    before = len(connection_pool._connections)
+
+    for _ in range(5):
+        scraper = GlintsScraper(url=LISTING_URL)
+        scraper.http_transport = httpx.MockTransport(site)
+        [result] = _run_parallel([scraper], max_workers=2, timeout=30)
+        assert result.status == "unchanged"
+    assert len(connection_pool._connections) == before
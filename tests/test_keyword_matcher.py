@@ -0,0 +1,39 @@
+import re
+import pytest
+from bot.utils.benchmark_keywords import QUERIES
+from bot.utils.keywords_extraction import EnhancedKeywordExtractor
+
+@pytest.fixture(scope="module")
+def extractor():
+    return EnhancedKeywordExtractor()
+
+def _legacy_match(extractor, text):
+    """Label per grup dengan regex satu per satu (jumlah re.findall untuk intent)"""
+    groups = {
+        'intent': extractor.intent_patterns,
+        'field': extractor.field_patterns,
+        'location': extractor.location_patterns,
+        'experience': extractor.experience_patterns,
+        'work_type': extractor.work_type_patterns,
+        'greeting': extractor.greeting_patterns,
+    }
+    result = {}
+    for group, labels in groups.items():
+        result[group] = {}
+        for label, patterns in labels.items():
+            count = sum(len(re.findall(pattern, text, re.IGNORECASE)) for pattern in patterns)
+            if count:
+                result[group][label] = count if group == 'intent' else 1
+    return result
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_extract_matches_legacy_extractor(extractor, query):
+    assert extractor.extract(query) == extractor.extract_reference(query)
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_matcher_labels_match_legacy_regex(extractor, query):
+    cleaned = extractor._clean_text(query.lower())
+    matched = extractor._matcher.match(cleaned)
+    # Urutan label juga harus sama dengan urutan definisi pola
+    assert {group: list(labels.items()) for group, labels in matched.items()} == \
+        {group: list(labels.items()) for group, labels in _legacy_match(extractor, cleaned).items()}
@@ -0,0 +1,56 @@
+from datetime import date
+import pytest
+from bot.utils.normalize import canonical_city, parse_deadline, parse_salary, split_location
+
+TODAY = date(2025, 6, 15)
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-10-31T16:59:59Z", date(2025, 10, 31)),
+    ("Apply before 31 Oct", date(2025, 10, 31)),
+    ("Lamar sebelum 5 Agustus 2025", date(2025, 8, 5)),
+    ("Oct 31, 2025", date(2025, 10, 31)),
+    ("3 hari lagi", date(2025, 6, 18)),
+    ("Tidak ada", None),
+    ("", None),
+    (None, None),
+    ("2025-02-30", None),
+])
+def test_parse_deadline(text, expected):
+    assert parse_deadline(text, today=TODAY) == expected
+
+def test_parse_deadline_without_year_rolls_over():
+    # Tanggal tanpa tahun yang sudah lewat jauh berarti tahun depan
+    assert parse_deadline("Apply before 15 Jan", today=date(2025, 12, 20)) == date(2026, 1, 15)
+    assert parse_deadline("Apply before 1 Jun", today=TODAY) == date(2025, 6, 1)
+
+@pytest.mark.parametrize("text, expected", [
+    ("IDR 4.000.000 - 6.000.000", (4_000_000, 6_000_000, "IDR")),
+    ("Rp5 - 7 juta /bulan", (5_000_000, 7_000_000, "IDR")),
+    ("Rp 5,5 jt", (5_500_000, 5_500_000, "IDR")),
+    ("500rb", (500_000, 500_000, "IDR")),
+    ("USD 1,000", (1_000, 1_000, "USD")),
+    ("$2k - $3k", (2_000, 3_000, "USD")),
+    ("IDR 120.000.000 / tahun", (10_000_000, 10_000_000, "IDR")),
+    ("Rp 1.500.000,00", (1_500_000, 1_500_000, "IDR")),
+    ("Butuh 3 orang", (None, None, None)),
+    ("Tidak disebutkan", (None, None, None)),
+    (None, (None, None, None)),
+])
+def test_parse_salary(text, expected):
+    assert parse_salary(text) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("Kebon Jeruk, Jakarta Barat", (["Jakarta"], "")),
+    ("jakarta karawang", (["Jakarta"], "karawang")),
+    ("Tangerang Selatan", (["Tangerang"], "")),
+    ("Bandung atau Jakarta", (["Bandung", "Jakarta"], "atau")),
+    ("Karawang", ([], "karawang")),
+    ("", ([], "")),
+    (None, ([], "")),
+])
+def test_split_location(text, expected):
+    assert split_location(text) == expected
+
+def test_canonical_city():
+    assert canonical_city("Gading Serpong, Tangerang") == "Tangerang"
+    assert canonical_city("Karawang") is None
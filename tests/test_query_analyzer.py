@@ -0,0 +1,120 @@
+import asyncio
+from datetime import date
+import pytest
+from bot.utils import database
+from bot.utils.database import DatabaseIntern, DatabaseJob
+from bot.utils.llm_integration import EnhancedLLMIntegration
+from bot.utils.query_analyzer import IntentType, QueryAnalyzer
+from bot.utils.query_cache import query_cache
+
+TODAY = date(2025, 10, 15)   # Rabu
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return QueryAnalyzer()
+
+@pytest.fixture
+def seeded(db_file):
+    intern, job = DatabaseIntern(), DatabaseJob()
+    intern.save_magang([
+        {"sumber": "Kalibrr", "perusahaan": "PT A", "posisi": "Marketing Intern", "lokasi": "Jakarta Selatan",
+         "gaji": "-", "deadline": "-"},
+    ])
+    job.save_jobs([
+        {"sumber": "Glints", "perusahaan": "PT B", "posisi": "Kasir", "lokasi": "Jakarta Barat",
+         "gaji": "Rp 5.000.000", "job_type": "Full Time"},
+        {"sumber": "Glints", "perusahaan": "PT C", "posisi": "Admin Gudang", "lokasi": "Bandung",
+         "gaji": "Rp 6.000.000", "job_type": "Full Time"},
+    ])
+    return intern, job
+
+@pytest.mark.parametrize("message, intent, location", [
+    ("cari lowongan kerja terbaru di jakarta dong", IntentType.PEKERJAAN, "Jakarta"),
+    ("ada magang gak di jakarta", IntentType.MAGANG, "Jakarta"),
+    ("kerja gaji 5 juta bandung minggu ini", IntentType.PEKERJAAN, "Bandung"),
+    ("lowongan di jakarta", IntentType.PEKERJAAN, "Jakarta"),
+])
+def test_filler_words_not_used_as_keyword(analyzer, message, intent, location):
+    analysis = analyzer.analyze(message)
+    assert analysis.intent == intent
+    assert analysis.keyword == ""
+    assert analysis.location == location
+
+@pytest.mark.parametrize("message", [
+    "cari lowongan kerja terbaru di jakarta dong",
+    "lowongan di jakarta",
+    "ada magang gak di jakarta",
+    "kerja gaji 5 juta bandung minggu ini",
+])
+def test_filler_and_location_only_messages_return_results(analyzer, seeded, message):
+    intern, job = seeded
+    analysis = analyzer.analyze(message)
+    search = intern.search_magang if analysis.intent == IntentType.MAGANG else job.search_jobs
+    assert search(keyword=analysis.keyword, location=analysis.location)
+
+def test_vocabulary_terms_stay_keywords(analyzer):
+    analysis = analyzer.analyze("magang data scientist di bandung")
+    assert analysis.keyword == "data scientist"
+    assert analysis.hint_terms == ()
+
+@pytest.mark.parametrize("message, min_salary, deadline_before", [
+    ("magang gaji di atas 5 juta di jakarta", 5_000_000, None),
+    ("lowongan marketing minimal 4,5jt", 4_500_000, None),
+    ("lowongan gaji rp 7.000.000 surabaya", 7_000_000, None),
+    ("magang deadline minggu ini", None, date(2025, 10, 19)),
+    ("magang ditutup dalam 3 hari", None, date(2025, 10, 18)),
+    ("magang batas pendaftaran bulan depan", None, date(2025, 11, 30)),
+    ("magang design deadline sebelum 31 oktober", None, date(2025, 10, 31)),
+    ("lowongan 5 orang", None, None),
+    ("lowongan gaji usd 1000", None, None),
+])
+def test_salary_and_deadline_filters(analyzer, message, min_salary, deadline_before):
+    analysis = analyzer.analyze(message, today=TODAY)
+    assert analysis.min_salary == min_salary
+    assert analysis.deadline_before == deadline_before
+
+def test_filter_phrases_removed_from_keyword(analyzer):
+    analysis = analyzer.analyze("magang marketing gaji minimal 3 juta deadline minggu depan", today=TODAY)
+    assert analysis.intent == IntentType.MAGANG
+    assert analysis.keyword == "marketing"
+    assert analysis.hint_terms == ()
+    assert analysis.deadline_before == date(2025, 10, 26)
+
+def test_message_filters_reach_sql(analyzer, db_file, monkeypatch):
+    statements = []
+    run_query = database._run_query
+
+    def recording_run_query(conn, sql, params=()):
+        statements.append((" ".join(sql.split()), tuple(params)))
+        return run_query(conn, sql, params)
+
+    monkeypatch.setattr(database, "_run_query", recording_run_query)
+    query_cache.bump("test")
+    llm = EnhancedLLMIntegration()
+    analysis = analyzer.analyze("magang gaji di atas 5 juta deadline minggu ini di jakarta", today=TODAY)
+    asyncio.run(llm._search_database(analysis))
+
+    sql, params = next((sql, params) for sql, params in statements if "magang" in sql)
+    assert "gaji_currency = ? AND gaji_max >= ?" in sql
+    assert "deadline_date BETWEEN date('now', 'localtime') AND ?" in sql
+    assert 5_000_000 in params and "2025-10-19" in params and "Jakarta" in params
+
+@pytest.mark.parametrize("message, keyword, position", [
+    ("kerja c++ jakarta", "c++", "C++ Developer"),
+    ("lowongan c# di jakarta", "c#", "C# Engineer"),
+])
+def test_plus_and_hash_terms_reach_fts(analyzer, db_file, message, keyword, position):
+    job = DatabaseJob()
+    job.save_jobs([
+        {"sumber": "Glints", "perusahaan": "PT A", "posisi": "C++ Developer", "lokasi": "Jakarta Barat",
+         "gaji": "-", "job_type": "Full Time"},
+        {"sumber": "Glints", "perusahaan": "PT B", "posisi": "C# Engineer", "lokasi": "Jakarta Selatan",
+         "gaji": "-", "job_type": "Full Time"},
+        {"sumber": "Glints", "perusahaan": "PT C", "posisi": "C Developer", "lokasi": "Jakarta Pusat",
+         "gaji": "-", "job_type": "Full Time"},
+    ])
+    assert job.fts_enabled
+    analysis = analyzer.analyze(message)
+    assert analysis.field_terms == (keyword,)
+    results = job.search_jobs(keyword=analysis.keyword, location=analysis.location)
+    assert [item["posisi"] for item in results] == [position]
@@ -0,0 +1,37 @@
+from bot.utils.query_cache import MISS, QueryCache, normalize_terms
+
+def test_normalize_terms_order_free():
+    assert normalize_terms(["Jakarta", "python"], ordered=False) == normalize_terms(["python", "jakarta"], ordered=False)
+    assert normalize_terms([" Data  Scientist ", "data scientist", ""]) == ("data scientist",)
+
+def test_normalize_terms_keeps_order_by_default():
+    assert normalize_terms(["python", "jakarta"]) == ("python", "jakarta")
+
+def test_bump_invalidates_entries():
+    cache = QueryCache(max_entries=10, max_bytes=10_000, ttl=0)
+    cache.set("key", [{"posisi": "Backend"}])
+    assert cache.get("key") == [{"posisi": "Backend"}]
+
+    cache.bump("scraper")
+    assert cache.get("key") is MISS
+    assert cache.stats()["entries"] == 0
+
+def test_result_from_previous_generation_not_stored():
+    cache = QueryCache(max_entries=10, max_bytes=10_000, ttl=0)
+    # Query mulai sebelum scraper menyimpan data baru, selesai sesudahnya
+    generation = cache.generation
+    cache.bump("scraper")
+    cache.set("key", [], generation)
+    assert cache.get("key") is MISS
+
+    cache.set("key", [], cache.generation)
+    assert cache.get("key") == []
+
+def test_lru_limits():
+    cache = QueryCache(max_entries=2, max_bytes=10_000, ttl=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISS
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
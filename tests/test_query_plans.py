@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+import pytest
+from bot.utils import database
+from bot.utils.database import (
+    COURSES_MIGRATIONS, JOBS_MIGRATIONS, MAGANG_MIGRATIONS, DatabaseCourse, DatabaseIntern,
+    DatabaseJob, DatabaseSearch, _migrate, connection_pool, explain_query_plan, plan_warnings,
+)
+
+@pytest.fixture
+def captured(db_file, monkeypatch):
+    """Schema dibangun lewat _migrate; setiap query pencarian dicatat beserta query plan-nya"""
+    conn = connection_pool.get(db_file)
+    for component, migrations in (("magang", MAGANG_MIGRATIONS), ("jobs", JOBS_MIGRATIONS),
+                                  ("courses", COURSES_MIGRATIONS)):
+        assert _migrate(conn, component, migrations) == len(migrations)
+
+    plans = []
+    run_query = database._run_query
+
+    def recording_run_query(conn, sql, params=()):
+        plans.append((" ".join(sql.split()), explain_query_plan(conn, sql, params)))
+        return run_query(conn, sql, params)
+
+    monkeypatch.setattr(database, "_run_query", recording_run_query)
+    return plans
+
+SEARCHES = [
+    {},
+    {"keyword": "python"},
+    {"location": "Jakarta"},
+    {"keyword": "python", "location": "jakarta"},
+    {"location": "Kebon Jeruk"},
+]
+
+def _assert_indexed(plans):
+    assert plans
+    for sql, plan in plans:
+        assert plan_warnings(plan) == [], f"{sql} | {plan}"
+
+@pytest.mark.parametrize("kwargs", SEARCHES + [
+    {"min_salary": 5_000_000},
+    {"deadline_before": date.today() + timedelta(days=7)},
+])
+def test_search_magang_uses_indexes(captured, kwargs):
+    DatabaseIntern().search_magang(**kwargs)
+    _assert_indexed(captured)
+
+@pytest.mark.parametrize("kwargs", SEARCHES + [{"min_salary": 5_000_000}])
+def test_search_jobs_uses_indexes(captured, kwargs):
+    DatabaseJob().search_jobs(**kwargs)
+    _assert_indexed(captured)
+
+@pytest.mark.parametrize("keyword", ["", "python"])
+def test_search_course_uses_indexes(captured, keyword):
+    DatabaseCourse().search_course(keyword)
+    _assert_indexed(captured)
+
+@pytest.mark.parametrize("kwargs", SEARCHES)
+def test_search_all_uses_indexes(captured, kwargs):
+    DatabaseSearch().search_all(**kwargs)
+    _assert_indexed(captured)
+
+def test_missing_index_is_reported(captured, db_file):
+    with connection_pool.get(db_file) as conn:
+        conn.execute("DROP INDEX idx_magang_recent")
+    DatabaseIntern().search_magang()
+    assert any(plan_warnings(plan) for _, plan in captured)
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+import pytest
+from bot.utils.query_analyzer import QueryAnalyzer
+from bot.utils.ranking import RankingEngine
+
+NOW = datetime.now()
+
+def _job(posisi, perusahaan="PT Contoh", lokasi_kota=None, job_type="", days_old=0, **extra):
+    scraped = (NOW - timedelta(days=days_old)).strftime("%Y-%m-%d %H:%M:%S")
+    return {"posisi": posisi, "perusahaan": perusahaan, "lokasi_kota": lokasi_kota, "job_type": job_type,
+            "tanggal_scrape": scraped, "type": "pekerjaan", **extra}
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return QueryAnalyzer(fuzzy=False)
+
+@pytest.fixture
+def ranker(analyzer, monkeypatch):
+    monkeypatch.delenv("RANKING_WEIGHTS", raising=False)
+    return RankingEngine(analyzer)
+
+def _order(ranked):
+    return [item["posisi"] for item in ranked]
+
+def test_title_match_beats_company_match(ranker, analyzer):
+    items = [
+        _job("Accountant", perusahaan="Python Labs"),
+        _job("Sales"),
+        _job("Python Developer"),
+    ]
+    ranked = ranker.rank(items, analyzer.analyze("lowongan python developer"))
+    assert _order(ranked) == ["Python Developer", "Accountant", "Sales"]
+    assert ranked[0]["rank_score"] > ranked[1]["rank_score"] > ranked[2]["rank_score"]
+
+def test_requested_city_ranked_first(ranker, analyzer):
+    items = [_job("Python Developer", lokasi_kota="Bandung"), _job("Python Developer", lokasi_kota="Jakarta")]
+    ranked = ranker.rank(items, analyzer.analyze("lowongan python developer jakarta"))
+    assert [item["lokasi_kota"] for item in ranked] == ["Jakarta", "Bandung"]
+
+def test_newer_listing_wins_when_otherwise_equal(ranker, analyzer):
+    items = [_job("Python Developer", days_old=30), _job("Python Developer", perusahaan="PT Baru", days_old=1)]
+    ranked = ranker.rank(items, analyzer.analyze("lowongan python developer"))
+    assert [item["perusahaan"] for item in ranked] == ["PT Baru", "PT Contoh"]
+
+def test_work_type_mismatch_penalized(ranker, analyzer):
+    items = [_job("Barista", job_type="Full Time"), _job("Kasir"), _job("Pelayan", job_type="Part Time")]
+    ranked = ranker.rank(items, analyzer.analyze("lowongan part time"))
+    assert _order(ranked) == ["Pelayan", "Kasir", "Barista"]
+
+def test_equal_scores_keep_database_order(ranker, analyzer):
+    items = [_job(f"Sales {n}") for n in range(4)]
+    for item in items:
+        item["tanggal_scrape"] = "2025-01-01 00:00:00"
+    ranked = ranker.rank(items, analyzer.analyze("lowongan python"))
+    assert _order(ranked) == ["Sales 0", "Sales 1", "Sales 2", "Sales 3"]
+
+def test_limit_and_per_type(ranker, analyzer):
+    items = [_job(f"Python {n}") for n in range(4)] + [
+        {"title": "Belajar Python", "sumber": "Dicoding", "type": "kursus"},
+    ]
+    analysis = analyzer.analyze("python")
+    assert len(ranker.rank(items, analysis, limit=2)) == 2
+
+    ranked = ranker.rank(items, analysis, per_type=2)
+    assert [item["type"] for item in ranked].count("pekerjaan") == 2
+    assert "kursus" in [item["type"] for item in ranked]
+
+def test_weights_override_from_env(analyzer, monkeypatch):
+    monkeypatch.setenv("RANKING_WEIGHTS", "title=0,company=5")
+    ranker = RankingEngine(analyzer)
+    items = [_job("Python Developer"), _job("Accountant", perusahaan="Python Labs")]
+    assert _order(ranker.rank(items, analyzer.analyze("lowongan python"))) == ["Accountant", "Python Developer"]
+
+def test_hint_terms_only_affect_ranking(ranker, analyzer):
+    # "kasir" bukan term kosakata: tidak jadi keyword database, tapi tetap menaikkan listing yang cocok
+    analysis = analyzer.analyze("lowongan kasir")
+    assert analysis.keyword == ""
+    ranked = ranker.rank([_job("Admin Gudang"), _job("Kasir Toko")], analysis)
+    assert _order(ranked) == ["Kasir Toko", "Admin Gudang"]
@@ -0,0 +1,49 @@
+from bot.utils.database import DatabaseJob
+from bot.utils.retention import RetentionManager
+from tests.fake_sites import FakeGlints, scrape
+
+def _site(pages: int) -> FakeGlints:
+    return FakeGlints({page: [(f"PT {page}", f"Engineer {page}")] for page in range(1, pages + 1)})
+
+def _backdate(db: DatabaseJob, hours: int):
+    with db._get_connection() as conn:
+        conn.execute("UPDATE jobs SET last_seen = datetime('now', ?)", (f"-{hours} hours",))
+        conn.commit()
+
+def _expired(db: DatabaseJob):
+    with db._get_connection() as conn:
+        return {row[0] for row in conn.execute("SELECT perusahaan FROM jobs WHERE expired_at IS NOT NULL")}
+
+def test_removed_listing_expires_when_crawl_never_completes(scraper_env, monkeypatch):
+    # 9 halaman dengan budget 5: crawl tidak pernah sampai akhir, missed_scrapes tidak naik
+    monkeypatch.setenv("RETENTION_MAX_AGE_HOURS", "72")
+    site = _site(9)
+    scraper = scrape(site, full_crawl_hours=0)
+    _backdate(scraper.db, 96)
+
+    site.pages[1] = [("PT Baru", "Engineer Baru")]
+    scraper = scrape(site, full_crawl_hours=0)
+    RetentionManager(databases=[scraper.db]).expire()
+
+    assert _expired(scraper.db) == {"PT 1"}
+
+def test_removed_listing_expires_after_missed_complete_crawls(scraper_env, monkeypatch):
+    monkeypatch.setenv("RETENTION_UNSEEN_SCRAPES", "2")
+    site = _site(2)
+    scraper = scrape(site, full_crawl_hours=0)
+
+    _backdate(scraper.db, 1)
+    site.pages = {1: site.pages[2]}
+    for _ in range(2):
+        scraper = scrape(site, full_crawl_hours=0)
+    RetentionManager(databases=[scraper.db]).expire()
+
+    assert _expired(scraper.db) == {"PT 1"}
+
+def test_recently_seen_listing_not_expired_by_age(scraper_env, monkeypatch):
+    monkeypatch.setenv("RETENTION_MAX_AGE_HOURS", "72")
+    scraper = scrape(_site(9), full_crawl_hours=0)
+    _backdate(scraper.db, 24)
+    RetentionManager(databases=[scraper.db]).expire()
+
+    assert _expired(scraper.db) == set()